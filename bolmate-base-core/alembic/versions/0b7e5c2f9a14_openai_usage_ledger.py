@@ -0,0 +1,46 @@
+"""Add openai_usage ledger table
+
+Revision ID: 0b7e5c2f9a14
+Revises: f4a2d8b61c93
+Create Date: 2026-10-19 17:05:26.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e5c2f9a14'
+down_revision: Union[str, Sequence[str], None] = 'f4a2d8b61c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'openai_usage',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=50), nullable=False),
+        sa.Column('client', sa.String(length=64), nullable=False),
+        sa.Column('language', sa.String(length=10), nullable=True),
+        sa.Column('model', sa.String(length=50), nullable=True),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+        sa.Column('completion_tokens', sa.Integer(), nullable=False),
+        sa.Column('cached_tokens', sa.Integer(), nullable=False),
+        sa.Column('latency_ms', sa.Integer(), nullable=False),
+        sa.Column('cache_hit', sa.Boolean(), nullable=False),
+        sa.Column('error', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_openai_usage_created_at', 'openai_usage', ['created_at'], unique=False)
+    op.create_index('ix_openai_usage_operation_created_at', 'openai_usage', ['operation', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_openai_usage_operation_created_at', table_name='openai_usage')
+    op.drop_index('ix_openai_usage_created_at', table_name='openai_usage')
+    op.drop_table('openai_usage')
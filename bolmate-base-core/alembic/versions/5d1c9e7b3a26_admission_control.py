@@ -0,0 +1,42 @@
+"""Add rate_limit_buckets and ai_slot_leases for shared admission control
+
+Revision ID: 5d1c9e7b3a26
+Revises: 0b7e5c2f9a14
+Create Date: 2026-10-19 17:48:03.517209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1c9e7b3a26'
+down_revision: Union[str, Sequence[str], None] = '0b7e5c2f9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'rate_limit_buckets',
+        sa.Column('key', sa.String(length=80), nullable=False),
+        sa.Column('tokens', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_table(
+        'ai_slot_leases',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ai_slot_leases_expires_at', 'ai_slot_leases', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ai_slot_leases_expires_at', table_name='ai_slot_leases')
+    op.drop_table('ai_slot_leases')
+    op.drop_table('rate_limit_buckets')
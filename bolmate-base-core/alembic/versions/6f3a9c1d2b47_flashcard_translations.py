@@ -0,0 +1,44 @@
+"""Add flashcard_translations for per-language card translations
+
+Revision ID: 6f3a9c1d2b47
+Revises: 279e6de8b321
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3a9c1d2b47'
+down_revision: Union[str, Sequence[str], None] = '279e6de8b321'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'flashcard_translations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('flashcard_id', sa.Integer(), nullable=False),
+        sa.Column('language', sa.String(length=10), nullable=False),
+        sa.Column('translated_word', sa.String(length=255), nullable=False),
+        sa.Column('example_sentence_translated', sa.String(length=512), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['flashcard_id'], ['flashcards.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_flashcard_translations_card_language',
+        'flashcard_translations',
+        ['flashcard_id', 'language'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_flashcard_translations_card_language', table_name='flashcard_translations')
+    op.drop_table('flashcard_translations')
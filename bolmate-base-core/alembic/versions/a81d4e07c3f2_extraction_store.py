@@ -0,0 +1,58 @@
+"""Add extracted_documents and document_interpretations
+
+Revision ID: a81d4e07c3f2
+Revises: 6f3a9c1d2b47
+Create Date: 2026-10-19 11:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81d4e07c3f2'
+down_revision: Union[str, Sequence[str], None] = '6f3a9c1d2b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'extracted_documents',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('mime_type', sa.String(length=255), nullable=True),
+        sa.Column('text', sa.Text(), nullable=True),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index('ix_extracted_documents_last_used_at', 'extracted_documents', ['last_used_at'])
+    op.create_table(
+        'document_interpretations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('document_sha256', sa.String(length=64), nullable=False),
+        sa.Column('native_language', sa.String(length=10), nullable=False),
+        sa.Column('items', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['document_sha256'], ['extracted_documents.sha256'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_document_interpretations_document_language',
+        'document_interpretations',
+        ['document_sha256', 'native_language'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_interpretations_document_language', table_name='document_interpretations')
+    op.drop_table('document_interpretations')
+    op.drop_index('ix_extracted_documents_last_used_at', table_name='extracted_documents')
+    op.drop_table('extracted_documents')
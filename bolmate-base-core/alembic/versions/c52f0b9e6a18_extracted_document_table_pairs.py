@@ -0,0 +1,28 @@
+"""Add table_pairs to extracted_documents
+
+Revision ID: c52f0b9e6a18
+Revises: a81d4e07c3f2
+Create Date: 2026-10-19 12:26:03.118452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52f0b9e6a18'
+down_revision: Union[str, Sequence[str], None] = 'a81d4e07c3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('extracted_documents', sa.Column('table_pairs', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('extracted_documents', 'table_pairs')
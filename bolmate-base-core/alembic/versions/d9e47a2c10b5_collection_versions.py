@@ -0,0 +1,38 @@
+"""Add updated_at columns and collection_versions for conditional GETs
+
+Revision ID: d9e47a2c10b5
+Revises: c52f0b9e6a18
+Create Date: 2026-10-19 13:41:55.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e47a2c10b5'
+down_revision: Union[str, Sequence[str], None] = 'c52f0b9e6a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('flashcards', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('flashcard_translations', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    collection_versions = op.create_table(
+        'collection_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(collection_versions, [{'name': 'flashcards', 'version': 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('collection_versions')
+    op.drop_column('flashcard_translations', 'updated_at')
+    op.drop_column('flashcards', 'updated_at')
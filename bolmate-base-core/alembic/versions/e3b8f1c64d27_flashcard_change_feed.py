@@ -0,0 +1,43 @@
+"""Add flashcards.change_seq and flashcard_tombstones for delta sync
+
+Revision ID: e3b8f1c64d27
+Revises: d9e47a2c10b5
+Create Date: 2026-10-19 14:58:12.664091
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8f1c64d27'
+down_revision: Union[str, Sequence[str], None] = 'd9e47a2c10b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('flashcards', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    # Existing cards belong to the seeded collection version, so a full sync
+    # (since=0) returns them
+    op.execute('UPDATE flashcards SET change_seq = 1')
+    op.create_index(op.f('ix_flashcards_change_seq'), 'flashcards', ['change_seq'], unique=False)
+    op.create_table(
+        'flashcard_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('flashcard_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_flashcard_tombstones_change_seq'), 'flashcard_tombstones', ['change_seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_flashcard_tombstones_change_seq'), table_name='flashcard_tombstones')
+    op.drop_table('flashcard_tombstones')
+    op.drop_index(op.f('ix_flashcards_change_seq'), table_name='flashcards')
+    op.drop_column('flashcards', 'change_seq')
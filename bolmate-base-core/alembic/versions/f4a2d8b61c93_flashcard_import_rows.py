@@ -0,0 +1,41 @@
+"""Add unlogged flashcard_import_rows staging table for file imports
+
+Revision ID: f4a2d8b61c93
+Revises: e3b8f1c64d27
+Create Date: 2026-10-19 16:21:40.318725
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a2d8b61c93'
+down_revision: Union[str, Sequence[str], None] = 'e3b8f1c64d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Staged rows are transient, so skip the WAL
+    op.create_table(
+        'flashcard_import_rows',
+        sa.Column('import_id', sa.String(length=36), nullable=False),
+        sa.Column('line', sa.BigInteger(), nullable=False),
+        sa.Column('source_word', sa.String(length=255), nullable=False),
+        sa.Column('translated_word', sa.String(length=255), nullable=False),
+        sa.Column('source_language', sa.String(length=10), nullable=False),
+        sa.Column('native_language', sa.String(length=10), nullable=False),
+        sa.Column('example_sentence', sa.String(length=512), nullable=True),
+        sa.Column('example_sentence_translated', sa.String(length=512), nullable=True),
+        sa.Column('difficulty_level', sa.String(length=10), nullable=True),
+        sa.PrimaryKeyConstraint('import_id', 'line'),
+        prefixes=['UNLOGGED']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('flashcard_import_rows')
@@ -1,17 +1,32 @@
 from flask import Flask, jsonify, request
 
+from app import admission, deadlines, idempotency, metrics
+from app.cli import register_commands
+from app.db import session as db_session
 from app.db.session import SessionLocal
+from app.json_provider import json_provider_class
 from app.routes import register_blueprints
+from app.uploads import SpooledRequest
 from config import get_settings
 
 
 def create_app() -> Flask:
     settings = get_settings()
     app = Flask(__name__)
+    app.request_class = SpooledRequest
+    app.json = json_provider_class()(app)
     app.config["ENV"] = settings.app_env
     app.config["DEBUG"] = settings.debug
+    app.config["MAX_CONTENT_LENGTH"] = settings.max_upload_request_size
 
+    metrics.init_app(app)
+    metrics.instrument_engine(db_session.engine)
+    deadlines.init_app(app)
+    deadlines.instrument_engine(db_session.engine)
+    idempotency.init_app(app)
+    admission.init_app(app)
     register_blueprints(app)
+    register_commands(app)
 
     @app.before_request
     def handle_preflight():
@@ -32,6 +47,10 @@ def create_app() -> Flask:
     def not_found(_: Exception):
         return jsonify({"error": "Not Found"}), 404
 
+    @app.errorhandler(413)
+    def payload_too_large(_: Exception):
+        return jsonify({"error": "Request Entity Too Large"}), 413
+
     @app.errorhandler(500)
     def server_error(_: Exception):
         return jsonify({"error": "Internal Server Error"}), 500
@@ -44,6 +63,12 @@ def _apply_cors_headers(response, settings):
     response.headers["Access-Control-Allow-Methods"] = (
         "GET, POST, PUT, PATCH, DELETE, OPTIONS"
     )
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+    response.headers["Access-Control-Allow-Headers"] = (
+        "Content-Type, Authorization, If-None-Match, If-Modified-Since, X-User-Id, "
+        "X-Request-Timeout, Idempotency-Key"
+    )
+    response.headers["Access-Control-Expose-Headers"] = (
+        "ETag, Last-Modified, Content-Disposition, Retry-After, Idempotent-Replayed"
+    )
     response.headers["Access-Control-Allow-Credentials"] = "true"
     return response
@@ -0,0 +1,234 @@
+"""Admission control for AI-backed endpoints.
+
+Requests to the endpoints in ``AI_ENDPOINTS`` must get past two checks before
+their view runs, or are answered ``429`` with ``Retry-After`` at once:
+
+* a token bucket per client address (``app.clients.remote_key``; the
+  ``X-User-Id`` header is the client's own pick) refilled at
+  ``ai_rate_per_minute`` up to ``ai_rate_burst`` tokens, charged the
+  endpoint's cost and refunded when the request is turned away for lack of
+  a slot;
+* a global limit of ``ai_max_concurrency`` requests in flight, so slow
+  OpenAI calls can't occupy every worker and starve the cheap endpoints.
+
+State lives in process by default (``admission_backend = "local"``), which
+limits each worker on its own.  With ``"postgres"`` buckets and slot leases
+are kept in the database and shared by all workers.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+import uuid
+from typing import Dict, Tuple
+
+from flask import Flask, Response, g, jsonify, request
+from sqlalchemy import text
+
+from app.clients import remote_key
+from app.db import session as db_session
+from app.metrics import Counter
+from config import get_settings
+
+# Endpoint -> bucket tokens per request, roughly its relative OpenAI spend
+AI_ENDPOINTS = {
+    "interpret.interpret_payload": 1,
+    "interpret.interpret_file": 2,
+    "languages.switch_language": 2,
+    "flashcards.enrich_existing_flashcards": 2,
+    "quiz.generate_quiz": 1,
+    # Answers come with a model hint; cached ones are free but still count
+    "quiz.submit_quiz_answer": 1,
+}
+# Suggested wait when every slot is busy
+BUSY_RETRY_AFTER = 1
+# Longest suggested wait; a rate of 0 blocks clients for good (infinite wait)
+MAX_RETRY_AFTER = 3600
+# Local buckets kept before idle (full) ones are dropped
+MAX_LOCAL_BUCKETS = 10000
+
+REJECTIONS = Counter(
+    "ai_admission_rejections_total",
+    "AI requests refused with 429, by endpoint and reason.",
+    ("endpoint", "reason"),
+)
+
+
+class LocalAdmission:
+    """Per-process buckets and slots."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._in_flight = 0
+
+    def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        """Charge ``cost`` tokens; ``0`` if admitted, else seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._buckets and len(self._buckets) >= MAX_LOCAL_BUCKETS:
+                self._drop_full(now, rate, burst)
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens < cost:
+                self._buckets[key] = (tokens, now)
+                return (cost - tokens) / rate if rate > 0 else math.inf
+            self._buckets[key] = (tokens - cost, now)
+            return 0.0
+
+    def refund(self, key: str, cost: float, burst: float) -> None:
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(burst, tokens + cost), updated)
+
+    def _drop_full(self, now: float, rate: float, burst: float) -> None:
+        # A full bucket is the same as no bucket
+        self._buckets = {
+            key: (tokens, updated)
+            for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * rate < burst
+        }
+
+    def acquire(self, limit: int) -> str | None:
+        with self._lock:
+            if self._in_flight >= limit:
+                return None
+            self._in_flight += 1
+            return "local"
+
+    def release(self, slot: str) -> None:
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+
+
+class PostgresAdmission:
+    """Buckets and slot leases shared by every worker through PostgreSQL."""
+
+    TAKE = text(
+        """
+        INSERT INTO rate_limit_buckets AS bucket (key, tokens, updated_at)
+        VALUES (:key, :burst - :cost, now())
+        ON CONFLICT (key) DO UPDATE
+        SET tokens = LEAST(
+                :burst,
+                bucket.tokens
+                + EXTRACT(EPOCH FROM now() - bucket.updated_at) * :rate
+            ) - :cost,
+            updated_at = now()
+        WHERE LEAST(
+                :burst,
+                bucket.tokens
+                + EXTRACT(EPOCH FROM now() - bucket.updated_at) * :rate
+            ) >= :cost
+        RETURNING tokens
+        """
+    )
+    LEVEL = text(
+        """
+        SELECT LEAST(
+            :burst,
+            tokens + EXTRACT(EPOCH FROM now() - updated_at) * :rate
+        )
+        FROM rate_limit_buckets WHERE key = :key
+        """
+    )
+    REFUND = text(
+        """
+        UPDATE rate_limit_buckets SET tokens = LEAST(:burst, tokens + :cost)
+        WHERE key = :key
+        """
+    )
+    # Serializes slot acquisition for the duration of one short transaction
+    LOCK_ID = 0x424F4C4D
+
+    def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        params = {"key": key, "cost": cost, "rate": rate, "burst": burst}
+        with db_session.engine.begin() as connection:
+            if connection.execute(self.TAKE, params).first() is not None:
+                return 0.0
+            level = connection.execute(self.LEVEL, params).scalar() or 0.0
+        return (cost - float(level)) / rate if rate > 0 else math.inf
+
+    def refund(self, key: str, cost: float, burst: float) -> None:
+        params = {"key": key, "cost": cost, "burst": burst}
+        with db_session.engine.begin() as connection:
+            connection.execute(self.REFUND, params)
+
+    def acquire(self, limit: int) -> str | None:
+        lease = str(uuid.uuid4())
+        lease_seconds = get_settings().ai_slot_lease_seconds
+        with db_session.engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:id)"), {"id": self.LOCK_ID}
+            )
+            connection.execute(
+                text("DELETE FROM ai_slot_leases WHERE expires_at < now()")
+            )
+            in_flight = connection.execute(
+                text("SELECT count(*) FROM ai_slot_leases")
+            ).scalar()
+            if in_flight >= limit:
+                return None
+            connection.execute(
+                text(
+                    "INSERT INTO ai_slot_leases (id, expires_at) "
+                    "VALUES (:id, now() + make_interval(secs => :seconds))"
+                ),
+                {"id": lease, "seconds": lease_seconds},
+            )
+        return lease
+
+    def release(self, slot: str) -> None:
+        with db_session.engine.begin() as connection:
+            connection.execute(
+                text("DELETE FROM ai_slot_leases WHERE id = :id"), {"id": slot}
+            )
+
+
+def _too_many(message: str, retry_after: float) -> Response:
+    response = jsonify({"error": message})
+    response.status_code = 429
+    retry_after = min(retry_after, MAX_RETRY_AFTER)
+    response.headers["Retry-After"] = str(max(math.ceil(retry_after), 1))
+    return response
+
+
+def init_app(app: Flask) -> None:
+    backend = get_settings().admission_backend
+    admission = PostgresAdmission() if backend == "postgres" else LocalAdmission()
+    app.extensions["admission"] = admission
+
+    @app.before_request
+    def _admit() -> Response | None:
+        endpoint = request.endpoint
+        cost = AI_ENDPOINTS.get(endpoint or "")
+        if endpoint is None or cost is None or request.method == "OPTIONS":
+            return None
+        settings = get_settings()
+        key = remote_key()
+        wait = admission.take(
+            key,
+            cost,
+            settings.ai_rate_per_minute / 60,
+            settings.ai_rate_burst,
+        )
+        if wait:
+            REJECTIONS.inc(endpoint=endpoint, reason="rate_limit")
+            return _too_many("Rate limit exceeded for AI requests", wait)
+        slot = admission.acquire(settings.ai_max_concurrency)
+        if slot is None:
+            # The request did no work; don't charge the client for it
+            admission.refund(key, cost, settings.ai_rate_burst)
+            REJECTIONS.inc(endpoint=endpoint, reason="concurrency")
+            return _too_many("Too many AI requests in progress", BUSY_RETRY_AFTER)
+        g.ai_slot = slot
+        return None
+
+    @app.teardown_request
+    def _release(_: BaseException | None) -> None:
+        slot = g.pop("ai_slot", None)
+        if slot is not None:
+            admission.release(slot)
@@ -0,0 +1,160 @@
+"""Flask CLI commands (``flask --app wsgi <group> <command>``)."""
+
+import click
+from flask import Flask
+from flask.cli import AppGroup
+
+from app.db.session import SessionLocal
+from app.models import Flashcard, bump_collection_version
+from app.services.batch_enrichment import (
+    BatchBackend,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    collect_backfill,
+    offline_responder,
+    submit_backfill,
+)
+from app.services.difficulty import (
+    estimate_difficulty,
+    frequency_file,
+    read_frequency_list,
+    write_frequency_table,
+)
+from app.services.lexicon import build_lexicon, lexicon_path, read_tsv
+from app.services.openai_service import get_client
+
+lexicon_cli = AppGroup("lexicon", help="Manage offline bilingual lexicons.")
+enrich_cli = AppGroup("enrich", help="Bulk-enrich flashcards outside web requests.")
+difficulty_cli = AppGroup("difficulty", help="Manage local difficulty level estimates.")
+
+
+@lexicon_cli.command("build")
+@click.argument("source_language")
+@click.argument("native_language")
+@click.argument("tsv_files", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--output", type=click.Path(), help="Override the output path.")
+def build_lexicon_command(
+    source_language: str,
+    native_language: str,
+    tsv_files: tuple[str, ...],
+    output: str | None,
+) -> None:
+    """Build a SOURCE_LANGUAGE -> NATIVE_LANGUAGE lexicon from TSV word lists."""
+    path = output or lexicon_path(source_language, native_language)
+    count = build_lexicon(
+        (pair for tsv_file in tsv_files for pair in read_tsv(tsv_file)), path
+    )
+    click.echo(f"Wrote {count} entries to {path}")
+
+
+@difficulty_cli.command("build")
+@click.argument("language")
+@click.argument("word_list", type=click.Path(exists=True))
+@click.option("--output", type=click.Path(), help="Override the output path.")
+def build_frequency_command(language: str, word_list: str, output: str | None) -> None:
+    """Store the LANGUAGE rank table from a WORD_LIST, most frequent first."""
+    path = output or frequency_file()
+    count = write_frequency_table(language, read_frequency_list(word_list), path)
+    click.echo(f"Wrote {count} {language} words to {path}")
+
+
+@difficulty_cli.command("backfill")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+def backfill_difficulty_command(batch_size: int) -> None:
+    """Estimate levels of cards that have none."""
+    session = SessionLocal()
+    updated = 0
+    last_id = 0
+    try:
+        while True:
+            cards = (
+                session.query(
+                    Flashcard.id, Flashcard.source_word, Flashcard.source_language
+                )
+                .filter(Flashcard.difficulty_level.is_(None), Flashcard.id > last_id)
+                .order_by(Flashcard.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not cards:
+                break
+            last_id = cards[-1].id
+            updates = []
+            for card_id, source_word, source_language in cards:
+                level = estimate_difficulty(source_word, source_language)
+                if level:
+                    updates.append({"id": card_id, "difficulty_level": level})
+            if updates:
+                # Bulk mappings skip the flush events that bump the version
+                version = bump_collection_version(session, "flashcards")
+                for values in updates:
+                    values["change_seq"] = version
+                session.bulk_update_mappings(Flashcard, updates)
+            session.commit()
+            updated += len(updates)
+    finally:
+        session.close()
+    click.echo(f"Updated {updated} flashcards")
+
+
+def _batch_backend(local: bool) -> BatchBackend:
+    if local:
+        return LocalBatchBackend(offline_responder)
+    client = get_client()
+    if client is None:
+        raise click.ClickException("OPENAI_API_KEY is not configured.")
+    return OpenAIBatchBackend(client)
+
+
+@enrich_cli.command("backfill")
+@click.option("--limit", type=int, help="Enrich at most this many cards.")
+@click.option("--wait/--no-wait", default=True, help="Wait and apply the results.")
+@click.option("--poll-interval", type=float, default=30.0, show_default=True)
+@click.option(
+    "--local",
+    is_flag=True,
+    help="Run offline: fill in local difficulty estimates, no examples.",
+)
+def backfill_command(
+    limit: int | None, wait: bool, poll_interval: float, local: bool
+) -> None:
+    """Add examples and difficulty levels to cards that are missing them."""
+    if local and not wait:
+        raise click.UsageError("--local jobs cannot be collected later.")
+    backend = _batch_backend(local)
+    session = SessionLocal()
+    try:
+        batch_id = submit_backfill(session, backend, limit)
+        if batch_id is None:
+            click.echo("Nothing to enrich.")
+            return
+        click.echo(f"Submitted batch {batch_id}")
+        if wait:
+            updated = collect_backfill(session, backend, batch_id, poll_interval)
+            click.echo(f"Updated {updated} flashcards")
+    finally:
+        session.close()
+
+
+@enrich_cli.command("collect")
+@click.argument("batch_id")
+@click.option("--poll-interval", type=float, default=30.0, show_default=True)
+def collect_command(batch_id: str, poll_interval: float) -> None:
+    """Wait for BATCH_ID and apply its results."""
+    session = SessionLocal()
+    try:
+        updated = collect_backfill(
+            session, _batch_backend(local=False), batch_id, poll_interval
+        )
+        click.echo(f"Updated {updated} flashcards")
+    finally:
+        session.close()
+
+
+def register_commands(app: Flask) -> None:
+    app.cli.add_command(lexicon_cli)
+    app.cli.add_command(enrich_cli)
+    app.cli.add_command(difficulty_cli)
+
+
+__all__ = ["register_commands"]
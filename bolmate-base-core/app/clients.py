@@ -0,0 +1,29 @@
+"""Caller identification for usage accounting and rate limits.
+
+There is no authentication yet: clients that know their user send
+``X-User-Id``, everyone else is told apart by address.  The header is the
+client's own claim, so limits key on the address alone (``remote_key``).
+"""
+
+from __future__ import annotations
+
+from flask import has_request_context, request
+
+USER_HEADER = "X-User-Id"
+
+
+def client_key() -> str:
+    """``user:<id>``, ``ip:<address>`` or ``-`` outside of a request."""
+    if not has_request_context():
+        return "-"
+    user = request.headers.get(USER_HEADER, "").strip()
+    if user:
+        return f"user:{user[:58]}"
+    return f"ip:{request.remote_addr or '-'}"
+
+
+def remote_key() -> str:
+    """``ip:<address>`` of the caller, or ``-`` outside of a request."""
+    if not has_request_context():
+        return "-"
+    return f"ip:{request.remote_addr or '-'}"
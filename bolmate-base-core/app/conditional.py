@@ -0,0 +1,58 @@
+"""Conditional GET support: strong ETags and ``Last-Modified`` validators.
+
+Validators are derived from a collection version (see
+``app.models.collection_version``) and the request's query string, so a
+matching ``If-None-Match`` / ``If-Modified-Since`` is answered with ``304``
+before any resource rows are read.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+
+from flask import Response, request
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag for ``parts`` plus the query string that shaped the body."""
+    query = "&".join(
+        f"{key}={value}" for key, value in sorted(request.args.items(multi=True))
+    )
+    digest = hashlib.sha1(repr((parts, query)).encode("utf-8")).hexdigest()
+    return digest[:20]
+
+
+def _to_utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def not_modified(etag: str, last_modified: datetime | None = None) -> Response | None:
+    """``304`` response if the client's validators match, else ``None``.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since`` (RFC 9110).
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        modified = _to_utc(last_modified)
+        matched = bool(since and modified and modified <= since)
+    if not matched:
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
+
+
+def with_validators(
+    response: Response, etag: str, last_modified: datetime | None = None
+) -> Response:
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _to_utc(last_modified)
+    # Cacheable, but always revalidated so polling sees changes immediately
+    response.headers["Cache-Control"] = "no-cache"
+    return response
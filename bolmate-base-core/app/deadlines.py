@@ -0,0 +1,190 @@
+"""Per-request deadlines.
+
+Every request gets a time budget: ``ROUTE_DEADLINES`` for its endpoint, else
+``request_deadline_seconds``.  Clients can ask for another one in seconds
+with ``X-Request-Timeout`` (capped at ``max_request_deadline_seconds``), e.g.
+to match their own timeout.  The deadline is carried to the work the request
+does:
+
+* SQL statements fail at once when it has passed and, on PostgreSQL, run
+  with a ``statement_timeout`` of the time that is left;
+* OpenAI calls time out when it passes (``openai_service``), and operations
+  split into batches stop before the next batch.
+
+Either way ``DeadlineExceeded`` is raised and the request is answered ``504``,
+so the worker is free as soon as nobody waits for its result anymore.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator
+
+from flask import Flask, Response, jsonify, request
+from flask.typing import ResponseReturnValue
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+
+from config import get_settings
+
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+# Endpoint -> seconds; ``None`` means no deadline unless the client sends one
+ROUTE_DEADLINES: Dict[str, float | None] = {
+    "flashcards.export_flashcards": None,
+    "flashcards.import_flashcards": None,
+    "flashcards.enrich_existing_flashcards": 120,
+    "languages.switch_language": 120,
+    "interpret.interpret_file": 120,
+    "interpret.interpret_payload": 60,
+    "quiz.generate_quiz": 60,
+}
+# A statement timeout is re-sent once it would overrun the deadline by this much
+STATEMENT_TIMEOUT_SLACK = 1.0
+# PostgreSQL's query_canceled, raised when statement_timeout fires
+QUERY_CANCELED = "57014"
+
+# ``time.monotonic()`` value the current request must finish by
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+_instrumented_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+class DeadlineExceeded(RuntimeError):
+    """The current request ran out of time; its result is no longer useful."""
+
+
+def current() -> float | None:
+    """``time.monotonic()`` value of the deadline, ``None`` without one."""
+    return _deadline.get()
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline, ``None`` without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check() -> None:
+    """Raise ``DeadlineExceeded`` if the deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """Run the block with a deadline ``seconds`` from now (``None``: none)."""
+    token = _deadline.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _request_budget() -> float | None:
+    settings = get_settings()
+    budget = ROUTE_DEADLINES.get(
+        request.endpoint or "", settings.request_deadline_seconds
+    )
+    header = request.headers.get(TIMEOUT_HEADER)
+    if header:
+        requested = float(header)
+        if not math.isfinite(requested) or requested <= 0:
+            raise ValueError(header)
+        budget = min(requested, settings.max_request_deadline_seconds)
+    return budget
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Apply the current deadline to statements executed on ``engine``."""
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _limit(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        deadline = _deadline.get()
+        if deadline is None:
+            return
+        now = time.monotonic()
+        if now >= deadline:
+            raise DeadlineExceeded("Request deadline exceeded before SQL statement")
+        if conn.dialect.name != "postgresql":
+            return
+        # (deadline, set at) of the transaction's statement_timeout; each
+        # statement may run for the full timeout, so refresh it once the
+        # time since it was set would overrun the deadline noticeably
+        limit = conn.info.get("deadline_timeout")
+        if limit and limit[0] == deadline and now - limit[1] < STATEMENT_TIMEOUT_SLACK:
+            return
+        timeout_ms = max(int((deadline - now) * 1000), 1)
+        cursor.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+        conn.info["deadline_timeout"] = (deadline, now)
+
+    def _forget(conn: Connection, *args: Any) -> None:
+        # SET LOCAL ends with the transaction
+        conn.info.pop("deadline_timeout", None)
+
+    for name in ("begin", "commit", "rollback"):
+        event.listen(engine, name, _forget)
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info.pop("deadline_timeout", None)
+
+    @event.listens_for(engine, "handle_error")
+    def _timed_out(context: ExceptionContext) -> None:
+        code = getattr(context.original_exception, "pgcode", None)
+        left = remaining()
+        # A statement_timeout we set, not a cancellation from elsewhere
+        if code == QUERY_CANCELED and left is not None and left <= 0.05:
+            raise DeadlineExceeded(
+                "Request deadline exceeded during SQL statement"
+            ) from context.sqlalchemy_exception
+
+
+def init_app(app: Flask) -> None:
+    """Start each request's deadline; it ends with the response.
+
+    Register before the other request hooks: after-request functions run in
+    reverse order, so the deadline still covers theirs and is gone by the
+    time teardown functions (e.g. admission releasing its slot) run.
+    """
+
+    @app.before_request
+    def _start_deadline() -> ResponseReturnValue | None:
+        try:
+            budget = _request_budget()
+        except ValueError:
+            return (
+                jsonify({"error": f"{TIMEOUT_HEADER} must be a positive number"}),
+                400,
+            )
+        _deadline.set(None if budget is None else time.monotonic() + budget)
+        return None
+
+    @app.after_request
+    def _end_deadline(response: Response) -> Response:
+        _deadline.set(None)
+        return response
+
+    @app.teardown_request
+    def _clear_deadline(_: BaseException | None) -> None:
+        _deadline.set(None)
+
+    @app.errorhandler(DeadlineExceeded)
+    def _deadline_exceeded(exc: DeadlineExceeded) -> ResponseReturnValue:
+        return jsonify({"error": str(exc)}), 504
@@ -0,0 +1,258 @@
+"""``Idempotency-Key`` support for expensive POST endpoints.
+
+A request to one of ``IDEMPOTENT_ENDPOINTS`` with an ``Idempotency-Key``
+header claims the key (per client, ``app.clients.client_key``) in the
+``idempotency_keys`` table before its view runs; its response is stored
+there for ``idempotency_ttl_seconds``.  A retry with the same key then:
+
+* gets the stored response back (``Idempotent-Replayed: true``) without
+  running the view again, so no OpenAI calls and no admission tokens;
+* waits for the first request while it is still in flight, up to the
+  retry's own deadline (``409`` if it is not done by then);
+* is refused with ``422`` if the key was used for a different request.
+
+Server errors and rate-limit rejections are not stored: the key is released
+and a retry runs the operation again.  An in-flight claim whose worker died
+is taken over once its lease (the owner's deadline) has passed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
+
+from flask import Flask, Response, g, jsonify, request
+from flask.typing import ResponseReturnValue
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import ColumnElement
+
+from app import deadlines
+from app.clients import client_key
+from app.db import session as db_session
+from app.models.idempotency import IdempotencyKey
+from config import get_settings
+
+IDEMPOTENT_ENDPOINTS = frozenset(
+    {
+        "flashcards.enrich_existing_flashcards",
+        "flashcards.bulk_create_flashcards",
+        "languages.switch_language",
+        "interpret.interpret_file",
+    }
+)
+KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Responses that say nothing about the operation's outcome
+RETRYABLE_STATUS = 429
+HASH_CHUNK_SIZE = 64 * 1024
+# Waiting for an in-flight request in another worker polls with backoff
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 1.0
+# Margin on top of the owner's deadline before its claim can be taken over
+LEASE_SLACK_SECONDS = 5.0
+# How often a claim also deletes every expired key, not just its own
+PURGE_INTERVAL = 600.0
+
+_table = IdempotencyKey.__table__
+Claim = Tuple[str, str]
+
+# Claims owned by this process; waiters in the same process wake at once
+_finished: Dict[Claim, threading.Event] = {}
+_finished_lock = threading.Lock()
+_last_purge = float("-inf")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _where(claim: Claim) -> ColumnElement:
+    client, key = claim
+    return (_table.c.client == client) & (_table.c.key == key)
+
+
+def _fingerprint() -> str:
+    """SHA-256 of the endpoint, query and body (form fields and files)."""
+    digest = hashlib.sha256(
+        f"{request.endpoint}\0{request.query_string.decode('latin-1')}\0".encode()
+    )
+    if request.mimetype == "multipart/form-data":
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"{name}={value}\0".encode())
+        for name, upload in request.files.items(multi=True):
+            digest.update(f"{name}:{upload.filename}\0".encode())
+            stream = upload.stream
+            for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+            stream.seek(0)
+    else:
+        digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _claim(claim: Claim, fingerprint: str, lease: float) -> Row | None:
+    """Claim the key; ``None`` if this request owns it, else the stored row."""
+    global _last_purge
+
+    now = _now()
+    locked_until = now + timedelta(seconds=lease)
+    with db_session.engine.begin() as connection:
+        expired = _table.c.expires_at < now
+        if time.monotonic() - _last_purge < PURGE_INTERVAL:
+            expired &= _where(claim)
+        else:
+            _last_purge = time.monotonic()
+        connection.execute(_table.delete().where(expired))
+    try:
+        with db_session.engine.begin() as connection:
+            connection.execute(
+                _table.insert().values(
+                    client=claim[0],
+                    key=claim[1],
+                    fingerprint=fingerprint,
+                    locked_until=locked_until,
+                    expires_at=locked_until,
+                )
+            )
+        return None
+    except IntegrityError:
+        pass
+    with db_session.engine.begin() as connection:
+        # Take over a claim whose owner went away
+        taken = connection.execute(
+            _table.update()
+            .where(
+                _where(claim)
+                & _table.c.response_status.is_(None)
+                & (_table.c.fingerprint == fingerprint)
+                & (_table.c.locked_until < now)
+            )
+            .values(locked_until=locked_until, expires_at=locked_until)
+        ).rowcount
+        if taken:
+            return None
+        return connection.execute(select(_table).where(_where(claim))).first()
+
+
+def _own(claim: Claim) -> None:
+    g.idempotency_claim = claim
+    with _finished_lock:
+        _finished[claim] = threading.Event()
+
+
+def _finish(claim: Claim, response: Response | None) -> None:
+    """Store ``response`` for the claim, or release it without one."""
+    with deadlines.deadline_scope(None), db_session.engine.begin() as connection:
+        if response is None:
+            connection.execute(_table.delete().where(_where(claim)))
+        else:
+            connection.execute(
+                _table.update()
+                .where(_where(claim))
+                .values(
+                    response_status=response.status_code,
+                    response_mimetype=response.mimetype,
+                    response_body=response.get_data(),
+                    expires_at=_now()
+                    + timedelta(seconds=get_settings().idempotency_ttl_seconds),
+                )
+            )
+    with _finished_lock:
+        event = _finished.pop(claim, None)
+    if event is not None:
+        event.set()
+
+
+def _replay(row: Row) -> Response:
+    response = Response(
+        row.response_body, status=row.response_status, mimetype=row.response_mimetype
+    )
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Deduplicate requests by key.
+
+    Register after ``deadlines`` (waits use the request's deadline) and
+    before ``admission``, so replays are not charged.
+    """
+
+    @app.before_request
+    def _deduplicate() -> ResponseReturnValue | None:
+        if request.endpoint not in IDEMPOTENT_ENDPOINTS or request.method != "POST":
+            return None
+        key = request.headers.get(KEY_HEADER)
+        if key is None:
+            return None
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return (
+                jsonify(
+                    {"error": f"{KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters"}
+                ),
+                400,
+            )
+
+        claim = (client_key(), key)
+        fingerprint = _fingerprint()
+        settings = get_settings()
+        budget = deadlines.remaining()
+        if budget is None:
+            budget = settings.max_request_deadline_seconds
+        give_up = time.monotonic() + budget
+        interval = POLL_INTERVAL
+        while True:
+            # Look once more after the wait, even if the deadline just passed
+            with deadlines.deadline_scope(None):
+                row = _claim(claim, fingerprint, budget + LEASE_SLACK_SECONDS)
+            if row is None:
+                _own(claim)
+                return None
+            if row.fingerprint != fingerprint:
+                return (
+                    jsonify({"error": f"{KEY_HEADER} was used for another request"}),
+                    422,
+                )
+            if row.response_status is not None:
+                return _replay(row)
+            wait = give_up - time.monotonic()
+            if wait <= 0:
+                response = jsonify(
+                    {"error": f"A request with this {KEY_HEADER} is in progress"}
+                )
+                response.status_code = 409
+                response.headers["Retry-After"] = "1"
+                return response
+            with _finished_lock:
+                event = _finished.get(claim)
+            if event is not None:
+                event.wait(min(wait, MAX_POLL_INTERVAL))
+            else:
+                time.sleep(min(wait, interval))
+                interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+    @app.after_request
+    def _store(response: Response) -> Response:
+        claim = g.pop("idempotency_claim", None)
+        if claim is not None:
+            keep = (
+                response.status_code < 500
+                and response.status_code != RETRYABLE_STATUS
+                and not response.is_streamed
+            )
+            _finish(claim, response if keep else None)
+        return response
+
+    @app.teardown_request
+    def _release(_: BaseException | None) -> None:
+        # The view failed before a response was made
+        claim = g.pop("idempotency_claim", None)
+        if claim is not None:
+            _finish(claim, None)
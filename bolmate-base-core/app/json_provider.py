@@ -0,0 +1,94 @@
+"""Fast JSON encoding for API responses.
+
+``OrjsonProvider`` replaces Flask's ``json`` provider: responses are encoded
+straight to bytes by orjson, which serializes ``datetime``/``date`` values as
+ISO 8601 natively, so serializers can return them without ``isoformat()``.
+orjson is optional; without it the standard library provider is used with the
+same ISO 8601 date format.
+
+``rows_to_dicts`` turns column-only query rows into response objects without
+building ORM instances.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import decimal
+import uuid
+from datetime import date
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Sequence, cast
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+orjson: ModuleType | None
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _orjson() -> ModuleType:
+    if orjson is None:  # pragma: no cover - only selected when installed
+        raise RuntimeError("orjson is not installed")
+    return orjson
+
+
+def _default(value: Any) -> Any:
+    """Fallback for types neither encoder handles natively."""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """Standard library provider emitting ISO 8601 dates like orjson does."""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson.
+
+    Calls with formatting options (``indent``, ``sort_keys``, ...) are passed
+    to the standard library encoder, which orjson does not mirror.
+    """
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return _orjson().dumps(obj, default=_default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return _orjson().loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        body = _orjson().dumps(obj, default=_default, option=ORJSON_OPTIONS)
+        # Typed as the sans-IO base on the app; it is a full ``flask.Response``
+        response_class = cast("type[Response]", self._app.response_class)
+        return response_class(body, mimetype=self.mimetype)
+
+
+def json_provider_class() -> type[DefaultJSONProvider]:
+    return OrjsonProvider if orjson is not None else IsoJSONProvider
+
+
+def rows_to_dicts(
+    keys: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> List[Dict[str, Any]]:
+    """Map column-only query rows (tuples) to dicts keyed by ``keys``."""
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,334 @@
+"""In-process Prometheus metrics and the ``/metrics`` endpoint.
+
+Counters and histograms are kept per worker process and rendered in the
+Prometheus text exposition format; scrape every worker (or run a single
+one) to see the whole picture.  Instrumented here:
+
+* HTTP request latency per blueprint, endpoint, method and status;
+* SQL statement counts and durations per endpoint, from engine events;
+* connection pool gauges;
+* OpenAI call latency, tokens and errors per ``openai_service`` operation;
+* cache lookups (hits and misses) per cache.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+
+from app.db import session as db_session
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        return "\n".join([*header, *self.samples()])
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, *args: Any, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return int(state[-1]) if state else 0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in values:
+            cumulative = 0
+            for bound, hits in zip(self.buckets, state):
+                cumulative += int(hits)
+                le = f'le="{_number(bound)}"'
+                yield (
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} "
+                    f"{cumulative}"
+                )
+            labels = _labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_number(float(state[-2]))}"
+            yield f"{self.name}_count{labels} {int(state[-1])}"
+
+
+class Gauge(_Metric):
+    """Gauge read from ``callback`` at scrape time: ``{label values: value}``."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        *args: Any,
+        callback: Callable[[], Dict[LabelValues, float]],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self._callback = callback
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._callback().items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+REGISTRY: List[_Metric] = []
+_instrumented_engines: weakref.WeakSet = weakref.WeakSet()
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response, by blueprint and endpoint.",
+    ("blueprint", "endpoint", "method", "status"),
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time, by endpoint and statement type.",
+    ("endpoint", "statement"),
+    buckets=DB_BUCKETS,
+)
+OPENAI_LATENCY = Histogram(
+    "openai_request_duration_seconds",
+    "OpenAI chat completion latency, by operation and outcome.",
+    ("operation", "model", "outcome"),
+)
+OPENAI_TOKENS = Histogram(
+    "openai_tokens",
+    "Tokens per OpenAI call, by operation and kind (prompt/completion/cached).",
+    ("operation", "kind"),
+    buckets=TOKEN_BUCKETS,
+)
+OPENAI_ERRORS = Counter(
+    "openai_errors_total",
+    "Failed OpenAI calls, by operation and exception type.",
+    ("operation", "error"),
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss).",
+    ("cache", "result"),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_openai_call(
+    operation: str,
+    model: str,
+    seconds: float,
+    usage: Any = None,
+    error: BaseException | None = None,
+) -> None:
+    """Record one chat completion; ``usage`` is the response's ``usage``."""
+    OPENAI_LATENCY.observe(
+        seconds, operation=operation, model=model, outcome="error" if error else "ok"
+    )
+    if error is not None:
+        OPENAI_ERRORS.inc(operation=operation, error=type(error).__name__)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    for kind, tokens in (
+        ("prompt", getattr(usage, "prompt_tokens", None)),
+        ("completion", getattr(usage, "completion_tokens", None)),
+        ("cached", getattr(details, "cached_tokens", None)),
+    ):
+        if tokens is not None:
+            OPENAI_TOKENS.observe(tokens, operation=operation, kind=kind)
+
+
+def _endpoint() -> str:
+    if has_request_context() and request.url_rule:
+        return request.url_rule.rule
+    return "-"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every SQL statement executed on ``engine``."""
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        started = conn.info["query_start"].pop()
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement else "-"
+        DB_QUERY_LATENCY.observe(
+            time.perf_counter() - started, endpoint=_endpoint(), statement=verb
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context: ExceptionContext) -> None:
+        if context.connection is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
+
+
+def _pool_stats() -> Dict[LabelValues, float]:
+    pool = db_session.engine.pool
+    stats: Dict[LabelValues, float] = {}
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        # Only ``QueuePool`` reports all of them
+        reader = getattr(pool, state, None)
+        if callable(reader):
+            stats[(state,)] = reader()
+    return stats
+
+
+DB_POOL = Gauge(
+    "db_pool_connections",
+    "Connection pool state (size, checkedin, checkedout, overflow).",
+    ("state",),
+    callback=_pool_stats,
+)
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def init_app(app: Flask) -> None:
+    """Time requests and serve the metrics at ``/metrics``."""
+
+    @app.before_request
+    def _start_timer() -> None:
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response: Response) -> Response:
+        started = g.pop("request_started", None)
+        if started is not None and request.endpoint != "metrics":
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started,
+                blueprint=request.blueprint or "-",
+                endpoint=request.url_rule.rule if request.url_rule else "-",
+                method=request.method,
+                status=str(response.status_code),
+            )
+        return response
+
+    app.add_url_rule(
+        "/metrics",
+        "metrics",
+        lambda: Response(render(), content_type=CONTENT_TYPE),
+    )
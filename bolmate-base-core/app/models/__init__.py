@@ -1,6 +1,38 @@
 from app.db.session import Base
-from app.models.flashcard import Flashcard
+from app.models.admission import AISlotLease, RateLimitBucket
+from app.models.collection_version import (
+    CollectionVersion,
+    bump_collection_version,
+    get_collection_version,
+)
+from app.models.extraction import DocumentInterpretation, ExtractedDocument
+from app.models.flashcard import (
+    Flashcard,
+    FlashcardImportRow,
+    FlashcardTombstone,
+    FlashcardTranslation,
+)
+from app.models.idempotency import IdempotencyKey
 from app.models.quiz import Quiz, QuizItem
+from app.models.usage import OpenAIUsage
 from app.models.user import User
 
-__all__ = ["Base", "User", "Flashcard", "Quiz", "QuizItem"]
+__all__ = [
+    "Base",
+    "User",
+    "Flashcard",
+    "FlashcardTranslation",
+    "FlashcardTombstone",
+    "FlashcardImportRow",
+    "Quiz",
+    "QuizItem",
+    "ExtractedDocument",
+    "DocumentInterpretation",
+    "OpenAIUsage",
+    "RateLimitBucket",
+    "AISlotLease",
+    "IdempotencyKey",
+    "CollectionVersion",
+    "bump_collection_version",
+    "get_collection_version",
+]
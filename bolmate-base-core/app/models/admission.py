@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, Float, Index, String
+
+from app.db.session import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket of one client, for the shared (PostgreSQL) admission mode.
+
+    ``tokens`` is the level at ``updated_at``; refills are computed on read.
+    """
+
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(80), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class AISlotLease(Base):
+    """In-flight AI request holding one of the shared concurrency slots.
+
+    Leases expire so slots held by a crashed worker come back on their own.
+    """
+
+    __tablename__ = "ai_slot_leases"
+    __table_args__ = (Index("ix_ai_slot_leases_expires_at", "expires_at"),)
+
+    id = Column(String(36), primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    String,
+    event,
+    func,
+    literal,
+    select,
+)
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+from sqlalchemy.sql import ClauseElement, Select
+
+from app.db.session import Base
+from app.models.flashcard import Flashcard, FlashcardTombstone, FlashcardTranslation
+
+
+class CollectionVersion(Base):
+    """Change counter of a collection, bumped in the writing transaction.
+
+    Conditional GETs compare against ``version`` / ``updated_at`` instead of
+    loading the collection rows.  The bump takes a row lock held until
+    commit, so versions are handed out in commit order and can serve as the
+    delta sync cursor (``Flashcard.change_seq``).
+    """
+
+    __tablename__ = "collection_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Models whose writes change a collection's representation.  Every write to
+# them, quiz answer counters included (the responses carry them), takes the
+# collection's version row lock until commit, so writes to one collection are
+# serialized.  That is a known write-throughput cost, accepted so that ETags
+# and the change feed never miss a change.
+TRACKED_COLLECTIONS = {
+    Flashcard: "flashcards",
+    FlashcardTranslation: "flashcards",
+}
+
+
+def get_collection_version(
+    session: Session, name: str
+) -> Tuple[int, datetime | None]:
+    """Return ``(version, updated_at)`` of ``name``; ``(0, None)`` if unseen."""
+    table = CollectionVersion.__table__
+    row = session.execute(
+        select(table.c.version, table.c.updated_at).where(table.c.name == name)
+    ).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def bump_collection_version(session: Session, name: str) -> int:
+    """Increment ``name`` within the session's current transaction.
+
+    Returns the new version.
+    """
+    table = CollectionVersion.__table__
+    connection = session.connection()
+    result = connection.execute(
+        table.update()
+        .where(table.c.name == name)
+        .values(version=table.c.version + 1, updated_at=func.now())
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(name=name, version=1))
+    return connection.execute(
+        select(table.c.version).where(table.c.name == name)
+    ).scalar()
+
+
+def _touch_cards(
+    session: Session, card_ids: Iterable[int] | Select, version: int
+) -> None:
+    cards = Flashcard.__table__
+    session.connection().execute(
+        cards.update().where(cards.c.id.in_(card_ids)).values(change_seq=version)
+    )
+
+
+def _where(query: Select, whereclause: ClauseElement | None) -> Select:
+    return query if whereclause is None else query.where(whereclause)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_flush(
+    session: Session, flush_context: UOWTransaction, instances: Any
+) -> None:
+    changed: Dict[str, List[Any]] = {}
+    for obj in (*session.new, *session.deleted, *session.dirty):
+        name = TRACKED_COLLECTIONS.get(type(obj))
+        if name and (obj not in session.dirty or session.is_modified(obj)):
+            changed.setdefault(name, []).append(obj)
+    for name in sorted(changed):
+        version = bump_collection_version(session, name)
+        translated_cards: Set[int] = set()
+        for obj in changed[name]:
+            if isinstance(obj, FlashcardTranslation):
+                if obj.flashcard_id is not None:
+                    translated_cards.add(obj.flashcard_id)
+            elif obj in session.deleted:
+                session.add(FlashcardTombstone(flashcard_id=obj.id, change_seq=version))
+            else:
+                obj.change_seq = version
+        if translated_cards:
+            # A translation changes how its card reads in that language
+            _touch_cards(session, translated_cards, version)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk_write(orm_execute_state: ORMExecuteState) -> Result | None:
+    # Query.update() / Query.delete() bypass the flush
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    name = mapper is not None and TRACKED_COLLECTIONS.get(mapper.class_)
+    if not name:
+        return None
+    session = orm_execute_state.session
+    statement = orm_execute_state.statement
+    version = bump_collection_version(session, name)
+
+    if mapper.class_ is FlashcardTranslation:
+        translations = FlashcardTranslation.__table__
+        _touch_cards(
+            session,
+            _where(select(translations.c.flashcard_id), statement.whereclause),
+            version,
+        )
+    elif orm_execute_state.is_update:
+        return orm_execute_state.invoke_statement(
+            statement=statement.values(change_seq=version)
+        )
+    else:
+        cards = Flashcard.__table__
+        tombstones = FlashcardTombstone.__table__
+        session.connection().execute(
+            tombstones.insert().from_select(
+                ["flashcard_id", "change_seq"],
+                _where(select(cards.c.id, literal(version)), statement.whereclause),
+            )
+        )
+    return None
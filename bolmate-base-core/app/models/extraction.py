@@ -0,0 +1,57 @@
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
+
+from app.db.session import Base
+
+
+class ExtractedDocument(Base):
+    """Uploaded document addressed by the SHA-256 of its bytes."""
+
+    __tablename__ = "extracted_documents"
+    __table_args__ = (Index("ix_extracted_documents_last_used_at", "last_used_at"),)
+
+    sha256 = Column(String(64), primary_key=True)
+    filename = Column(String(255), nullable=True)
+    mime_type = Column(String(255), nullable=True)
+    # NULL for uploads without a text layer (images go straight to Vision)
+    text = Column(Text, nullable=True)
+    # [word, translation, translation language or null] rows of vocabulary
+    # tables found in the document
+    table_pairs = Column(JSON, nullable=True)
+    # Stored text plus serialized interpretations, used for eviction
+    size_bytes = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DocumentInterpretation(Base):
+    """Interpreted vocabulary of a stored document for one native language."""
+
+    __tablename__ = "document_interpretations"
+    __table_args__ = (
+        Index(
+            "ix_document_interpretations_document_language",
+            "document_sha256",
+            "native_language",
+            unique=True,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    document_sha256 = Column(
+        String(64),
+        ForeignKey("extracted_documents.sha256", ondelete="CASCADE"),
+        nullable=False,
+    )
+    native_language = Column(String(10), nullable=False)
+    items = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,8 +1,10 @@
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -36,3 +38,70 @@ class Flashcard(Base):
     correct_count = Column(Integer, default=0, nullable=False)
     incorrect_count = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+    # "flashcards" collection version of the last write, the delta sync cursor
+    change_seq = Column(BigInteger, nullable=False, default=0, index=True)
+
+
+class FlashcardTombstone(Base):
+    """Record of a deleted flashcard for the delta sync change feed."""
+
+    __tablename__ = "flashcard_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    flashcard_id = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class FlashcardImportRow(Base):
+    """Staging row of a file import, loaded with ``COPY`` and merged in SQL.
+
+    The table is ``UNLOGGED`` in PostgreSQL (see its migration): rows live
+    only for the duration of one import transaction.
+    """
+
+    __tablename__ = "flashcard_import_rows"
+
+    import_id = Column(String(36), primary_key=True)
+    line = Column(BigInteger, primary_key=True)
+    source_word = Column(String(255), nullable=False)
+    translated_word = Column(String(255), nullable=False)
+    source_language = Column(String(10), nullable=False)
+    native_language = Column(String(10), nullable=False)
+    example_sentence = Column(String(512), nullable=True)
+    example_sentence_translated = Column(String(512), nullable=True)
+    difficulty_level = Column(String(10), nullable=True)
+
+
+class FlashcardTranslation(Base):
+    """Translation of a flashcard into a language other than its own.
+
+    The flashcard row keeps the translation it was created with; this table
+    holds every additional learner language so switching languages is a
+    read-time join instead of rewriting (and re-translating) the deck.
+    """
+
+    __tablename__ = "flashcard_translations"
+    __table_args__ = (
+        Index(
+            "ix_flashcard_translations_card_language",
+            "flashcard_id",
+            "language",
+            unique=True,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    flashcard_id = Column(
+        Integer, ForeignKey("flashcards.id", ondelete="CASCADE"), nullable=False
+    )
+    language = Column(String(10), nullable=False)
+    translated_word = Column(String(255), nullable=False)
+    example_sentence_translated = Column(String(512), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String
+
+from app.db.session import Base
+
+
+class IdempotencyKey(Base):
+    """Request made with an ``Idempotency-Key`` and, once done, its response.
+
+    Rows without ``response_status`` are still in flight; their owner holds
+    them until ``locked_until``, after which a retry may take over.  Rows are
+    kept until ``expires_at``.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    client = Column(String(80), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # SHA-256 of the endpoint and request body the key was first used with
+    fingerprint = Column(String(64), nullable=False)
+    response_status = Column(Integer, nullable=True)
+    response_mimetype = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
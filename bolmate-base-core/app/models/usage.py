@@ -0,0 +1,30 @@
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String
+
+from app.db.session import Base
+
+
+class OpenAIUsage(Base):
+    """One OpenAI operation (or response-cache hit) in the usage ledger.
+
+    Rows are written in batches by ``app.services.usage_ledger``; cache hits
+    carry no tokens but show how much each cache saves.
+    """
+
+    __tablename__ = "openai_usage"
+    __table_args__ = (
+        Index("ix_openai_usage_created_at", "created_at"),
+        Index("ix_openai_usage_operation_created_at", "operation", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    operation = Column(String(50), nullable=False)
+    client = Column(String(64), nullable=False)
+    language = Column(String(10), nullable=True)
+    model = Column(String(50), nullable=True)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cached_tokens = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Integer, nullable=False, default=0)
+    cache_hit = Column(Boolean, nullable=False, default=False)
+    error = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
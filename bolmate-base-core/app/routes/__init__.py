@@ -5,6 +5,7 @@ from app.routes.health import health_bp
 from app.routes.interpret import interpret_bp
 from app.routes.languages import languages_bp
 from app.routes.quiz import quiz_bp
+from app.routes.usage import usage_bp
 from app.routes.users import users_bp
 
 
@@ -15,6 +16,7 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(quiz_bp, url_prefix="/api")
     app.register_blueprint(interpret_bp, url_prefix="/api")
     app.register_blueprint(languages_bp, url_prefix="/api")
+    app.register_blueprint(usage_bp, url_prefix="/api")
 
 
 __all__ = ["register_blueprints"]
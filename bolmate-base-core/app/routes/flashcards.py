@@ -1,43 +1,186 @@
-from flask import Blueprint, jsonify, request
+import zipfile
+from typing import Any, Dict, Sequence
+
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+)
 from pydantic import ValidationError
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, tuple_
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
+from app.conditional import make_etag, not_modified, with_validators
 from app.db.session import SessionLocal
-from app.models import Flashcard
+from app.deadlines import DeadlineExceeded
+from app.json_provider import rows_to_dicts
+from app.models import (
+    Flashcard,
+    FlashcardTombstone,
+    FlashcardTranslation,
+    QuizItem,
+    get_collection_version,
+)
 from app.schemas.flashcard import (
     BulkCreateFlashcardsRequest,
+    BulkDeleteFlashcardsRequest,
+    BulkUpdateFlashcardsRequest,
     CreateFlashcardRequest,
     EnrichFlashcardsRequest,
 )
+from app.services.deck_formats import detect_format
+from app.services.difficulty import estimate_difficulty
+from app.services.flashcard_export import (
+    EXPORT_MIME_TYPES,
+    export_rows,
+    iter_apkg,
+    iter_csv,
+    iter_ndjson,
+)
+from app.services.flashcard_import import import_deck, ingest_ndjson
 from app.services.openai_service import enrich_flashcards
 from config import get_settings
 
 flashcards_bp = Blueprint("flashcards", __name__)
 
+CHANGES_PAGE_SIZE = 500
+CHANGES_MAX_PAGE_SIZE = 5000
+# Columns of ``uq_flashcard_source`` and columns that may not be cleared
+UNIQUE_FIELDS = ("source_word", "source_language", "native_language")
+NDJSON_MIME_TYPES = ("application/x-ndjson", "application/jsonl")
+NOT_NULL_FIELDS = (
+    "source_word",
+    "source_language",
+    "translated_word",
+    "native_language",
+    "is_manual",
+)
+
 
-def _serialize_flashcard(card: Flashcard) -> dict:
+def _serialize_flashcard(
+    card: Flashcard, translation: FlashcardTranslation | None = None
+) -> dict:
+    """Serialize a card, viewed through ``translation`` when one is given."""
+    if translation is not None:
+        translated_word = translation.translated_word
+        native_language = translation.language
+        example_translated = translation.example_sentence_translated
+    else:
+        translated_word = card.translated_word
+        native_language = card.native_language
+        example_translated = card.example_sentence_translated
     return {
         "id": card.id,
         "source_word": card.source_word,
         "source_language": card.source_language,
-        "translated_word": card.translated_word,
-        "native_language": card.native_language,
+        "translated_word": translated_word,
+        "native_language": native_language,
         "example_sentence": card.example_sentence,
-        "example_sentence_translated": card.example_sentence_translated,
+        "example_sentence_translated": example_translated,
         "difficulty_level": card.difficulty_level,
         "is_manual": card.is_manual,
         "correct_count": card.correct_count,
         "incorrect_count": card.incorrect_count,
-        "created_at": card.created_at.isoformat() if card.created_at else None,
+        # Encoded as ISO 8601 by the app JSON provider
+        "created_at": card.created_at,
     }
 
 
+FLASHCARD_KEYS = (
+    "id",
+    "source_word",
+    "source_language",
+    "translated_word",
+    "native_language",
+    "example_sentence",
+    "example_sentence_translated",
+    "difficulty_level",
+    "is_manual",
+    "correct_count",
+    "incorrect_count",
+    "created_at",
+)
+
+
+def _flashcard_columns(translated: bool = False) -> tuple:
+    """Columns of ``_serialize_flashcard`` in ``FLASHCARD_KEYS`` order.
+
+    Used for list queries that return plain row tuples instead of ORM
+    instances.  With ``translated`` the word columns come from the translation
+    joined by ``_query_with_language`` when there is one.
+    """
+    translated_word = Flashcard.translated_word
+    native_language = Flashcard.native_language
+    example_translated = Flashcard.example_sentence_translated
+    if translated:
+        has_translation = FlashcardTranslation.id.isnot(None)
+        translated_word = case(
+            (has_translation, FlashcardTranslation.translated_word),
+            else_=translated_word,
+        )
+        native_language = case(
+            (has_translation, FlashcardTranslation.language), else_=native_language
+        )
+        example_translated = case(
+            (has_translation, FlashcardTranslation.example_sentence_translated),
+            else_=example_translated,
+        )
+    return (
+        Flashcard.id,
+        Flashcard.source_word,
+        Flashcard.source_language,
+        translated_word,
+        native_language,
+        Flashcard.example_sentence,
+        example_translated,
+        Flashcard.difficulty_level,
+        Flashcard.is_manual,
+        Flashcard.correct_count,
+        Flashcard.incorrect_count,
+        Flashcard.created_at,
+    )
+
+
+def _query_with_language(session, language: str, entities: tuple | None = None):
+    """Query ``(Flashcard, FlashcardTranslation | None)`` rows for ``language``.
+
+    Cards whose own native language already matches, or that have not been
+    translated into ``language`` yet, get ``None`` and are served from the
+    card row itself.  ``entities`` replaces the selected pair, e.g. with
+    ``_flashcard_columns(translated=True)``.
+    """
+    language = language.strip().lower()
+    return session.query(*(entities or (Flashcard, FlashcardTranslation))).outerjoin(
+        FlashcardTranslation,
+        and_(
+            FlashcardTranslation.flashcard_id == Flashcard.id,
+            FlashcardTranslation.language == language,
+            func.lower(Flashcard.native_language) != language,
+        ),
+    )
+
+
 @flashcards_bp.get("/flashcards")
 def list_flashcards():
+    language = request.args.get("native_language")
     session = SessionLocal()
     try:
-        query = session.query(Flashcard).order_by(Flashcard.id.desc())
+        version, updated_at = get_collection_version(session, "flashcards")
+        etag = make_etag("flashcards", version)
+        cached = not_modified(etag, updated_at)
+        if cached:
+            return cached
+
+        # Select plain columns: no ORM instances are built for the list
+        query = (
+            _query_with_language(session, language, _flashcard_columns(translated=True))
+            if language
+            else session.query(*_flashcard_columns())
+        ).order_by(Flashcard.id.desc())
         source_language = request.args.get("source_language")
         difficulty = request.args.get("difficulty_level")
         if source_language:
@@ -46,12 +189,121 @@ def list_flashcards():
             )
         if difficulty:
             query = query.filter(Flashcard.difficulty_level == difficulty)
-        cards = query.all()
-        return jsonify([_serialize_flashcard(card) for card in cards])
+        response = jsonify(rows_to_dicts(FLASHCARD_KEYS, query.all()))
+        return with_validators(response, etag, updated_at)
+    finally:
+        session.close()
+
+
+@flashcards_bp.get("/flashcards/changes")
+def list_flashcard_changes():
+    """Delta sync: cards changed and ids deleted since the ``since`` cursor.
+
+    Clients pass the ``cursor`` of their previous response (``0`` for a full
+    sync) and keep paging while ``has_more`` is true.
+    """
+    try:
+        since = int(request.args.get("since", 0))
+        limit = int(request.args.get("limit", CHANGES_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "since and limit must be integers"}), 400
+    if since < 0 or limit < 1:
+        return jsonify({"error": "since must be >= 0 and limit >= 1"}), 400
+    limit = min(limit, CHANGES_MAX_PAGE_SIZE)
+
+    language = request.args.get("native_language")
+    session = SessionLocal()
+    try:
+        version, _ = get_collection_version(session, "flashcards")
+        if since > version:
+            return jsonify({"error": "Unknown cursor, sync again from 0"}), 410
+
+        # A full sync also returns cards never stamped with a version
+        after = since if since else -1
+        seqs = [
+            seq
+            for (seq,) in session.query(Flashcard.change_seq)
+            .filter(Flashcard.change_seq > after)
+            .order_by(Flashcard.change_seq.asc())
+            .limit(limit + 1)
+        ]
+        # Pages end on a version boundary so one write is never split; a
+        # single write larger than ``limit`` is returned whole.
+        upto = version
+        if len(seqs) > limit:
+            upto = seqs[limit] - 1 if seqs[0] < seqs[limit] else seqs[limit]
+            # Unstamped cards go out with the first version so the cursor
+            # always moves past them
+            upto = max(upto, min(version, 1))
+
+        query = (
+            _query_with_language(session, language, _flashcard_columns(translated=True))
+            if language
+            else session.query(*_flashcard_columns())
+        )
+        rows = (
+            query.filter(Flashcard.change_seq > after, Flashcard.change_seq <= upto)
+            .order_by(Flashcard.change_seq.asc(), Flashcard.id.asc())
+            .all()
+        )
+        deleted = [
+            card_id
+            for (card_id,) in session.query(FlashcardTombstone.flashcard_id)
+            .filter(
+                FlashcardTombstone.change_seq > since,
+                FlashcardTombstone.change_seq <= upto,
+            )
+            .order_by(FlashcardTombstone.change_seq.asc())
+        ]
+        return jsonify(
+            {
+                "changed": rows_to_dicts(FLASHCARD_KEYS, rows),
+                "deleted": deleted,
+                "cursor": upto,
+                "has_more": upto < version,
+            }
+        )
     finally:
         session.close()
 
 
+@flashcards_bp.get("/flashcards/export")
+def export_flashcards():
+    """Stream the deck as ``csv``, ``ndjson`` or an Anki ``apkg`` download.
+
+    Cards are grouped by language pair: a ``deck`` field per NDJSON line, the
+    language columns in CSV and one Anki deck per pair in the package.
+    ``source_language`` / ``native_language`` narrow the export to one pair.
+    """
+    export_format = request.args.get("format", "csv").lower()
+    if export_format not in EXPORT_MIME_TYPES:
+        return jsonify({"error": "format must be one of: csv, ndjson, apkg"}), 400
+    source_language = request.args.get("source_language")
+    native_language = request.args.get("native_language")
+    dumps = current_app.json.dumps
+
+    def generate():
+        session = SessionLocal()
+        try:
+            rows = export_rows(session, source_language, native_language)
+            if export_format == "csv":
+                yield from iter_csv(rows)
+            elif export_format == "ndjson":
+                yield from iter_ndjson(rows, dumps)
+            else:
+                yield from iter_apkg(rows)
+        finally:
+            session.close()
+
+    response = Response(
+        stream_with_context(generate()), mimetype=EXPORT_MIME_TYPES[export_format]
+    )
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=flashcards.{export_format}"
+    )
+    return response
+
+
 @flashcards_bp.post("/flashcards")
 def create_flashcard():
     try:
@@ -75,7 +327,8 @@ def create_flashcard():
             native_language=native_language,
             source_language=source_language,
             is_manual=data.is_manual if data.is_manual is not None else True,
-            difficulty_level=data.difficulty_level,
+            difficulty_level=data.difficulty_level
+            or estimate_difficulty(source_word, source_language),
             example_sentence=data.example_sentence,
             example_sentence_translated=data.example_sentence_translated,
         )
@@ -95,12 +348,27 @@ def create_flashcard():
 
 @flashcards_bp.get("/flashcards/<int:card_id>")
 def get_flashcard(card_id: int):
+    language = request.args.get("native_language")
     session = SessionLocal()
     try:
-        card = session.query(Flashcard).get(card_id)
-        if not card:
+        version, updated_at = get_collection_version(session, "flashcards")
+        etag = make_etag("flashcard", card_id, version)
+        cached = not_modified(etag, updated_at)
+        if cached:
+            return cached
+
+        if language:
+            row = (
+                _query_with_language(session, language)
+                .filter(Flashcard.id == card_id)
+                .first()
+            )
+        else:
+            card = session.query(Flashcard).get(card_id)
+            row = (card, None) if card else None
+        if not row:
             return jsonify({"error": "Flashcard not found"}), 404
-        return jsonify(_serialize_flashcard(card))
+        return with_validators(jsonify(_serialize_flashcard(*row)), etag, updated_at)
     finally:
         session.close()
 
@@ -146,6 +414,9 @@ def delete_flashcard(card_id: int):
         card = session.query(Flashcard).get(card_id)
         if not card:
             return jsonify({"error": "Flashcard not found"}), 404
+        session.query(FlashcardTranslation).filter(
+            FlashcardTranslation.flashcard_id == card_id
+        ).delete(synchronize_session=False)
         session.delete(card)
         session.commit()
         return jsonify({"status": "deleted"})
@@ -202,7 +473,8 @@ def bulk_create_flashcards():
                     native_language=native_language,
                     source_language=source_language,
                     is_manual=item.is_manual if item.is_manual is not None else False,
-                    difficulty_level=item.difficulty_level,
+                    difficulty_level=item.difficulty_level
+                    or estimate_difficulty(source_word, source_language),
                     example_sentence=item.example_sentence,
                     example_sentence_translated=item.example_sentence_translated,
                 )
@@ -229,6 +501,9 @@ def bulk_create_flashcards():
             ),
             201,
         )
+    except DeadlineExceeded:
+        session.rollback()
+        raise
     except Exception as e:
         session.rollback()
         return jsonify({"error": f"Bulk creation failed: {str(e)}"}), 500
@@ -236,6 +511,251 @@ def bulk_create_flashcards():
         session.close()
 
 
+def _bulk_criteria(data: BulkDeleteFlashcardsRequest) -> list:
+    """WHERE criteria for the ``ids`` or ``filter`` of a bulk request."""
+    if data.ids is not None:
+        return [Flashcard.id.in_(data.ids)]
+    selected = data.filter
+    # The schema requires exactly one of ``ids`` and ``filter``
+    assert selected is not None
+    criteria = []
+    for field in ("source_language", "native_language"):
+        value = (getattr(selected, field) or "").strip()
+        if value:
+            column = getattr(Flashcard, field)
+            criteria.append(func.lower(column) == value.lower())
+    if selected.difficulty_level:
+        criteria.append(Flashcard.difficulty_level == selected.difficulty_level)
+    if selected.is_manual is not None:
+        criteria.append(Flashcard.is_manual.is_(selected.is_manual))
+    if selected.created_before:
+        criteria.append(Flashcard.created_at < selected.created_before)
+    if selected.created_after:
+        criteria.append(Flashcard.created_at > selected.created_after)
+    return criteria
+
+
+def _missing_ids(data: BulkDeleteFlashcardsRequest, found: set) -> list:
+    return [
+        {"id": card_id, "error": "Flashcard not found"}
+        for card_id in dict.fromkeys(data.ids or [])
+        if card_id not in found
+    ]
+
+
+def _unique_key_conflicts(
+    session: Session, rows: Sequence[Any], values: Dict[str, Any]
+) -> Dict[int, str]:
+    """Map card id -> reason for updates that would break ``uq_flashcard_source``.
+
+    Among selected cards that would end up with the same key the lowest id
+    wins; cards outside the selection always keep theirs.
+    """
+    owners: Dict[tuple, int] = {}
+    conflicts: Dict[int, str] = {}
+    for row in sorted(rows, key=lambda row: row.id):
+        key = tuple(values.get(field, getattr(row, field)) for field in UNIQUE_FIELDS)
+        owner = owners.setdefault(key, row.id)
+        if owner != row.id:
+            conflicts[row.id] = f"Would duplicate flashcard {owner}"
+
+    columns = [getattr(Flashcard, field) for field in UNIQUE_FIELDS]
+    existing = session.query(Flashcard.id, *columns).filter(
+        tuple_(*columns).in_(list(owners)),
+        Flashcard.id.notin_([row.id for row in rows]),
+    )
+    for row in existing:
+        owner = owners[tuple(row[1:])]
+        conflicts[owner] = f"Flashcard {row.id} already exists for this language pair"
+    return conflicts
+
+
+@flashcards_bp.patch("/flashcards/bulk")
+def bulk_update_flashcards():
+    """Apply the same changes to many flashcards with one ``UPDATE``."""
+    try:
+        payload = request.get_json(silent=True) or {}
+        data = BulkUpdateFlashcardsRequest(**payload)
+    except ValidationError as e:
+        details = e.errors(include_url=False, include_context=False)
+        return jsonify({"error": "Invalid request data", "details": details}), 400
+
+    values = data.changes.model_dump(exclude_unset=True)
+    for field, value in values.items():
+        if isinstance(value, str):
+            values[field] = value.strip()
+    nulls = [
+        field
+        for field in NOT_NULL_FIELDS
+        if field in values and values[field] in (None, "")
+    ]
+    if nulls:
+        return (
+            jsonify({"error": f"Fields cannot be empty: {', '.join(nulls)}"}),
+            400,
+        )
+
+    criteria = _bulk_criteria(data)
+    if not criteria:
+        return jsonify({"error": "The selection matches every flashcard"}), 400
+
+    session = SessionLocal()
+    try:
+        changes_key = any(field in values for field in UNIQUE_FIELDS)
+        columns = [getattr(Flashcard, field) for field in UNIQUE_FIELDS]
+        rows = (
+            session.query(Flashcard.id, *(columns if changes_key else []))
+            .filter(*criteria)
+            .with_for_update()
+            .all()
+        )
+        found = {row.id for row in rows}
+        conflicts = _missing_ids(data, found)
+        blocked = _unique_key_conflicts(session, rows, values) if changes_key else {}
+        conflicts.extend(
+            {"id": card_id, "error": reason} for card_id, reason in blocked.items()
+        )
+
+        updated = sorted(found - set(blocked))
+        if updated:
+            session.query(Flashcard).filter(Flashcard.id.in_(updated)).update(
+                values, synchronize_session=False
+            )
+        session.commit()
+        return jsonify(
+            {
+                "updated": updated,
+                "updated_count": len(updated),
+                "conflicts": conflicts,
+            }
+        )
+    except IntegrityError:
+        # Raced with a concurrent write despite the pre-check
+        session.rollback()
+        return (
+            jsonify({"error": "Flashcard already exists for this language pair."}),
+            409,
+        )
+    finally:
+        session.close()
+
+
+@flashcards_bp.delete("/flashcards/bulk")
+def bulk_delete_flashcards():
+    """Delete many flashcards with one ``DELETE``."""
+    try:
+        payload = request.get_json(silent=True) or {}
+        data = BulkDeleteFlashcardsRequest(**payload)
+    except ValidationError as e:
+        details = e.errors(include_url=False, include_context=False)
+        return jsonify({"error": "Invalid request data", "details": details}), 400
+    criteria = _bulk_criteria(data)
+    if not criteria:
+        return jsonify({"error": "The selection matches every flashcard"}), 400
+
+    session = SessionLocal()
+    try:
+        found = {
+            card_id
+            for (card_id,) in session.query(Flashcard.id)
+            .filter(*criteria)
+            .with_for_update()
+        }
+        conflicts = _missing_ids(data, found)
+        referenced = {
+            card_id
+            for (card_id,) in session.query(QuizItem.flashcard_id)
+            .filter(QuizItem.flashcard_id.in_(found))
+            .distinct()
+        }
+        conflicts.extend(
+            {"id": card_id, "error": "Flashcard is used by a saved quiz"}
+            for card_id in sorted(referenced)
+        )
+
+        deleted = sorted(found - referenced)
+        if deleted:
+            session.query(FlashcardTranslation).filter(
+                FlashcardTranslation.flashcard_id.in_(deleted)
+            ).delete(synchronize_session=False)
+            session.query(Flashcard).filter(Flashcard.id.in_(deleted)).delete(
+                synchronize_session=False
+            )
+        session.commit()
+        return jsonify(
+            {
+                "deleted": deleted,
+                "deleted_count": len(deleted),
+                "conflicts": conflicts,
+            }
+        )
+    finally:
+        session.close()
+
+
+@flashcards_bp.post("/flashcards/import")
+def import_flashcards():
+    """Import flashcards from NDJSON or an uploaded deck file.
+
+    An ``application/x-ndjson`` body (one JSON record per line) is answered
+    with NDJSON too: one progress line per written batch and a final
+    ``{"done": true, ...}`` summary.  A multipart ``file`` (CSV, TSV or Anki
+    ``.apkg``) is imported in one transaction and answered with its counts.
+    """
+    if request.mimetype == "multipart/form-data":
+        return _import_deck_file()
+    if request.mimetype not in NDJSON_MIME_TYPES:
+        return (
+            jsonify(
+                {"error": "Expected application/x-ndjson body or multipart deck file"}
+            ),
+            415,
+        )
+
+    def generate():
+        session = SessionLocal()
+        try:
+            for report in ingest_ndjson(session, request.stream):
+                yield current_app.json.dumps(report) + "\n"
+        except Exception as e:
+            session.rollback()
+            yield current_app.json.dumps({"error": f"Import failed: {e}"}) + "\n"
+        finally:
+            session.close()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _import_deck_file():
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"error": "No file provided"}), 400
+    deck_format = detect_format(upload.filename, request.form.get("format"))
+    if deck_format is None:
+        return (
+            jsonify({"error": "Unsupported deck format; expected csv, tsv or apkg"}),
+            400,
+        )
+
+    session = SessionLocal()
+    try:
+        result = import_deck(
+            session,
+            upload.stream,
+            deck_format,
+            source_language=request.form.get("source_language"),
+            native_language=request.form.get("native_language"),
+        )
+        return jsonify(result), 200
+    except (ValueError, zipfile.BadZipFile) as e:
+        return jsonify({"error": f"Invalid {deck_format} file: {e}"}), 400
+    except Exception as e:
+        session.rollback()
+        return jsonify({"error": f"Import failed: {e}"}), 500
+    finally:
+        session.close()
+
+
 @flashcards_bp.post("/flashcards/enrich")
 def enrich_existing_flashcards():
     try:
@@ -1,8 +1,16 @@
 from flask import Blueprint, jsonify
 
+from app.services.circuit_breaker import OPEN, breaker_states
+
 health_bp = Blueprint("health", __name__)
 
 
 @health_bp.get("/health")
 def healthcheck():
-    return jsonify({"status": "ok"}), 200
+    # Open circuits degrade AI features to local fallbacks, the API stays up
+    circuits = breaker_states()
+    degraded = any(circuit["state"] == OPEN for circuit in circuits.values())
+    return (
+        jsonify({"status": "degraded" if degraded else "ok", "circuits": circuits}),
+        200,
+    )
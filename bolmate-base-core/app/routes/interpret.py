@@ -4,12 +4,12 @@ import mimetypes
 from flask import Blueprint, jsonify, request
 from pydantic import ValidationError
 
+from app.db.session import SessionLocal
+from app.deadlines import DeadlineExceeded
 from app.schemas.interpret import InterpretRequest
-from app.services.openai_service import (
-    encode_file_to_base64,
-    interpret_file_with_ai,
-    interpret_text_with_ai,
-)
+from app.services.extraction_store import interpret_upload
+from app.services.openai_service import interpret_text_with_ai
+from app.uploads import find_oversized_upload
 from config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -47,21 +47,22 @@ def interpret_payload():
 
     # Handle files
     files = request.files.getlist("file")
+    oversized = find_oversized_upload(files)
+    if oversized:
+        return _file_too_large(oversized)
     results = []
-    for f in files:
-        content = f.read()
-        mime, _ = mimetypes.guess_type(f.filename)
-        if mime and mime.startswith("text"):
-            text = content.decode("utf-8", errors="ignore")
-            items = interpret_text_with_ai(text, native_language)
-            results.extend(items)
-        else:
-            encoded = encode_file_to_base64(content)
-            placeholder = interpret_text_with_ai(
-                f"Base64: {encoded[:800]}... Extract vocabulary and translations for learner native language {native_language}.",
-                native_language,
+    session = SessionLocal()
+    try:
+        for f in files:
+            filename = f.filename or "unknown"
+            mime, _ = mimetypes.guess_type(filename)
+            # Extract text (or OCR images) locally instead of prompting with
+            # a base64 prefix of the raw bytes.
+            results.extend(
+                interpret_upload(session, f.stream, filename, mime, native_language)
             )
-            results.extend(placeholder)
+    finally:
+        session.close()
 
     return jsonify({"items": results})
 
@@ -82,23 +83,32 @@ def interpret_file():
     files = request.files.getlist("files")
     if not files:
         return jsonify({"error": "No files provided"}), 400
+    oversized = find_oversized_upload(files)
+    if oversized:
+        return _file_too_large(oversized)
 
     all_items = []
-    for file in files:
-        try:
-            content = file.read()
-            filename = file.filename or "unknown"
-            mime_type, _ = mimetypes.guess_type(filename)
-
-            logger.info(f"Processing file: {filename} ({mime_type})")
-
-            items = interpret_file_with_ai(
-                content, filename, mime_type, native_language
-            )
-            all_items.extend(items)
-        except Exception as e:
-            logger.exception(f"Error processing file {file.filename}: {e}")
-            continue
+    session = SessionLocal()
+    try:
+        for file in files:
+            try:
+                filename = file.filename or "unknown"
+                mime_type, _ = mimetypes.guess_type(filename)
+
+                logger.info(f"Processing file: {filename} ({mime_type})")
+
+                items = interpret_upload(
+                    session, file.stream, filename, mime_type, native_language
+                )
+                all_items.extend(items)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                session.rollback()
+                logger.exception(f"Error processing file {file.filename}: {e}")
+                continue
+    finally:
+        session.close()
 
     # Deduplicate and merge items
     merged_items = _merge_and_deduplicate_items(all_items)
@@ -106,6 +116,19 @@ def interpret_file():
     return jsonify({"items": merged_items})
 
 
+def _file_too_large(file):
+    limit_mb = get_settings().max_upload_file_size / (1024 * 1024)
+    return (
+        jsonify(
+            {
+                "error": "File too large",
+                "details": f"'{file.filename}' exceeds the {limit_mb:g} MB limit",
+            }
+        ),
+        413,
+    )
+
+
 def _merge_and_deduplicate_items(items):
     """Merge duplicate words and aggregate similar forms."""
     seen = {}
@@ -1,8 +1,9 @@
 from flask import Blueprint, jsonify, request
 from pydantic import ValidationError
 
+from app.conditional import make_etag, not_modified, with_validators
 from app.db.session import SessionLocal
-from app.models import Flashcard
+from app.models import Flashcard, FlashcardTranslation
 from app.routes.flashcards import _serialize_flashcard
 from app.schemas.language import (
     SwitchLanguageMeta,
@@ -50,7 +51,12 @@ LANGUAGE_SWITCH_EXAMPLE = {
 
 @languages_bp.get("/languages")
 def list_languages():
-    return jsonify({"languages": SUPPORTED_LANGUAGES})
+    # The list is static: its ETag only changes with the code
+    etag = make_etag("languages", SUPPORTED_LANGUAGES)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return with_validators(jsonify({"languages": SUPPORTED_LANGUAGES}), etag)
 
 
 @languages_bp.post("/languages/switch")
@@ -85,71 +91,72 @@ def switch_language():
                 200,
             )
 
+        target_language = data.target_language.lower()
+        existing = {
+            translation.flashcard_id: translation
+            for translation in session.query(FlashcardTranslation).filter(
+                FlashcardTranslation.flashcard_id.in_([card.id for card in cards]),
+                FlashcardTranslation.language == target_language,
+            )
+        }
+
+        # Cards already in the target language are served from their own row;
+        # only languages never seen before for a card hit the translator.
         to_translate = [
             card
             for card in cards
-            if data.force_retranslate
-            or card.native_language.lower() != data.target_language.lower()
+            if card.native_language.lower() != target_language
+            and (data.force_retranslate or card.id not in existing)
         ]
 
-        translated_payload = translate_flashcards(
-            [_serialize_flashcard(card) for card in to_translate],
-            data.target_language,
+        translated_payload = (
+            translate_flashcards(
+                [_serialize_flashcard(card) for card in to_translate],
+                target_language,
+            )
+            if to_translate
+            else []
         )
         translated_by_id = {item.get("id"): item for item in translated_payload}
 
-        # Check if any cards would violate unique constraint
-        new_language_lower = data.target_language.lower()
-
-        for card in to_translate:
-            # Check for potential duplicates
-            existing = (
-                session.query(Flashcard)
-                .filter(
-                    Flashcard.source_word == card.source_word,
-                    Flashcard.source_language == card.source_language,
-                    Flashcard.native_language == new_language_lower,
-                    Flashcard.id != card.id,
-                )
-                .first()
-            )
-
-            if existing:
-                return (
-                    jsonify(
-                        {
-                            "error": "Cannot switch language - duplicate flashcard would be created",
-                            "details": f"Flashcard '{card.source_word}' already exists with target language '{new_language_lower}'",
-                        }
-                    ),
-                    409,
-                )
-
+        translated_count = 0
         for card in to_translate:
             payload = translated_by_id.get(card.id, {})
-            card.native_language = new_language_lower
-            card.translated_word = (
-                payload.get("translated_word") or card.translated_word
-            )
-            if payload.get("example_sentence") and not card.example_sentence:
-                card.example_sentence = payload["example_sentence"]
-            example_translation = payload.get("example_sentence_translated") or (
-                payload.get("example_sentence")
-                if not card.example_sentence_translated
-                else None
+            translated_word = (payload.get("translated_word") or "").strip()
+            if not payload.get("translated") or not translated_word:
+                # The translator fell back to the untouched card; storing it
+                # would cache the old language under the new code.
+                continue
+            translation = existing.get(card.id)
+            if translation is None:
+                translation = FlashcardTranslation(
+                    flashcard_id=card.id, language=target_language
+                )
+                session.add(translation)
+                existing[card.id] = translation
+            translation.translated_word = translated_word
+            translation.example_sentence_translated = payload.get(
+                "example_sentence_translated"
             )
-            if example_translation:
-                card.example_sentence_translated = example_translation
-            if payload.get("difficulty_level"):
-                card.difficulty_level = payload["difficulty_level"]
+            translated_count += 1
         session.commit()
 
         response = SwitchLanguageResponse(
-            flashcards=[_serialize_flashcard(card) for card in cards],
+            flashcards=[
+                _serialize_flashcard(
+                    card,
+                    (
+                        existing.get(card.id)
+                        if card.native_language.lower() != target_language
+                        else None
+                    ),
+                )
+                for card in cards
+            ],
             meta=SwitchLanguageMeta(
                 target_language=data.target_language,
-                translated_count=len(to_translate),
-                skipped_count=len(cards) - len(to_translate),
+                translated_count=translated_count,
+                skipped_count=len(cards) - translated_count,
                 force_retranslate=data.force_retranslate,
             ),
         )
@@ -2,10 +2,11 @@ import random
 
 from flask import Blueprint, jsonify, request
 from pydantic import ValidationError
-from sqlalchemy import func
+from sqlalchemy import func, or_
 
 from app.db.session import SessionLocal
-from app.models import Flashcard
+from app.models import Flashcard, FlashcardTranslation
+from app.routes.flashcards import _query_with_language, _serialize_flashcard
 from app.schemas.quiz import GenerateQuizRequest, SubmitQuizAnswerRequest
 from app.services.openai_service import (
     generate_hint_for_flashcard,
@@ -21,22 +22,30 @@ def get_quiz_question():
     target_language = request.args.get("target_language", "").strip().lower()
     session = SessionLocal()
     try:
-        query = session.query(Flashcard)
-
-        # Filtruj po target language (native_language w normalnym trybie)
-        if target_language:
-            if reverse:
+        translation = None
+        if target_language and not reverse:
+            # W normalnym trybie target language to native_language karty
+            # albo jedno z jej tłumaczeń
+            row = (
+                _query_with_language(session, target_language)
+                .filter(
+                    or_(
+                        func.lower(Flashcard.native_language) == target_language,
+                        FlashcardTranslation.id.isnot(None),
+                    )
+                )
+                .order_by(func.random())
+                .first()
+            )
+            card, translation = row if row else (None, None)
+        else:
+            query = session.query(Flashcard)
+            if target_language:
                 # W reverse mode target language jest w source_language
                 query = query.filter(
                     func.lower(Flashcard.source_language) == target_language
                 )
-            else:
-                # W normalnym trybie target language jest w native_language
-                query = query.filter(
-                    func.lower(Flashcard.native_language) == target_language
-                )
-
-        card = query.order_by(func.random()).first()
+            card = query.order_by(func.random()).first()
         if not card:
             return (
                 jsonify({"error": "No flashcards available for the selected language"}),
@@ -59,13 +68,14 @@ def get_quiz_question():
             )
         else:
             # Normalny kierunek: pytamy o source_word, odpowiedź w translated_word
+            serialized = _serialize_flashcard(card, translation)
             return jsonify(
                 {
                     "flashcard_id": card.id,
                     "source_word": card.source_word,
                     "source_language": card.source_language,
-                    "native_language": card.native_language,
-                    "translated_word": card.translated_word,
+                    "native_language": serialized["native_language"],
+                    "translated_word": serialized["translated_word"],
                     "correct_count": card.correct_count,
                     "incorrect_count": card.incorrect_count,
                     "is_reversed": False,
@@ -91,12 +101,27 @@ def submit_quiz_answer():
         if not card:
             return jsonify({"error": "Flashcard not found"}), 404
 
+        translated_word = card.translated_word
+        native_language = card.native_language
+        if (
+            data.native_language
+            and data.native_language.lower() != card.native_language.lower()
+        ):
+            translation = (
+                session.query(FlashcardTranslation)
+                .filter(
+                    FlashcardTranslation.flashcard_id == card.id,
+                    FlashcardTranslation.language == data.native_language.lower(),
+                )
+                .first()
+            )
+            if translation:
+                translated_word = translation.translated_word
+                native_language = translation.language
+
         # W reverse mode sprawdzamy source_word, w normalnym translated_word
-        correct_answer = (
-            ((card.source_word if reverse else card.translated_word) or "")
-            .strip()
-            .lower()
-        )
+        expected = card.source_word if reverse else translated_word
+        correct_answer = (expected or "").strip().lower()
         is_correct = answer == correct_answer
         if is_correct:
             card.correct_count += 1
@@ -105,13 +130,13 @@ def submit_quiz_answer():
         session.commit()
         hint = generate_hint_for_flashcard(
             card.source_word,
-            card.translated_word,
-            card.native_language,
+            translated_word,
+            native_language,
             card.source_language,
         )
         response = {
             "correct": is_correct,
-            "correctAnswer": card.source_word if reverse else card.translated_word,
+            "correctAnswer": expected,
             "stats": {
                 "correct_count": card.correct_count,
                 "incorrect_count": card.incorrect_count,
@@ -0,0 +1,38 @@
+from flask import Blueprint, jsonify, request
+from pydantic import ValidationError
+
+from app.db.session import SessionLocal
+from app.schemas.usage import UsageReportQuery
+from app.services.usage_ledger import LEDGER, usage_report
+
+usage_bp = Blueprint("usage", __name__)
+
+
+@usage_bp.get("/usage")
+def get_usage_report():
+    """OpenAI usage totals from the ledger, most expensive groups first.
+
+    ``group_by`` is a comma-separated list of operation, client, language,
+    model and day; ``since`` / ``until`` bound ``created_at``.
+    """
+    try:
+        query = UsageReportQuery.model_validate(request.args.to_dict())
+    except ValidationError as e:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid request data",
+                    "details": e.errors(include_url=False, include_context=False),
+                }
+            ),
+            400,
+        )
+
+    # Include this worker's buffered entries
+    LEDGER.flush()
+    session = SessionLocal()
+    try:
+        rows = usage_report(session, query.group_by, query.since, query.until)
+        return jsonify({"group_by": query.group_by, "groups": rows})
+    finally:
+        session.close()
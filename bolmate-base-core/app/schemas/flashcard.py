@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class CreateFlashcardRequest(BaseModel):
@@ -50,3 +50,63 @@ class BulkCreateFlashcardsRequest(BaseModel):
     """Request schema for bulk creating flashcards."""
 
     flashcards: list[CreateFlashcardRequest] = Field(..., min_length=1)
+
+
+class FlashcardFilter(BaseModel):
+    """Filter selecting flashcards for bulk operations (all given must match)."""
+
+    source_language: Optional[str] = Field(None, max_length=10)
+    native_language: Optional[str] = Field(None, max_length=10)
+    difficulty_level: Optional[str] = Field(None, max_length=10)
+    is_manual: Optional[bool] = None
+    created_before: Optional[datetime] = None
+    created_after: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "FlashcardFilter":
+        # An empty filter would select the whole deck; null and blank values
+        # select nothing either
+        if not any(
+            value.strip() if isinstance(value, str) else value is not None
+            for value in self.model_dump().values()
+        ):
+            raise ValueError("'filter' must set at least one non-empty field")
+        return self
+
+
+class FlashcardChanges(BaseModel):
+    """Fields to set on every selected flashcard."""
+
+    source_word: Optional[str] = Field(None, min_length=1, max_length=255)
+    source_language: Optional[str] = Field(None, min_length=1, max_length=10)
+    translated_word: Optional[str] = Field(None, min_length=1, max_length=255)
+    native_language: Optional[str] = Field(None, min_length=1, max_length=10)
+    example_sentence: Optional[str] = Field(None, max_length=512)
+    example_sentence_translated: Optional[str] = Field(None, max_length=512)
+    difficulty_level: Optional[str] = Field(None, max_length=10)
+    is_manual: Optional[bool] = None
+
+
+class BulkDeleteFlashcardsRequest(BaseModel):
+    """Request schema for deleting flashcards by ids or by filter."""
+
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[FlashcardFilter] = None
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "BulkDeleteFlashcardsRequest":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of 'ids' or 'filter'")
+        return self
+
+
+class BulkUpdateFlashcardsRequest(BulkDeleteFlashcardsRequest):
+    """Request schema for updating flashcards by ids or by filter."""
+
+    changes: FlashcardChanges
+
+    @model_validator(mode="after")
+    def check_changes(self) -> "BulkUpdateFlashcardsRequest":
+        if not self.changes.model_fields_set:
+            raise ValueError("'changes' must set at least one field")
+        return self
@@ -22,6 +22,7 @@ class SubmitQuizAnswerRequest(BaseModel):
 
     flashcard_id: int = Field(..., gt=0)
     answer: str = Field(..., min_length=1, max_length=512)
+    native_language: Optional[str] = Field(None, max_length=10)
 
 
 class QuizStats(BaseModel):
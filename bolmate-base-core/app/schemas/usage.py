@@ -0,0 +1,29 @@
+"""Usage report query schema."""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+REPORT_GROUPS = ("operation", "client", "language", "model", "day")
+
+
+class UsageReportQuery(BaseModel):
+    """Query parameters of the usage report."""
+
+    group_by: list[str] = Field(default_factory=lambda: ["operation"])
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    @field_validator("group_by", mode="before")
+    @classmethod
+    def split_groups(cls, value: Any) -> List[str]:
+        if isinstance(value, str):
+            value = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in value if name not in REPORT_GROUPS]
+        if unknown:
+            raise ValueError(
+                f"Unknown group_by {', '.join(unknown)}; "
+                f"expected any of {', '.join(REPORT_GROUPS)}"
+            )
+        return list(dict.fromkeys(value))
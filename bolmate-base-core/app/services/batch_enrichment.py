@@ -0,0 +1,325 @@
+"""Offline bulk enrichment of flashcards through the OpenAI Batch API.
+
+Backfilling examples and difficulty levels for a whole deck is done outside
+the web workers: cards missing enrichment are encoded into a JSONL request
+file, submitted as a Batch job, polled until it finishes and the replies are
+written back to ``flashcards`` in bulk.
+
+``LocalBatchBackend`` is a stand-in for the Batch endpoint that answers each
+request line with a local responder, so the pipeline runs without network
+access (and in tests).  ``offline_responder`` answers with the local
+difficulty estimates only.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Protocol
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models import Flashcard, bump_collection_version
+from app.services.difficulty import estimate_difficulty
+from app.services.openai_service import (
+    ENRICH_FIELDS,
+    ENRICH_TOKENS_PER_ITEM,
+    enrich_request_body,
+    parse_enrichment,
+)
+from app.services.prompt_encoding import batch_cards
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchBackend(Protocol):
+    def upload(self, path: Path) -> str: ...
+
+    def create_batch(self, input_file_id: str) -> str: ...
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]: ...
+
+    def download(self, file_id: str) -> str: ...
+
+
+class OpenAIBatchBackend:
+    """Batch backend talking to the OpenAI Files and Batches endpoints."""
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    def upload(self, path: Path) -> str:
+        with open(path, "rb") as fh:
+            return self.client.files.create(file=fh, purpose="batch").id
+
+    def create_batch(self, input_file_id: str) -> str:
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint=CHAT_COMPLETIONS_URL,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        batch = self.client.batches.retrieve(batch_id)
+        return {"status": batch.status, "output_file_id": batch.output_file_id}
+
+    def download(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+
+class LocalBatchBackend:
+    """In-process stand-in for the Batch API.
+
+    ``responder`` receives the chat completion body of each request line and
+    returns the assistant message content.  Jobs complete on the first
+    ``retrieve`` so callers exercise the same polling path as with OpenAI.
+    """
+
+    def __init__(self, responder: Callable[[Dict[str, Any]], str]) -> None:
+        self.responder = responder
+        self._files: Dict[str, str] = {}
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    def upload(self, path: Path) -> str:
+        file_id = f"file-local-{uuid.uuid4().hex[:12]}"
+        self._files[file_id] = Path(path).read_text(encoding="utf-8")
+        return file_id
+
+    def create_batch(self, input_file_id: str) -> str:
+        batch_id = f"batch-local-{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = {
+            "status": "in_progress",
+            "input_file_id": input_file_id,
+            "output_file_id": None,
+        }
+        return batch_id
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        batch = self._batches[batch_id]
+        if batch["status"] == "in_progress":
+            output = []
+            for line in self._files[batch["input_file_id"]].splitlines():
+                request = json.loads(line)
+                content = self.responder(request["body"])
+                output.append(
+                    json.dumps(
+                        {
+                            "custom_id": request["custom_id"],
+                            "response": {
+                                "status_code": 200,
+                                "body": {
+                                    "choices": [
+                                        {
+                                            "message": {
+                                                "role": "assistant",
+                                                "content": content,
+                                            }
+                                        }
+                                    ]
+                                },
+                            },
+                        }
+                    )
+                )
+            output_file_id = f"file-local-{uuid.uuid4().hex[:12]}"
+            self._files[output_file_id] = "\n".join(output)
+            batch.update(status="completed", output_file_id=output_file_id)
+        return {"status": batch["status"], "output_file_id": batch["output_file_id"]}
+
+    def download(self, file_id: str) -> str:
+        return self._files[file_id]
+
+
+def offline_responder(body: Dict[str, Any]) -> str:
+    """Answer an enrichment request from local data, without the model.
+
+    Rows get the local difficulty estimate; examples need the model, so they
+    stay empty for a later backfill.
+    """
+    lines = body["messages"][-1]["content"].splitlines()
+    # The user message is a ``Native: <code>`` line followed by the table
+    header = lines[1].split("\t")
+    items = []
+    for line in lines[2:]:
+        row = dict(zip(header, line.split("\t")))
+        level = estimate_difficulty(
+            row.get("source_word", ""), row.get("source_language", "")
+        )
+        if level:
+            items.append({"i": int(row["i"]), "d": level})
+    return json.dumps({"items": items})
+
+
+def cards_missing_enrichment(
+    session: Session, limit: int | None = None
+) -> List[Flashcard]:
+    query = (
+        session.query(Flashcard)
+        .filter(
+            or_(
+                Flashcard.example_sentence.is_(None),
+                Flashcard.example_sentence_translated.is_(None),
+                Flashcard.difficulty_level.is_(None),
+            )
+        )
+        .order_by(Flashcard.id.asc())
+    )
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+
+def write_requests(cards: List[Flashcard], path: Path) -> Dict[str, List[int]]:
+    """Write one Batch request line per card batch; returns the manifest.
+
+    The manifest maps each request ``custom_id`` to the card ids of its rows,
+    in row order, so replies can be applied later by a separate process.
+    """
+    settings = get_settings()
+    by_language: Dict[str, List[Dict[str, Any]]] = {}
+    for card in cards:
+        by_language.setdefault(card.native_language, []).append(
+            {"id": card.id, **{field: getattr(card, field) for field in ENRICH_FIELDS}}
+        )
+
+    manifest: Dict[str, List[int]] = {}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        for native_language, rows in by_language.items():
+            for batch, table in batch_cards(
+                rows,
+                ENRICH_FIELDS,
+                settings.openai_batch_token_budget,
+                max(settings.openai_max_output_tokens // ENRICH_TOKENS_PER_ITEM, 1),
+            ):
+                custom_id = f"enrich-{len(manifest)}"
+                manifest[custom_id] = [row["id"] for row in batch]
+                body = enrich_request_body(len(batch), table, native_language)
+                fh.write(
+                    json.dumps(
+                        {
+                            "custom_id": custom_id,
+                            "method": "POST",
+                            "url": CHAT_COMPLETIONS_URL,
+                            "body": body,
+                        },
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+    return manifest
+
+
+def wait_for_batch(
+    backend: BatchBackend,
+    batch_id: str,
+    poll_interval: float = 30.0,
+    timeout: float | None = None,
+) -> Dict[str, Any]:
+    started = time.monotonic()
+    while True:
+        batch = backend.retrieve(batch_id)
+        if batch["status"] in FINAL_STATUSES:
+            return batch
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Batch {batch_id} still {batch['status']}")
+        logger.info("Batch %s is %s", batch_id, batch["status"])
+        time.sleep(poll_interval)
+
+
+def apply_results(session: Session, manifest: Dict[str, List[int]], output: str) -> int:
+    """Write enrichment replies to ``flashcards``; returns the updated count.
+
+    Only empty fields are filled, so a backfill never overwrites examples or
+    levels that were edited by hand in the meantime.
+    """
+    updates: List[Dict[str, Any]] = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        card_ids = manifest.get(record.get("custom_id"), [])
+        response = record.get("response") or {}
+        if not card_ids or response.get("status_code") != 200:
+            logger.warning("Skipping failed batch request %s", record.get("custom_id"))
+            continue
+        choices = response.get("body", {}).get("choices") or [{}]
+        content = choices[0].get("message", {}).get("content") or ""
+        enriched = parse_enrichment([{"id": card_id} for card_id in card_ids], content)
+        cards = {
+            card.id: card
+            for card in session.query(Flashcard).filter(Flashcard.id.in_(card_ids))
+        }
+        for item in enriched:
+            card = cards.get(item["id"])
+            if card is None:
+                continue
+            values = {
+                column: item[key]
+                for key, column in (
+                    ("example_sentence", "example_sentence"),
+                    ("example_translation", "example_sentence_translated"),
+                    ("difficulty_level", "difficulty_level"),
+                )
+                if item.get(key) and not getattr(card, column)
+            }
+            if values:
+                updates.append({"id": card.id, **values})
+
+    if updates:
+        # Bulk mappings skip the flush events that bump the version
+        version = bump_collection_version(session, "flashcards")
+        for values in updates:
+            values["change_seq"] = version
+        session.bulk_update_mappings(Flashcard, updates)
+        session.commit()
+    return len(updates)
+
+
+def manifest_path(batch_id: str) -> Path:
+    return Path(get_settings().batch_work_dir) / f"{batch_id}.manifest.json"
+
+
+def submit_backfill(
+    session: Session, backend: BatchBackend, limit: int | None = None
+) -> str | None:
+    """Write and submit a backfill job; returns the batch id (``None`` if idle)."""
+    cards = cards_missing_enrichment(session, limit)
+    if not cards:
+        return None
+    work_dir = Path(get_settings().batch_work_dir)
+    requests_path = work_dir / f"enrich-{int(time.time())}.jsonl"
+    manifest = write_requests(cards, requests_path)
+    batch_id = backend.create_batch(backend.upload(requests_path))
+    manifest_path(batch_id).write_text(json.dumps(manifest), encoding="utf-8")
+    logger.info(
+        "Submitted batch %s with %d requests for %d cards",
+        batch_id,
+        len(manifest),
+        len(cards),
+    )
+    return batch_id
+
+
+def collect_backfill(
+    session: Session,
+    backend: BatchBackend,
+    batch_id: str,
+    poll_interval: float = 30.0,
+    timeout: float | None = None,
+) -> int:
+    """Wait for ``batch_id`` and apply its replies; returns the updated count."""
+    batch = wait_for_batch(backend, batch_id, poll_interval, timeout)
+    if batch["status"] != "completed" or not batch["output_file_id"]:
+        raise RuntimeError(f"Batch {batch_id} ended as {batch['status']}")
+    manifest = json.loads(manifest_path(batch_id).read_text(encoding="utf-8"))
+    return apply_results(session, manifest, backend.download(batch["output_file_id"]))
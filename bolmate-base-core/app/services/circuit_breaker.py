@@ -0,0 +1,137 @@
+"""Circuit breakers for OpenAI operations.
+
+Each ``openai_service`` operation has its own breaker.  While it is closed,
+calls go through and their outcomes are kept for ``breaker_window_seconds``;
+once at least ``breaker_min_calls`` were seen and the share of failures or
+of calls slower than ``breaker_slow_call_seconds`` reaches
+``breaker_failure_rate``, the breaker opens.  An open breaker rejects calls
+at once (``CircuitOpenError``), so callers serve their local fallback
+instead of waiting for a timeout.  After ``breaker_open_seconds`` a single
+probe call is let through (half-open): success closes the breaker, failure
+opens it again.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from app.metrics import Counter
+from config import get_settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+SHORT_CIRCUITS = Counter(
+    "openai_short_circuits_total",
+    "OpenAI calls skipped because the operation's circuit breaker was open.",
+    ("operation",),
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an operation whose breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+        # (monotonic time, failed or slow)
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._probing = False
+
+    def _trim(self, now: float, window: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - window:
+            self._outcomes.popleft()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; claims the probe when half-open."""
+        settings = get_settings()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < settings.breaker_open_seconds:
+                    return False
+                self.state = HALF_OPEN
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, ok: bool, latency: float) -> None:
+        settings = get_settings()
+        bad = not ok or latency > settings.breaker_slow_call_seconds
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if bad:
+                    self._open(now)
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state == OPEN:
+                # A call admitted before the breaker opened
+                return
+            self._outcomes.append((now, bad))
+            self._trim(now, settings.breaker_window_seconds)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, failed in self._outcomes if failed)
+            if (
+                calls >= settings.breaker_min_calls
+                and failures / calls >= settings.breaker_failure_rate
+            ):
+                self._open(now)
+
+    def discard(self) -> None:
+        """Forget a call let through by ``allow`` without judging its outcome."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self._outcomes.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        settings = get_settings()
+        with self._lock:
+            self._trim(time.monotonic(), settings.breaker_window_seconds)
+            snapshot: Dict[str, Any] = {
+                "state": self.state,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": sum(1 for _, failed in self._outcomes if failed),
+            }
+            if self.state == OPEN:
+                remaining = settings.breaker_open_seconds - (
+                    time.monotonic() - self.opened_at
+                )
+                snapshot["retry_in_seconds"] = max(round(remaining, 1), 0)
+            return snapshot
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(operation: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if operation not in _breakers:
+            _breakers[operation] = CircuitBreaker(operation)
+        return _breakers[operation]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every breaker that has seen a call, by operation."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
@@ -0,0 +1,328 @@
+"""Streaming parsers and writers for deck files: CSV, TSV and Anki ``.apkg``.
+
+Each parser yields ``(line, record)`` pairs where ``record`` maps flashcard
+columns to raw strings.  Nothing is validated here; the importer decides
+which records are usable.  ``AnkiCollectionWriter`` builds the collection of
+an exported package on disk, one note batch at a time.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import html
+import io
+import json
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+import zipfile
+from typing import IO, Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+Record = Dict[str, str]
+
+# Header names recognised for each flashcard column (lowercased)
+FIELD_ALIASES = {
+    "source_word": {"source_word", "word", "front", "term", "source"},
+    "translated_word": {"translated_word", "translation", "back", "meaning"},
+    "source_language": {"source_language", "source_lang"},
+    "native_language": {"native_language", "native_lang", "target_language"},
+    "example_sentence": {"example_sentence", "example"},
+    "example_sentence_translated": {
+        "example_sentence_translated",
+        "example_translation",
+    },
+    "difficulty_level": {"difficulty_level", "level", "cefr"},
+}
+# Column order of header-less files
+POSITIONAL_FIELDS = (
+    "source_word",
+    "translated_word",
+    "example_sentence",
+    "example_sentence_translated",
+)
+FORMATS_BY_EXTENSION = {".csv": "csv", ".tsv": "tsv", ".txt": "tsv", ".apkg": "apkg"}
+# Newest first; ``collection.anki21b`` is zstd-compressed and not supported
+ANKI_COLLECTIONS = ("collection.anki21", "collection.anki2")
+ANKI_FIELD_SEPARATOR = "\x1f"
+
+TAG_RE = re.compile(r"<[^>]+>")
+BREAK_RE = re.compile(r"<br\s*/?>|</div>|</p>", re.IGNORECASE)
+SOUND_RE = re.compile(r"\[sound:[^\]]*\]")
+
+
+def detect_format(filename: str | None, declared: str | None = None) -> str | None:
+    if declared:
+        return declared.lower() if declared.lower() in ("csv", "tsv", "apkg") else None
+    for extension, name in FORMATS_BY_EXTENSION.items():
+        if (filename or "").lower().endswith(extension):
+            return name
+    return None
+
+
+def _header_mapping(cells: List[str]) -> List[str | None] | None:
+    """Column -> field for a header row, or ``None`` if ``cells`` is data."""
+    mapping: List[str | None] = []
+    for cell in cells:
+        name = cell.strip().lower().replace(" ", "_")
+        mapping.append(
+            next(
+                (field for field, aliases in FIELD_ALIASES.items() if name in aliases),
+                None,
+            )
+        )
+    if "source_word" in mapping and "translated_word" in mapping:
+        return mapping
+    return None
+
+
+def iter_delimited(stream: IO[bytes], delimiter: str) -> Iterator[Tuple[int, Record]]:
+    """Yield records of a CSV/TSV file, with or without a header row."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text, delimiter=delimiter)
+        mapping: List[str | None] = list(POSITIONAL_FIELDS)
+        for cells in reader:
+            if reader.line_num == 1:
+                header = _header_mapping(cells)
+                if header:
+                    mapping = header
+                    continue
+            if not any(cell.strip() for cell in cells):
+                continue
+            yield reader.line_num, {
+                field: cell
+                for field, cell in zip(mapping, cells)
+                if field is not None and cell.strip()
+            }
+    finally:
+        # Leave the upload's stream open for the caller
+        text.detach()
+
+
+def _anki_text(field: str) -> str:
+    field = SOUND_RE.sub("", field)
+    field = BREAK_RE.sub(" ", field)
+    return " ".join(html.unescape(TAG_RE.sub("", field)).split())
+
+
+def iter_apkg(stream: IO[bytes]) -> Iterator[Tuple[int, Record]]:
+    """Yield front/back records of the notes in an Anki package.
+
+    The collection is an SQLite database inside the zip; it is copied to a
+    temporary file so notes can be read with a cursor instead of in memory.
+    """
+    with zipfile.ZipFile(stream) as archive:
+        names = set(archive.namelist())
+        collection = next((name for name in ANKI_COLLECTIONS if name in names), None)
+        if collection is None:
+            raise ValueError("Unsupported Anki package: no collection.anki2 found")
+        with tempfile.NamedTemporaryFile(suffix=".anki2") as database:
+            with archive.open(collection) as source:
+                shutil.copyfileobj(source, database)
+            database.flush()
+            connection = sqlite3.connect(database.name)
+            try:
+                for note_id, fields in connection.execute(
+                    "SELECT id, flds FROM notes ORDER BY id"
+                ):
+                    values = [
+                        _anki_text(value)
+                        for value in fields.split(ANKI_FIELD_SEPARATOR)
+                    ]
+                    record = {
+                        field: value
+                        for field, value in zip(POSITIONAL_FIELDS, values)
+                        if value
+                    }
+                    yield note_id, record
+            finally:
+                connection.close()
+
+
+def iter_deck(stream: IO[bytes], deck_format: str) -> Iterator[Tuple[int, Record]]:
+    if deck_format == "apkg":
+        return iter_apkg(stream)
+    return iter_delimited(stream, "," if deck_format == "csv" else "\t")
+
+
+# Anki 2.1 legacy collection (schema 11): only what importers read
+ANKI_SCHEMA = """
+CREATE TABLE col (
+    id integer PRIMARY KEY, crt integer NOT NULL, mod integer NOT NULL,
+    scm integer NOT NULL, ver integer NOT NULL, dty integer NOT NULL,
+    usn integer NOT NULL, ls integer NOT NULL, conf text NOT NULL,
+    models text NOT NULL, decks text NOT NULL, dconf text NOT NULL,
+    tags text NOT NULL
+);
+CREATE TABLE notes (
+    id integer PRIMARY KEY, guid text NOT NULL, mid integer NOT NULL,
+    mod integer NOT NULL, usn integer NOT NULL, tags text NOT NULL,
+    flds text NOT NULL, sfld integer NOT NULL, csum integer NOT NULL,
+    flags integer NOT NULL, data text NOT NULL
+);
+CREATE TABLE cards (
+    id integer PRIMARY KEY, nid integer NOT NULL, did integer NOT NULL,
+    ord integer NOT NULL, mod integer NOT NULL, usn integer NOT NULL,
+    type integer NOT NULL, queue integer NOT NULL, due integer NOT NULL,
+    ivl integer NOT NULL, factor integer NOT NULL, reps integer NOT NULL,
+    lapses integer NOT NULL, left integer NOT NULL, odue integer NOT NULL,
+    odid integer NOT NULL, flags integer NOT NULL, data text NOT NULL
+);
+CREATE TABLE revlog (
+    id integer PRIMARY KEY, cid integer NOT NULL, usn integer NOT NULL,
+    ease integer NOT NULL, ivl integer NOT NULL, lastIvl integer NOT NULL,
+    factor integer NOT NULL, time integer NOT NULL, type integer NOT NULL
+);
+CREATE TABLE graves (usn integer NOT NULL, oid integer NOT NULL, type integer NOT NULL);
+"""
+ANKI_FIELD_NAMES = ("Front", "Back", "Example", "Example translation")
+ANKI_MODEL_ID = 1_700_000_000_000
+
+
+def _anki_model(deck_id: int, now: int) -> dict:
+    return {
+        "id": ANKI_MODEL_ID,
+        "name": "Bolmate vocabulary",
+        "type": 0,
+        "mod": now,
+        "usn": -1,
+        "sortf": 0,
+        "did": deck_id,
+        "tmpls": [
+            {
+                "name": "Card 1",
+                "ord": 0,
+                "qfmt": "{{Front}}",
+                "afmt": "{{FrontSide}}<hr id=answer>{{Back}}"
+                "<br><i>{{Example}}</i><br>{{Example translation}}",
+                "bqfmt": "",
+                "bafmt": "",
+                "did": None,
+            }
+        ],
+        "flds": [
+            {
+                "name": name,
+                "ord": index,
+                "sticky": False,
+                "rtl": False,
+                "font": "Arial",
+                "size": 20,
+                "media": [],
+            }
+            for index, name in enumerate(ANKI_FIELD_NAMES)
+        ],
+        "css": ".card { font-family: arial; font-size: 20px; text-align: center; }",
+        "latexPre": "",
+        "latexPost": "",
+        "req": [[0, "any", [0]]],
+        "tags": [],
+        "vers": [],
+    }
+
+
+def _anki_deck(deck_id: int, name: str, now: int) -> dict:
+    return {
+        "id": deck_id,
+        "name": name,
+        "mod": now,
+        "usn": -1,
+        "desc": "",
+        "dyn": 0,
+        "conf": 1,
+        "collapsed": False,
+        "newToday": [0, 0],
+        "revToday": [0, 0],
+        "lrnToday": [0, 0],
+        "timeToday": [0, 0],
+        "extendNew": 10,
+        "extendRev": 50,
+    }
+
+
+class AnkiCollectionWriter:
+    """Write notes into a new ``collection.anki2`` at ``path``.
+
+    Every ``deck`` name passed to ``add_notes`` becomes its own Anki deck
+    with one card per note; ``close`` writes the collection metadata.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(ANKI_SCHEMA)
+        self._now = int(time.time())
+        self._next_id = int(time.time() * 1000)
+        self._decks: Dict[str, int] = {}
+
+    def _deck_id(self, name: str) -> int:
+        if name not in self._decks:
+            self._decks[name] = ANKI_MODEL_ID + len(self._decks) + 1
+        return self._decks[name]
+
+    def add_notes(self, deck: str, notes: Iterable[Tuple[str, Sequence[str]]]) -> None:
+        """Add ``(guid, fields)`` notes; fields follow ``ANKI_FIELD_NAMES``."""
+        deck_id = self._deck_id(deck)
+        note_rows: List[Tuple[Any, ...]] = []
+        card_rows: List[Tuple[Any, ...]] = []
+        for guid, fields in notes:
+            note_id = self._next_id
+            self._next_id += 1
+            values = [html.escape(value or "") for value in fields]
+            sort_field = values[0]
+            checksum = int(hashlib.sha1(fields[0].encode("utf-8")).hexdigest()[:8], 16)
+            note_rows.append(
+                (
+                    note_id,
+                    guid,
+                    ANKI_MODEL_ID,
+                    self._now,
+                    -1,
+                    "",
+                    ANKI_FIELD_SEPARATOR.join(values),
+                    sort_field,
+                    checksum,
+                    0,
+                    "",
+                )
+            )
+            # New card (type and queue 0) due by its position in the queue
+            due = len(card_rows) + 1
+            card_rows.append(
+                (note_id, note_id, deck_id, 0, self._now, -1, 0, 0, due)
+                + (0,) * 8
+                + ("",)
+            )
+        self._connection.executemany(
+            "INSERT INTO notes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", note_rows
+        )
+        self._connection.executemany(
+            "INSERT INTO cards VALUES "
+            "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            card_rows,
+        )
+
+    def close(self) -> None:
+        now = self._now
+        decks = {"1": _anki_deck(1, "Default", now)}
+        for name, deck_id in self._decks.items():
+            decks[str(deck_id)] = _anki_deck(deck_id, name, now)
+        first_deck = next(iter(self._decks.values()), 1)
+        dconf = {"1": {"id": 1, "name": "Default", "mod": 0, "usn": 0}}
+        self._connection.execute(
+            "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, ?)",
+            (
+                now,
+                now * 1000,
+                now * 1000,
+                json.dumps({"curDeck": first_deck, "curModel": ANKI_MODEL_ID}),
+                json.dumps({str(ANKI_MODEL_ID): _anki_model(first_deck, now)}),
+                json.dumps(decks),
+                json.dumps(dconf),
+                "{}",
+            ),
+        )
+        self._connection.commit()
+        self._connection.close()
@@ -0,0 +1,207 @@
+"""Local CEFR difficulty estimates from word-frequency ranks.
+
+Frequent words are learned first, so a word's rank in a frequency list of
+its language is a good proxy for its level.  The ranks of every language are
+kept in one gzip file (``WORD_FREQUENCY_FILE``, by default the tables shipped
+in ``app/data``)::
+
+    # comment
+    @es
+    de
+    la
+    ...
+
+Each ``@<language>`` line starts a table listing normalized words from most
+to least frequent.  Tables are loaded into dictionaries on first use, so an
+estimate is a few dictionary lookups.  Words missing from a table that covers
+every band (``FULL_TABLE_SIZE`` words, like the shipped ones) are
+``RAREST_LEVEL``; shorter tables can't tell how rare a missing word is, so it
+gets no estimate.  Neither do languages without a table.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from app.services.text_preprocessing import WORD_RE, normalize_word
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FREQUENCY_FILE = (
+    Path(__file__).resolve().parent.parent / "data" / "word_frequency.gz"
+)
+# Highest frequency rank of each level; anything rarer is ``RAREST_LEVEL``
+CEFR_RANK_LIMITS: Tuple[Tuple[str, int], ...] = (
+    ("A1", 800),
+    ("A2", 1500),
+    ("B1", 3000),
+    ("B2", 5000),
+    ("C1", 10000),
+)
+RAREST_LEVEL = "C2"
+FULL_TABLE_SIZE = CEFR_RANK_LIMITS[-1][1]
+LEVELS = tuple(level for level, _ in CEFR_RANK_LIMITS) + (RAREST_LEVEL,)
+# Regular plural endings, per language, tried when a word itself is not in
+# the table ("ciudades" -> "ciudad").  Other languages inflect too irregularly
+# for a suffix rule to do more good than harm.
+PLURAL_SUFFIXES: Dict[str, Tuple[str, ...]] = {
+    "en": ("s", "es"),
+    "es": ("s", "es"),
+    "fr": ("s", "x"),
+}
+
+_tables: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+
+def frequency_file() -> Path:
+    configured = get_settings().word_frequency_file
+    return Path(configured) if configured else DEFAULT_FREQUENCY_FILE
+
+
+def load_frequency_tables(path: str | Path) -> Dict[str, Dict[str, int]]:
+    """Read every table in ``path`` as ``{language: {word: rank}}``."""
+    tables: Dict[str, Dict[str, int]] = {}
+    ranks: Dict[str, int] | None = None
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            word = line.strip()
+            if not word or word.startswith("#"):
+                continue
+            if word.startswith("@"):
+                ranks = tables.setdefault(word[1:].lower(), {})
+            elif ranks is not None:
+                ranks.setdefault(word, len(ranks) + 1)
+    return tables
+
+
+def _frequency_tables() -> Dict[str, Dict[str, int]]:
+    path = frequency_file()
+    key = str(path)
+    if key not in _tables:
+        try:
+            _tables[key] = load_frequency_tables(path)
+        except (OSError, EOFError, UnicodeDecodeError) as exc:
+            logger.warning("Skipping unreadable word frequency file %s: %s", path, exc)
+            _tables[key] = {}
+    return _tables[key]
+
+
+def get_frequency_ranks(language: str) -> Dict[str, int]:
+    """``{word: rank}`` of ``language``, empty if there is no table."""
+    return _frequency_tables().get((language or "").lower(), {})
+
+
+def guess_language(phrases: Iterable[str]) -> str | None:
+    """Language whose frequency table knows most words of ``phrases``.
+
+    Returns ``None`` when no table knows any of them or two languages tie.
+    """
+    words = [
+        word for phrase in phrases for word in WORD_RE.findall(normalize_word(phrase))
+    ]
+    counts = Counter(
+        {
+            language: sum(word in ranks for word in words)
+            for language, ranks in _frequency_tables().items()
+        }
+    ).most_common(2)
+    if (
+        not counts
+        or not counts[0][1]
+        or (len(counts) == 2 and counts[0][1] == counts[1][1])
+    ):
+        return None
+    return counts[0][0]
+
+
+def level_for_rank(rank: int) -> str:
+    for level, limit in CEFR_RANK_LIMITS:
+        if rank <= limit:
+            return level
+    return RAREST_LEVEL
+
+
+def _word_level(word: str, ranks: Dict[str, int], language: str) -> str | None:
+    rank = ranks.get(word)
+    if rank is None and len(word) > 3:
+        for suffix in PLURAL_SUFFIXES.get(language, ()):
+            if word.endswith(suffix) and word[: -len(suffix)] in ranks:
+                rank = ranks[word[: -len(suffix)]]
+                break
+    if rank is not None:
+        return level_for_rank(rank)
+    return RAREST_LEVEL if len(ranks) >= FULL_TABLE_SIZE else None
+
+
+def estimate_difficulty(word: str, language: str) -> str | None:
+    """CEFR level (A1-C2) of ``word`` in ``language``, or ``None``.
+
+    A phrase is as hard as its rarest word, and has no estimate if one of its
+    words has none.
+    """
+    ranks = get_frequency_ranks(language)
+    if not ranks or not word:
+        return None
+    language = language.lower()
+    levels = [
+        _word_level(part, ranks, language)
+        for part in WORD_RE.findall(normalize_word(word))
+    ]
+    if not levels or None in levels:
+        return None
+    return max(levels, key=LEVELS.index)
+
+
+def read_frequency_list(path: str | Path) -> Iterator[str]:
+    """Yield words of a frequency list, most frequent first.
+
+    Lines hold a word optionally followed by its count (``word 1234``), as in
+    common corpus word lists.
+    """
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip() or line.startswith("#"):
+                continue
+            yield line.split()[0]
+
+
+def write_frequency_table(
+    language: str, words: Iterable[str], path: str | Path | None = None
+) -> int:
+    """Store ``words`` (most frequent first) as the table of ``language``.
+
+    Other languages' tables in the file are kept.  Returns the word count.
+    """
+    path = Path(path or frequency_file())
+    tables = load_frequency_tables(path) if path.exists() else {}
+    ranks: List[str] = []
+    seen = set()
+    for word in words:
+        key = normalize_word(word)
+        if key and key not in seen and WORD_RE.fullmatch(key):
+            seen.add(key)
+            ranks.append(key)
+    tables[language.lower()] = {word: rank for rank, word in enumerate(ranks, 1)}
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    # mtime=0 keeps rebuilt files byte-identical
+    with (
+        open(tmp_path, "wb") as raw,
+        gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as fh,
+    ):
+        for name in sorted(tables):
+            fh.write(f"@{name}\n".encode("utf-8"))
+            fh.write("".join(f"{word}\n" for word in tables[name]).encode("utf-8"))
+    tmp_path.replace(path)
+    _tables.pop(str(path), None)
+    return len(ranks)
+
+
+def clear_frequency_cache() -> None:
+    _tables.clear()
@@ -0,0 +1,206 @@
+"""Streaming text extraction from DOCX files.
+
+``word/document.xml`` (and the page header parts) are read straight out of
+the zip archive with an incremental XML parser, so large documents are never
+loaded as a full object model.  Paragraphs and table rows are yielded in
+document order; rows of two-column tables are returned as ``(word,
+translation)`` pairs, which is how vocabulary lists are usually written, so
+they can become flashcards without asking the model.  A header row naming
+the translation column's language ("Español | Polski") is kept with the
+table's pairs so callers can tell whose translations they are.
+"""
+
+from __future__ import annotations
+
+import re
+import zipfile
+from typing import IO, Dict, Iterator, List, NamedTuple, Tuple
+from xml.etree.ElementTree import iterparse
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCUMENT_PART = "word/document.xml"
+HEADER_PART_RE = re.compile(r"word/header\d*\.xml")
+
+# Cells longer than this are sentences, not vocabulary
+MAX_PAIR_WORDS = 6
+# Header labels naming a column's language
+HEADER_LANGUAGES: Dict[str, str] = {
+    "english": "en",
+    "polish": "pl",
+    "spanish": "es",
+    "german": "de",
+    "french": "fr",
+    "dutch": "nl",
+    "polski": "pl",
+    "angielski": "en",
+    "hiszpański": "es",
+    "niemiecki": "de",
+    "francuski": "fr",
+    "holenderski": "nl",
+    "español": "es",
+    "inglés": "en",
+    "polaco": "pl",
+    "alemán": "de",
+    "francés": "fr",
+    "deutsch": "de",
+    "englisch": "en",
+    "polnisch": "pl",
+    "français": "fr",
+    "anglais": "en",
+    "polonais": "pl",
+    "nederlands": "nl",
+}
+# First-row labels of vocabulary tables ("Word | Translation")
+HEADER_LABELS = {
+    "word",
+    "words",
+    "term",
+    "translation",
+    "meaning",
+    "słowo",
+    "słówko",
+    "słówka",
+    "tłumaczenie",
+    "znaczenie",
+    "palabra",
+    "traducción",
+    "wort",
+    "übersetzung",
+    "mot",
+    "traduction",
+} | set(HEADER_LANGUAGES)
+
+
+class Paragraph(NamedTuple):
+    text: str
+
+
+class TableRow(NamedTuple):
+    cells: Tuple[str, ...]
+    header: bool
+    # First row of its table
+    first: bool
+
+
+class VocabularyTable(NamedTuple):
+    # Language a header row gives for the translation column, if any
+    language: str | None
+    pairs: List[Tuple[str, str]]
+
+
+class DocxContent(NamedTuple):
+    text: str
+    tables: List[VocabularyTable]
+
+
+def iter_blocks(stream: IO[bytes]) -> Iterator[Paragraph | TableRow]:
+    """Yield header paragraphs, then body paragraphs and table rows."""
+    with zipfile.ZipFile(stream) as archive:
+        names = archive.namelist()
+        parts = sorted(name for name in names if HEADER_PART_RE.fullmatch(name))
+        parts.append(DOCUMENT_PART)
+        for name in parts:
+            with archive.open(name) as part:
+                yield from _iter_part(part)
+
+
+def _iter_part(part: IO[bytes]) -> Iterator[Paragraph | TableRow]:
+    container = None  # w:body or w:hdr, emptied after every top-level block
+    depth = 0  # table nesting; nested tables are flattened into their cell
+    runs: List[str] = []
+    cell: List[str] = []
+    cells: List[str] = []
+    row_index = 0
+    header = False
+
+    for event, element in iterparse(part, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            if tag in (W + "body", W + "hdr"):
+                container = element
+            elif tag == W + "tbl":
+                depth += 1
+                if depth == 1:
+                    row_index = 0
+            elif tag == W + "tr" and depth == 1:
+                cells, header = [], False
+            elif tag == W + "tc" and depth == 1:
+                cell = []
+            elif tag == W + "p":
+                runs = []
+            continue
+
+        if tag == W + "t":
+            runs.append(element.text or "")
+        elif tag == W + "tab":
+            runs.append(" ")
+        elif tag in (W + "br", W + "cr"):
+            runs.append("\n")
+        elif tag == W + "tblHeader":
+            header = element.get(W + "val", "true") not in ("0", "false")
+        elif tag == W + "p":
+            text = "".join(runs).strip()
+            if depth:
+                if text:
+                    cell.append(" ".join(text.split()))
+            elif text:
+                yield Paragraph(text)
+            element.clear()
+        elif tag == W + "tc" and depth == 1:
+            cells.append(" ".join(cell))
+        elif tag == W + "tr" and depth == 1:
+            if row_index == 0 and not header:
+                header = _looks_like_header(cells)
+            yield TableRow(tuple(cells), header, row_index == 0)
+            row_index += 1
+            element.clear()
+        elif tag == W + "tbl":
+            depth -= 1
+
+        if depth == 0 and container is not None and tag in (W + "p", W + "tbl"):
+            container.clear()
+
+
+def _looks_like_header(cells: List[str]) -> bool:
+    labels = [cell.strip(" :").lower() for cell in cells if cell.strip()]
+    return bool(labels) and all(label in HEADER_LABELS for label in labels)
+
+
+def _as_pair(cells: Tuple[str, ...]) -> Tuple[str, str] | None:
+    if len(cells) != 2:
+        return None
+    word, translation = (cell.strip() for cell in cells)
+    if not word or not translation or word.lower() == translation.lower():
+        return None
+    if max(len(word.split()), len(translation.split())) > MAX_PAIR_WORDS:
+        return None
+    return word, translation
+
+
+def read_docx(stream: IO[bytes]) -> DocxContent:
+    """Split a DOCX file into free text and two-column vocabulary tables.
+
+    Table rows that are not pairs are kept in the text with their cells
+    joined by `` - `` so the model still sees them.
+    """
+    lines: List[str] = []
+    tables: List[VocabularyTable] = []
+    table = VocabularyTable(None, [])
+    for block in iter_blocks(stream):
+        if isinstance(block, Paragraph):
+            lines.append(block.text)
+            continue
+        if block.first:
+            table = VocabularyTable(None, [])
+            tables.append(table)
+        if block.header:
+            if len(block.cells) == 2:
+                language = HEADER_LANGUAGES.get(block.cells[1].strip(" :").lower())
+                table = tables[-1] = table._replace(language=language)
+            continue
+        pair = _as_pair(block.cells)
+        if pair:
+            table.pairs.append(pair)
+        elif any(block.cells):
+            lines.append(" - ".join(cell for cell in block.cells if cell))
+    return DocxContent("\n".join(lines), [table for table in tables if table.pairs])
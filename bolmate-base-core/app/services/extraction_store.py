@@ -0,0 +1,160 @@
+"""Content-addressed store of extracted and interpreted uploads.
+
+Uploads are keyed by the SHA-256 of their bytes.  The first upload of a
+document stores its extracted text and, per native language, the interpreted
+vocabulary; later uploads of the same bytes are answered from the database
+without running the extractors or OpenAI again.  When the stored data grows
+past ``extraction_store_max_bytes`` the least recently used documents are
+evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import IO, Any, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from app.metrics import record_cache_lookup
+from app.models import DocumentInterpretation, ExtractedDocument
+from app.services.openai_service import (
+    ExtractedContent,
+    extract_content_from_file,
+    interpret_extracted_content,
+    interpret_file,
+)
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_upload(stream: IO[bytes]) -> str:
+    """SHA-256 of a binary file, read in chunks."""
+    stream.seek(0)
+    digest = hashlib.sha256()
+    while chunk := stream.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def interpret_upload(
+    session,
+    stream: IO[bytes],
+    filename: str,
+    mime_type: str | None,
+    native_language: str,
+) -> List[Dict[str, Any]]:
+    """Interpret an uploaded file, reusing stored results for known bytes."""
+    digest = hash_upload(stream)
+    native_language = native_language.lower()
+    document = session.query(ExtractedDocument).get(digest)
+    if document is not None:
+        document.last_used_at = func.now()
+        interpretation = (
+            session.query(DocumentInterpretation)
+            .filter(
+                DocumentInterpretation.document_sha256 == digest,
+                DocumentInterpretation.native_language == native_language,
+            )
+            .first()
+        )
+        session.commit()
+        record_cache_lookup("extraction_store", interpretation is not None)
+        if interpretation is not None:
+            return interpretation.items
+    else:
+        record_cache_lookup("extraction_store", False)
+        content = extract_content_from_file(stream, mime_type)
+        if content.text is not None and not (content.text.strip() or content.pairs):
+            # Failed or empty extraction; not worth pinning in the store
+            return []
+        document = ExtractedDocument(
+            sha256=digest,
+            filename=filename[:255],
+            mime_type=mime_type,
+            text=content.text,
+            table_pairs=[list(pair) for pair in content.pairs] or None,
+            size_bytes=len((content.text or "").encode("utf-8"))
+            + _json_size(content.pairs),
+        )
+        session.add(document)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another worker stored the same upload first
+            session.rollback()
+            document = session.query(ExtractedDocument).get(digest)
+
+    if document.text is not None:
+        # Rows stored before table languages were kept have no third column
+        pairs = [
+            (pair[0], pair[1], pair[2] if len(pair) > 2 else None)
+            for pair in document.table_pairs or []
+        ]
+        items, complete = interpret_extracted_content(
+            ExtractedContent(document.text, pairs), native_language
+        )
+    else:
+        items, complete = interpret_file(stream, filename, mime_type, native_language)
+
+    # Results the model didn't take part in (outage, open breaker, deadline)
+    # are lexicon or table matches only; don't pin them.  Empty results are
+    # not worth keeping either.
+    if complete and items:
+        session.add(
+            DocumentInterpretation(
+                document_sha256=digest, native_language=native_language, items=items
+            )
+        )
+        document.size_bytes += _json_size(items)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return items
+        evict(session)
+    return items
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def evict(session, max_bytes: int | None = None) -> int:
+    """Drop least recently used documents until the store fits ``max_bytes``.
+
+    Returns the number of documents removed.
+    """
+    if max_bytes is None:
+        max_bytes = get_settings().extraction_store_max_bytes
+    total = session.query(func.coalesce(func.sum(ExtractedDocument.size_bytes), 0))
+    excess = total.scalar() - max_bytes
+    if excess <= 0:
+        return 0
+
+    victims = []
+    for sha256, size_bytes in session.query(
+        ExtractedDocument.sha256, ExtractedDocument.size_bytes
+    ).order_by(
+        ExtractedDocument.last_used_at.asc(), ExtractedDocument.created_at.asc()
+    ):
+        victims.append(sha256)
+        excess -= size_bytes
+        if excess <= 0:
+            break
+
+    session.query(DocumentInterpretation).filter(
+        DocumentInterpretation.document_sha256.in_(victims)
+    ).delete(synchronize_session=False)
+    session.query(ExtractedDocument).filter(
+        ExtractedDocument.sha256.in_(victims)
+    ).delete(synchronize_session=False)
+    session.commit()
+    logger.info("Evicted %d documents from the extraction store", len(victims))
+    return len(victims)
@@ -0,0 +1,226 @@
+"""Streaming flashcard exports: CSV, NDJSON and Anki ``.apkg``.
+
+Rows are read through a server-side cursor (``yield_per``) ordered by
+language pair, so every pair forms one contiguous deck, and are written by
+generators that hand each chunk to the response as soon as it is encoded.
+Memory stays flat however large the collection is.
+
+A card's additional translations (``FlashcardTranslation``) are exported as
+cards of their own language pair, so each lands in that pair's deck and the
+export reads back through the deck importer.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from itertools import groupby
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Session
+
+from app.models import Flashcard, FlashcardTranslation
+from app.services.deck_formats import AnkiCollectionWriter
+
+# Rows fetched per cursor round trip, and per encoded response chunk
+EXPORT_CHUNK_SIZE = 1000
+# Bytes per zip write when streaming an ``.apkg``
+ZIP_CHUNK_SIZE = 256 * 1024
+
+EXPORT_KEYS = (
+    "id",
+    "source_word",
+    "translated_word",
+    "source_language",
+    "native_language",
+    "example_sentence",
+    "example_sentence_translated",
+    "difficulty_level",
+    "is_manual",
+    "created_at",
+    # True for rows of a card's additional translations
+    "is_translation",
+)
+# Header of CSV exports; readable back by the deck importer
+CSV_KEYS = EXPORT_KEYS[1:8]
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "apkg": "application/octet-stream",
+}
+
+
+def export_rows(
+    session: Session,
+    source_language: str | None = None,
+    native_language: str | None = None,
+) -> Iterator[Tuple[Any, ...]]:
+    """Row tuples in ``EXPORT_KEYS`` order, grouped by language pair.
+
+    Language pairs are compared case-insensitively: "ES"/"pl" cards share
+    the "es"/"pl" deck.
+    """
+    cards = session.query(
+        *(getattr(Flashcard, key).label(key) for key in EXPORT_KEYS[:-1]),
+        literal(False).label("is_translation"),
+    )
+    translated = (
+        Flashcard.id,
+        Flashcard.source_word,
+        FlashcardTranslation.translated_word,
+        Flashcard.source_language,
+        FlashcardTranslation.language,
+        Flashcard.example_sentence,
+        FlashcardTranslation.example_sentence_translated,
+        Flashcard.difficulty_level,
+        Flashcard.is_manual,
+        FlashcardTranslation.created_at,
+        literal(True),
+    )
+    translations = session.query(
+        *(column.label(key) for column, key in zip(translated, EXPORT_KEYS))
+    ).join(FlashcardTranslation, FlashcardTranslation.flashcard_id == Flashcard.id)
+    # Case-insensitive like the ``GET /flashcards`` filters
+    if source_language:
+        source = func.lower(Flashcard.source_language) == source_language.lower()
+        cards = cards.filter(source)
+        translations = translations.filter(source)
+    if native_language:
+        cards = cards.filter(
+            func.lower(Flashcard.native_language) == native_language.lower()
+        )
+        translations = translations.filter(
+            func.lower(FlashcardTranslation.language) == native_language.lower()
+        )
+    rows = cards.union_all(translations).subquery()
+    return iter(
+        session.query(*(rows.c[key] for key in EXPORT_KEYS))
+        .order_by(
+            func.lower(rows.c.source_language),
+            func.lower(rows.c.native_language),
+            rows.c.id,
+            rows.c.is_translation,
+        )
+        .yield_per(EXPORT_CHUNK_SIZE)
+    )
+
+
+def _chunks(rows: Iterable[Tuple[Any, ...]]) -> Iterator[List[Tuple[Any, ...]]]:
+    chunk: List[Tuple[Any, ...]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _by_pair(
+    rows: Iterable[Tuple[Any, ...]],
+) -> Iterator[Tuple[Tuple[Any, Any], Iterator[Tuple[Any, ...]]]]:
+    """``((source, native), rows)`` groups of ``export_rows`` output."""
+    source = EXPORT_KEYS.index("source_language")
+    native = EXPORT_KEYS.index("native_language")
+    return groupby(rows, key=lambda row: (row[source].lower(), row[native].lower()))
+
+
+def iter_csv(rows: Iterable[Tuple[Any, ...]]) -> Iterator[str]:
+    columns = [EXPORT_KEYS.index(key) for key in CSV_KEYS]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(CSV_KEYS)
+    for chunk in _chunks(rows):
+        writer.writerows([[row[index] for index in columns] for row in chunk])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(
+    rows: Iterable[Tuple[Any, ...]], dumps: Callable[[Any], str]
+) -> Iterator[str]:
+    """One JSON object per card; ``deck`` names its language pair."""
+    for (source, native), pair_rows in _by_pair(rows):
+        deck = f"{source}-{native}"
+        for chunk in _chunks(pair_rows):
+            yield "".join(
+                dumps({**dict(zip(EXPORT_KEYS, row)), "deck": deck}) + "\n"
+                for row in chunk
+            )
+
+
+class _ZipSink:
+    """Write-only, unseekable file that collects what ``ZipFile`` writes."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _anki_notes(rows: Sequence[Tuple[Any, ...]]) -> Iterator[Tuple[str, List[str]]]:
+    fields = [
+        EXPORT_KEYS.index(key)
+        for key in (
+            "source_word",
+            "translated_word",
+            "example_sentence",
+            "example_sentence_translated",
+        )
+    ]
+    native = EXPORT_KEYS.index("native_language")
+    for row in rows:
+        # Stable guid: re-importing an export updates notes instead of adding
+        guid = f"bolmate-{row[0]}"
+        if row[-1]:
+            guid += f"-{row[native].lower()}"
+        yield guid, [row[index] or "" for index in fields]
+
+
+def iter_apkg(rows: Iterable[Tuple[Any, ...]]) -> Iterator[bytes]:
+    """Anki package with one deck per language pair.
+
+    The collection is an SQLite file, so it is filled chunk by chunk on disk
+    first; the zip around it is then streamed without being held in memory.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "collection.anki2")
+        writer = AnkiCollectionWriter(path)
+        for (source, native), pair_rows in _by_pair(rows):
+            deck = f"Bolmate::{source} → {native}"
+            for chunk in _chunks(pair_rows):
+                writer.add_notes(deck, _anki_notes(chunk))
+        writer.close()
+
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+            with (
+                open(path, "rb") as source_file,
+                archive.open("collection.anki2", "w") as target,
+            ):
+                while data := source_file.read(ZIP_CHUNK_SIZE):
+                    target.write(data)
+                    compressed = sink.drain()
+                    if compressed:
+                        yield compressed
+            archive.writestr("media", "{}")
+        yield sink.drain()
@@ -0,0 +1,319 @@
+"""Streaming flashcard imports.
+
+NDJSON records are validated one at a time and written in fixed-size batches,
+each committed on its own, so memory stays flat however large the import is
+and a client can follow progress batch by batch.
+
+Deck files (CSV, TSV, Anki) are parsed as a stream into the
+``flashcard_import_rows`` staging table - with ``COPY`` on PostgreSQL - and
+merged into ``flashcards`` by a single ``INSERT ... SELECT``.
+
+Either way, rows that already exist under ``uq_flashcard_source`` (or repeat
+within the import) are skipped.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import uuid
+from itertools import islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, literal, select, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Flashcard, FlashcardImportRow, bump_collection_version
+from app.schemas.flashcard import CreateFlashcardRequest
+from app.services.deck_formats import Record, iter_deck
+from app.services.difficulty import estimate_difficulty
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Built once: validates raw JSON lines without an intermediate ``json.loads``
+FLASHCARD_ADAPTER = TypeAdapter(CreateFlashcardRequest)
+# Per-batch cap on reported invalid lines
+MAX_ERRORS_PER_BATCH = 20
+# Rows per INSERT when staging without COPY (non-PostgreSQL databases)
+STAGING_CHUNK_SIZE = 1000
+STAGING_COLUMNS = (
+    "import_id",
+    "line",
+    "source_word",
+    "translated_word",
+    "source_language",
+    "native_language",
+    "example_sentence",
+    "example_sentence_translated",
+    "difficulty_level",
+)
+COLUMN_LIMITS = {
+    column.name: column.type.length
+    for column in FlashcardImportRow.__table__.columns
+    if getattr(column.type, "length", None)
+}
+
+
+def flashcard_row(item: CreateFlashcardRequest) -> Dict[str, Any]:
+    """Insert values for a validated record, with the bulk create defaults."""
+    source_word = item.source_word.strip()
+    source_language = (item.source_language or "es").strip() or "es"
+    return {
+        "source_word": source_word,
+        "translated_word": item.translated_word.strip(),
+        "native_language": (
+            item.native_language or get_settings().default_native_language
+        ).strip(),
+        "source_language": source_language,
+        "is_manual": item.is_manual if item.is_manual is not None else False,
+        "difficulty_level": item.difficulty_level
+        or estimate_difficulty(source_word, source_language),
+        "example_sentence": item.example_sentence,
+        "example_sentence_translated": item.example_sentence_translated,
+    }
+
+
+def _key(row: Dict[str, Any]) -> tuple:
+    return (row["source_word"], row["source_language"], row["native_language"])
+
+
+def insert_batch(session: Session, rows: List[Dict[str, Any]]) -> int:
+    """Insert ``rows`` skipping existing keys; commits and returns the count."""
+    unique: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        unique.setdefault(_key(row), row)
+    columns = (
+        Flashcard.source_word,
+        Flashcard.source_language,
+        Flashcard.native_language,
+    )
+    for attempt in range(2):
+        existing = {
+            tuple(found)
+            for found in session.query(*columns).filter(
+                tuple_(*columns).in_(list(unique))
+            )
+        }
+        new_rows = [row for key, row in unique.items() if key not in existing]
+        if not new_rows:
+            return 0
+        try:
+            # Bulk mappings skip the flush events that bump the version
+            version = bump_collection_version(session, "flashcards")
+            session.bulk_insert_mappings(
+                Flashcard, [{**row, "change_seq": version} for row in new_rows]
+            )
+            session.commit()
+            return len(new_rows)
+        except IntegrityError:
+            # A concurrent import inserted one of the keys; check again
+            session.rollback()
+            if attempt:
+                raise
+    return 0
+
+
+def ingest_ndjson(
+    session: Session, stream: IO[bytes], batch_size: int | None = None
+) -> Iterator[Dict[str, Any]]:
+    """Import newline-delimited JSON records from ``stream``.
+
+    Yields a progress report after every written batch and a final summary
+    (``"done": true``).  Invalid lines are reported by line number and
+    skipped.
+    """
+    batch_size = batch_size or get_settings().import_batch_size
+    totals = {"received": 0, "created": 0, "skipped": 0, "invalid": 0}
+    batch: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    batch_number = 0
+
+    def flush() -> Dict[str, Any]:
+        nonlocal batch, errors, batch_number
+        created = insert_batch(session, batch) if batch else 0
+        batch_number += 1
+        totals["created"] += created
+        totals["skipped"] += len(batch) - created
+        report = {
+            "batch": batch_number,
+            "created": created,
+            "skipped": len(batch) - created,
+            "errors": errors,
+            **{f"total_{name}": value for name, value in totals.items()},
+        }
+        batch, errors = [], []
+        return report
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        totals["received"] += 1
+        try:
+            batch.append(flashcard_row(FLASHCARD_ADAPTER.validate_json(line)))
+        except ValidationError as exc:
+            totals["invalid"] += 1
+            if len(errors) < MAX_ERRORS_PER_BATCH:
+                error = exc.errors(include_url=False, include_context=False)[0]
+                errors.append({"line": line_number, "error": error["msg"]})
+        if len(batch) >= batch_size:
+            yield flush()
+
+    if batch or errors:
+        yield flush()
+    logger.info("Imported flashcards: %s", totals)
+    yield {"done": True, **totals}
+
+
+def _staging_rows(
+    records: Iterable[Tuple[int, Record]],
+    import_id: str,
+    defaults: Dict[str, str],
+    stats: Dict[str, int],
+) -> Iterator[Tuple[Any, ...]]:
+    """Staging tuples of usable records; counts the rest as invalid."""
+    for line, record in records:
+        stats["received"] += 1
+        values = {**defaults, **{key: value.strip() for key, value in record.items()}}
+        if (
+            not values.get("source_word")
+            or not values.get("translated_word")
+            or any(
+                len(values.get(column) or "") > limit
+                for column, limit in COLUMN_LIMITS.items()
+            )
+        ):
+            stats["invalid"] += 1
+            continue
+        if not values.get("difficulty_level"):
+            level = estimate_difficulty(
+                values["source_word"], values.get("source_language") or "es"
+            )
+            values.pop("difficulty_level", None)
+            if level:
+                values["difficulty_level"] = level
+        yield (import_id, line, *(values.get(column) for column in STAGING_COLUMNS[2:]))
+
+
+class _CopySource(io.RawIOBase):
+    """Readable CSV view of staging tuples, consumed lazily by ``COPY``."""
+
+    def __init__(self, rows: Iterator[Tuple[Any, ...]]) -> None:
+        self._rows = rows
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = list(islice(self._rows, 500))
+            if not chunk:
+                break
+            text = io.StringIO()
+            # Empty unquoted fields are NULL in COPY's CSV format
+            csv.writer(text, lineterminator="\n").writerows(chunk)
+            self._buffer += text.getvalue().encode("utf-8")
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _load_staging(session: Session, rows: Iterator[Tuple[Any, ...]]) -> None:
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {FlashcardImportRow.__tablename__} "
+                f"({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                _CopySource(rows),
+            )
+        finally:
+            cursor.close()
+        return
+    table = FlashcardImportRow.__table__
+    while chunk := list(islice(rows, STAGING_CHUNK_SIZE)):
+        connection.execute(
+            table.insert(), [dict(zip(STAGING_COLUMNS, row)) for row in chunk]
+        )
+
+
+def _merge_staging(session: Session, import_id: str) -> int:
+    """Insert staged rows missing from ``flashcards``; returns the count.
+
+    One statement: duplicates, within the file or against the deck, are left
+    to ``uq_flashcard_source`` (``ON CONFLICT DO NOTHING``); the first line of
+    a repeated key wins.
+    """
+    staging = FlashcardImportRow.__table__
+    version = bump_collection_version(session, "flashcards")
+    columns = STAGING_COLUMNS[2:]
+    rows = (
+        select(
+            *(staging.c[column] for column in columns),
+            literal(False),
+            literal(version),
+        )
+        .where(staging.c.import_id == import_id)
+        .order_by(staging.c.line)
+    )
+    targets = [*columns, "is_manual", "change_seq"]
+    cards = Flashcard.__table__
+    if session.connection().dialect.name == "postgresql":
+        statement = (
+            postgresql.insert(cards)
+            .from_select(targets, rows)
+            .on_conflict_do_nothing(constraint="uq_flashcard_source")
+        )
+    else:
+        statement = insert(cards).from_select(targets, rows).prefix_with("OR IGNORE")
+    created = session.execute(statement).rowcount
+    session.execute(staging.delete().where(staging.c.import_id == import_id))
+    return created
+
+
+def import_deck(
+    session: Session,
+    stream: IO[bytes],
+    deck_format: str,
+    source_language: str | None = None,
+    native_language: str | None = None,
+) -> Dict[str, Any]:
+    """Import a CSV/TSV/Anki deck in one transaction; returns the counts.
+
+    ``source_language`` and ``native_language`` fill in rows (and whole Anki
+    decks) that don't name their languages.
+    """
+    defaults = {
+        "source_language": (source_language or "es").strip().lower(),
+        "native_language": (native_language or get_settings().default_native_language)
+        .strip()
+        .lower(),
+    }
+    import_id = str(uuid.uuid4())
+    stats = {"received": 0, "invalid": 0}
+    try:
+        _load_staging(
+            session,
+            _staging_rows(iter_deck(stream, deck_format), import_id, defaults, stats),
+        )
+        created = _merge_staging(session, import_id)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    result = {
+        "format": deck_format,
+        "received": stats["received"],
+        "created": created,
+        "skipped": stats["received"] - stats["invalid"] - created,
+        "invalid": stats["invalid"],
+    }
+    logger.info("Imported deck: %s", result)
+    return result
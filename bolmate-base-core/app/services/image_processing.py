@@ -0,0 +1,136 @@
+"""Image preparation for the Vision OCR path.
+
+Phone photos are sent at a fraction of their original size: the Vision model
+scales every image to fit 2048x2048 and then to 768px on the shortest side
+before tiling, so anything larger only costs upload time.  Images are also
+auto-rotated from EXIF and recompressed as JPEG.  Each image gets a SHA-256
+``digest`` of its normalized pixels, the exact cache key, and a difference
+hash (dHash) ``fingerprint`` used only to recognise re-saved copies of the
+same worksheet.
+
+Pillow is optional; without it the original bytes are sent unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+from typing import IO, TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+MAX_SIDE = 2048
+MAX_SHORT_SIDE = 768
+# Images that fit a single 512px tile lose nothing with ``detail="low"``.
+LOW_DETAIL_SIDE = 512
+JPEG_QUALITY = 85
+# 16x16 gradients (256 bits): an 8x8 hash mostly captures the page layout,
+# which worksheets printed from the same template share.
+HASH_SIZE = 16
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+class PreparedImage(NamedTuple):
+    content: bytes | IO[bytes]
+    mime_type: str
+    detail: str
+    # SHA-256 of the oriented, downscaled RGB pixels, or of the raw bytes when
+    # the image could not be decoded
+    digest: str
+    # dHash, ``None`` when the image could not be decoded
+    fingerprint: str | None
+    # Width / height after orientation, ``None`` when not decoded
+    aspect_ratio: float | None
+
+
+def prepare_image(source: bytes | IO[bytes], mime_type: str) -> PreparedImage:
+    """Orient, downscale and recompress ``source`` for the Vision API.
+
+    ``source`` is raw bytes or a seekable binary file.  Undecodable files are
+    passed through as is, with a digest of their bytes and no fingerprint.
+    """
+    stream = io.BytesIO(source) if isinstance(source, bytes) else source
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        logger.warning("Pillow not installed, sending images unprocessed")
+        return _unprocessed(stream, mime_type)
+
+    try:
+        stream.seek(0)
+        with Image.open(stream) as original:
+            # Only ``in_place`` transposes return None; copy so the image
+            # outlives the file either way
+            image = ImageOps.exif_transpose(original) or original.copy()
+            if image.mode in ("RGBA", "LA", "P"):
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, "white")
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+    except Exception as exc:
+        logger.warning("Could not decode image, sending it unprocessed: %s", exc)
+        return _unprocessed(stream, mime_type)
+
+    fingerprint = dhash(image)
+    aspect_ratio = image.width / image.height
+    scale = min(
+        1.0,
+        MAX_SIDE / max(image.size),
+        MAX_SHORT_SIDE / min(image.size),
+    )
+    if scale < 1.0:
+        size = (
+            max(round(image.width * scale), 1),
+            max(round(image.height * scale), 1),
+        )
+        image = image.resize(size, Image.Resampling.LANCZOS)
+
+    digest = hashlib.sha256(f"{image.width}x{image.height}:".encode())
+    digest.update(image.tobytes())
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    detail = "low" if max(image.size) <= LOW_DETAIL_SIDE else "high"
+    return PreparedImage(
+        buffer.getvalue(),
+        "image/jpeg",
+        detail,
+        digest.hexdigest(),
+        fingerprint,
+        aspect_ratio,
+    )
+
+
+def dhash(image: "Image.Image") -> str:
+    """Difference hash of a Pillow image as ``HASH_SIZE ** 2 // 4`` hex digits."""
+    from PIL import Image
+
+    small = image.convert("L").resize(
+        (HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS
+    )
+    pixels = small.tobytes()
+    value = 0
+    for row in range(HASH_SIZE):
+        for column in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + column]
+            right = pixels[row * (HASH_SIZE + 1) + column + 1]
+            value = (value << 1) | (left > right)
+    return f"{value:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def hash_distance(first: str, second: str) -> int:
+    """Number of differing bits between two hex hashes."""
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def _unprocessed(stream: IO[bytes], mime_type: str) -> PreparedImage:
+    stream.seek(0)
+    digest = hashlib.sha256()
+    while chunk := stream.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return PreparedImage(stream, mime_type, "auto", digest.hexdigest(), None, None)
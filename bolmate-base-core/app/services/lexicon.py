@@ -0,0 +1,222 @@
+"""Offline bilingual lexicons used to translate common words without OpenAI.
+
+A lexicon is a single file per language pair (``<source>-<native>.lex``)::
+
+    header   b"BLX1" + uint32 entry count
+    index    uint32 offset per entry, sorted by key
+    records  b"key\\tvalue\\n" in UTF-8, sorted by key
+
+Files are memory-mapped and searched with a binary search over the offset
+index, so lookups touch a handful of pages and nothing is parsed on load.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import struct
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from app.services.text_preprocessing import Term, normalize_word
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BLX1"
+_HEADER = struct.Struct("<4sI")
+_OFFSET = struct.Struct("<I")
+
+_lexicon_cache: Dict[str, "Lexicon"] = {}
+
+
+class Lexicon:
+    """Read-only, memory-mapped view of a ``.lex`` file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.source_language, _, self.native_language = self.path.stem.partition("-")
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a lexicon file")
+        self._data_start = _HEADER.size + self._count * _OFFSET.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, word: str) -> bool:
+        return self.lookup(word) is not None
+
+    def _record(self, position: int) -> Tuple[bytes, bytes]:
+        (offset,) = _OFFSET.unpack_from(
+            self._map, _HEADER.size + position * _OFFSET.size
+        )
+        start = self._data_start + offset
+        end = self._map.find(b"\n", start)
+        key, _, value = self._map[start:end].partition(b"\t")
+        return key, value
+
+    def lookup(self, word: str) -> str | None:
+        key = normalize_word(word).encode("utf-8")
+        low, high = 0, self._count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            candidate, value = self._record(middle)
+            if candidate == key:
+                return value.decode("utf-8")
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return None
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+
+def build_lexicon(entries: Iterable[Tuple[str, str]], path: str | Path) -> int:
+    """Write ``(word, translation)`` pairs to ``path``; returns the entry count.
+
+    Keys are normalized and the first translation seen for a key wins.
+    """
+    records: Dict[bytes, bytes] = {}
+    for word, translation in entries:
+        key = normalize_word(word)
+        value = " ".join(translation.split())
+        if not key or not value:
+            continue
+        records.setdefault(key.encode("utf-8"), value.encode("utf-8"))
+
+    offsets: List[int] = []
+    blob = bytearray()
+    for record_key in sorted(records):
+        offsets.append(len(blob))
+        blob += record_key + b"\t" + records[record_key] + b"\n"
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".lex.tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, len(offsets)))
+        for offset in offsets:
+            fh.write(_OFFSET.pack(offset))
+        fh.write(blob)
+    tmp_path.replace(path)
+    _forget(path)
+    return len(offsets)
+
+
+def read_tsv(path: str | Path) -> Iterator[Tuple[str, str]]:
+    """Yield ``(word, translation)`` pairs from a two-column TSV word list."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip() or line.startswith("#"):
+                continue
+            columns = line.rstrip("\n").split("\t")
+            if len(columns) >= 2:
+                yield columns[0], columns[1]
+
+
+def lexicon_path(source_language: str, native_language: str) -> Path:
+    directory = Path(get_settings().lexicon_dir)
+    return directory / f"{source_language.lower()}-{native_language.lower()}.lex"
+
+
+def get_lexicons(native_language: str) -> List[Lexicon]:
+    """Return every installed lexicon translating into ``native_language``."""
+    directory = Path(get_settings().lexicon_dir)
+    if not directory.is_dir():
+        return []
+    lexicons = []
+    for path in sorted(directory.glob(f"*-{native_language.lower()}.lex")):
+        key = str(path)
+        if key not in _lexicon_cache:
+            try:
+                _lexicon_cache[key] = Lexicon(path)
+            except (OSError, ValueError, struct.error) as exc:
+                logger.warning("Skipping unreadable lexicon %s: %s", path, exc)
+                continue
+        lexicons.append(_lexicon_cache[key])
+    return lexicons
+
+
+def resolve_known_words(
+    terms: Iterable[Term],
+    native_language: str,
+    source_language: str | None = None,
+) -> Tuple[List[Dict[str, str]], List[Term]]:
+    """Split ``terms`` into lexicon hits and the terms left for the model.
+
+    Only the lexicon of the text's ``source_language`` is used; when it is not
+    given, it is detected from the words a single lexicon knows.  If it can't
+    be told, only words exactly one lexicon knows are resolved and words
+    shared by several lexicons ("red" in English and Spanish) go to the model.
+
+    Returns interpreted items for known terms and the remaining terms in their
+    original order.
+    """
+    lexicons = get_lexicons(native_language)
+    if source_language is not None:
+        source_language = source_language.lower()
+        lexicons = [lex for lex in lexicons if lex.source_language == source_language]
+    matches: List[Tuple[Term, Dict[str, str]]] = []
+    for term in terms:
+        found: Dict[str, str] = {}
+        for lexicon in lexicons:
+            translation = lexicon.lookup(term.key)
+            if translation is not None:
+                found[lexicon.source_language] = translation
+        matches.append((term, found))
+    if source_language is None:
+        source_language = _dominant_language(found for _, found in matches)
+
+    known: List[Dict[str, str]] = []
+    unknown: List[Term] = []
+    for term, found in matches:
+        if source_language is not None:
+            found = {
+                language: translation
+                for language, translation in found.items()
+                if language == source_language
+            }
+        if len(found) != 1:
+            unknown.append(term)
+            continue
+        ((language, translation),) = found.items()
+        known.append(
+            {
+                "source_word": term.word,
+                "source_language": language,
+                "translated_word": translation,
+                "native_language": native_language,
+            }
+        )
+    return known, unknown
+
+
+def _dominant_language(matches: Iterable[Dict[str, str]]) -> str | None:
+    """Language with the most words no other lexicon knows, if there is one."""
+    counts = Counter(
+        next(iter(found)) for found in matches if len(found) == 1
+    ).most_common(2)
+    if not counts or (len(counts) == 2 and counts[0][1] == counts[1][1]):
+        return None
+    return counts[0][0]
+
+
+def clear_lexicon_cache() -> None:
+    for lexicon in _lexicon_cache.values():
+        lexicon.close()
+    _lexicon_cache.clear()
+
+
+def _forget(path: Path) -> None:
+    lexicon = _lexicon_cache.pop(str(path), None)
+    if lexicon is not None:
+        lexicon.close()
@@ -0,0 +1,106 @@
+"""Micro-batching of concurrent calls into one handler call.
+
+Callers ``submit`` an item and block until its result is ready.  While no
+batch is running, an item is handled at once on its own.  Items submitted
+while a batch runs queue up: the first of them leads the next batch and
+waits up to ``max_wait`` seconds, or until no batch runs anymore, for others
+to join, then calls the handler for the whole batch in its own (calling)
+thread while the others wait on their results.  A batch that reaches
+``max_size`` is run at once by the caller that filled it.  Batches always run
+on a submitting caller's thread; there is no background thread, so a quiet
+batcher costs nothing.
+
+The handler runs under the latest request deadline of the batch (none if a
+caller has none), so a short deadline of one caller doesn't cut off the
+others.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Generic, List, Sequence, Tuple, TypeVar
+
+from app import deadlines
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    def __init__(self, handler: Callable[[List[T]], Sequence[R]]) -> None:
+        # Returns one result per item, in order
+        self._handler = handler
+        self._lock = threading.Lock()
+        self._joined = threading.Condition(self._lock)
+        # ``(item, future, deadline)`` of the batch being gathered
+        self._pending: List[Tuple[T, Future, float | None]] = []
+        self._running = 0
+
+    def submit(
+        self,
+        item: T,
+        max_size: int,
+        max_wait: float,
+        timeout: float | None = None,
+    ) -> R:
+        """Result for ``item``; raises what the handler raised for its batch.
+
+        ``timeout`` bounds the wait for a batch led by another caller
+        (``concurrent.futures.TimeoutError``).
+        """
+        future: Future = Future()
+        with self._lock:
+            batch = self._pending
+            batch.append((item, future, deadlines.current()))
+            if len(batch) >= max_size or not self._running:
+                # Full, or idle: nothing to wait for
+                self._pending = []
+                self._joined.notify_all()
+            elif len(batch) == 1:
+                # Lead the batch: give others up to ``max_wait`` to join
+                until = time.monotonic() + max_wait
+                while self._pending is batch:
+                    left = until - time.monotonic()
+                    if left <= 0 or not self._running:
+                        self._pending = []
+                        break
+                    self._joined.wait(left)
+                else:
+                    # Filled up and run by the caller that completed it
+                    batch = []
+            else:
+                batch = []
+            if batch:
+                self._running += 1
+        if batch:
+            try:
+                self._run(batch)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._joined.notify_all()
+        return future.result(timeout)
+
+    def _run(self, batch: List[Tuple[T, Future, float | None]]) -> None:
+        ends = [deadline for _, _, deadline in batch if deadline is not None]
+        # Without a deadline for every caller, the batch has none
+        left = max(ends) - time.monotonic() if len(ends) == len(batch) else None
+        try:
+            with deadlines.deadline_scope(left):
+                results = self._handler([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch handler returned {len(results)} results for "
+                    f"{len(batch)} items"
+                )
+        except BaseException as exc:
+            # Even on KeyboardInterrupt or SystemExit nobody may wait forever
+            for _, future, _ in batch:
+                future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+            return
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
@@ -2,12 +2,28 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import io
 import logging
+import time
+from collections import Counter
 from functools import lru_cache
-from typing import Any, Dict, List
+from typing import IO, Any, Dict, List, NamedTuple, Tuple
 
 from openai import OpenAI
 
+from app import deadlines
+from app.clients import client_key
+from app.deadlines import DeadlineExceeded
+from app.metrics import record_cache_lookup, record_openai_call
+from app.services.circuit_breaker import SHORT_CIRCUITS, CircuitOpenError, get_breaker
+from app.services.difficulty import guess_language
+from app.services.docx_extraction import read_docx
+from app.services.image_processing import PreparedImage, hash_distance, prepare_image
+from app.services.lexicon import get_lexicons, resolve_known_words
+from app.services.micro_batching import MicroBatcher
+from app.services.prompt_encoding import batch_cards, encode_cards, results_by_index
+from app.services.text_preprocessing import extract_terms, format_terms, normalize_text
+from app.services.usage_ledger import LEDGER, shared_by
 from config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -15,6 +31,36 @@ logger = logging.getLogger(__name__)
 # In-memory cache for AI responses (consider Redis in production)
 _response_cache: Dict[str, Any] = {}
 
+# Columns each operation actually needs from a serialized flashcard, and the
+# approximate reply size per card used to size batches and ``max_tokens``.
+ENRICH_FIELDS = ("source_word", "source_language", "translated_word")
+ENRICH_TOKENS_PER_ITEM = 60
+TRANSLATE_FIELDS = ("source_word", "source_language", "example_sentence")
+TRANSLATE_TOKENS_PER_ITEM = 40
+HINT_FIELDS = ("source_word", "translated_word", "source_language", "native_language")
+HINT_KEYS = ("hint", "example_sentence", "example_translation")
+HINT_TOKENS_PER_ITEM = 80
+QUIZ_FIELDS = (
+    "source_word",
+    "translated_word",
+    "source_language",
+    "native_language",
+    "example_sentence",
+)
+REPLY_OVERHEAD_TOKENS = 50
+
+# Perceptual hashes of images with cached Vision results, per native language,
+# as (dHash, aspect ratio, pixel digest).  An image whose exact digest misses
+# reuses the result of one with the same aspect ratio and a dHash within this
+# many bits, i.e. a re-saved or recompressed copy of the same page.
+_vision_fingerprints: Dict[str, List[Tuple[str, float, str]]] = {}
+VISION_HASH_MAX_DISTANCE = 4
+VISION_ASPECT_TOLERANCE = 0.01
+
+DOCX_MIME_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+
 
 def _cache_key(*args) -> str:
     """Generate cache key from arguments."""
@@ -33,12 +79,66 @@ def _set_cached_response(key: str, value: Any) -> None:
     _response_cache[key] = value
 
 
-def _get_client() -> OpenAI | None:
+def get_client() -> OpenAI | None:
     settings = get_settings()
     if not settings.openai_api_key:
         logger.warning("OPENAI_API_KEY not configured; AI features disabled")
         return None
-    return OpenAI(api_key=settings.openai_api_key)
+    return OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+
+
+def _create_completion(
+    client: OpenAI, operation: str, language: str | None = None, **params: Any
+) -> Any:
+    """``client.chat.completions.create`` behind the operation's breaker.
+
+    Calls are recorded in metrics and the usage ledger; ``language`` is the
+    learner language the call works for, for accounting.  Raises
+    ``CircuitOpenError`` without calling OpenAI while the breaker is open,
+    so callers fall back at once.  Within a request deadline the call times
+    out when the deadline passes, raising ``DeadlineExceeded``.
+    """
+    left = deadlines.remaining()
+    if left is not None:
+        if left <= 0:
+            raise DeadlineExceeded("Request deadline exceeded before OpenAI call")
+        # A retry would start the whole timeout over
+        client = client.with_options(timeout=left, max_retries=0)
+    breaker = get_breaker(operation)
+    if not breaker.allow():
+        SHORT_CIRCUITS.inc(operation=operation)
+        raise CircuitOpenError(f"OpenAI {operation} circuit is open")
+    model = params.get("model", "")
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(**params)
+    except Exception as exc:
+        latency = time.perf_counter() - started
+        record_openai_call(operation, model, latency, error=exc)
+        LEDGER.record(
+            operation, model=model, language=language, latency=latency, error=exc
+        )
+        if left is not None and latency >= left:
+            # Cut short by the caller's deadline, which says nothing about
+            # the health of the API
+            breaker.discard()
+            raise DeadlineExceeded("Request deadline exceeded during OpenAI call")
+        breaker.record(False, latency)
+        raise
+    latency = time.perf_counter() - started
+    breaker.record(True, latency)
+    usage = getattr(response, "usage", None)
+    record_openai_call(operation, model, latency, usage=usage)
+    LEDGER.record(
+        operation, model=model, language=language, usage=usage, latency=latency
+    )
+    return response
+
+
+def _note_cache_lookup(operation: str, hit: bool, language: str) -> None:
+    record_cache_lookup(operation, hit)
+    if hit:
+        LEDGER.record(operation, language=language, cache_hit=True)
 
 
 def generate_hint_for_flashcard(
@@ -52,21 +152,57 @@ def generate_hint_for_flashcard(
         "hint", source_word, translated_word, native_language, source_language
     )
     cached = _get_cached_response(cache_key)
+    _note_cache_lookup("hint", bool(cached), native_language)
     if cached:
         return cached
 
-    client = _get_client()
-    if not client:
+    if not get_client():
         return {}
 
     settings = get_settings()
-    prompt = (
-        f"Language tutor. Native: {native_language}. "
-        f"For '{source_word}' ({translated_word}): short hint + example in {source_language}. "
-        f"JSON: hint, example_sentence, example_translation."
-    )
+    card = {
+        "source_word": source_word,
+        "translated_word": translated_word,
+        "source_language": source_language,
+        "native_language": native_language,
+        # Charged its share of a batched completion
+        "client": client_key(),
+    }
+    left = deadlines.remaining()
     try:
-        response = client.chat.completions.create(
+        # Hints asked for at about the same time share one completion
+        result = _hint_batcher.submit(
+            card,
+            max_size=settings.hint_batch_size,
+            max_wait=settings.hint_batch_window_ms / 1000,
+            timeout=None if left is None else max(left, 0),
+        )
+    except Exception as exc:  # pragma: no cover - external dependency
+        logger.exception("Failed to generate hint: %s", exc)
+        return {}
+    if result:
+        _set_cached_response(cache_key, result)
+    return result
+
+
+def _generate_hints(cards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Hints for a micro-batch of cards, one completion for all of them."""
+    client = get_client()
+    if not client:
+        return [{} for _ in cards]
+    settings = get_settings()
+    if len(cards) == 1:
+        card = cards[0]
+        prompt = (
+            f"Language tutor. Native: {card['native_language']}. "
+            f"For '{card['source_word']}' ({card['translated_word']}): "
+            f"short hint + example in {card['source_language']}. "
+            "JSON: hint, example_sentence, example_translation."
+        )
+        response = _create_completion(
+            client,
+            "hint",
+            language=card["native_language"],
             model=settings.openai_model,
             temperature=0.7,
             max_tokens=500,
@@ -74,54 +210,142 @@ def generate_hint_for_flashcard(
             response_format={"type": "json_object"},
         )
         message = response.choices[0].message.content
-        result = message and _safe_parse_json(message) or {}
-        _set_cached_response(cache_key, result)
-        return result
-    except Exception as exc:  # pragma: no cover - external dependency
-        logger.exception("Failed to generate hint: %s", exc)
-        return {}
+        return [message and _safe_parse_json(message) or {}]
+
+    languages = {card["native_language"] for card in cards}
+    prompt = (
+        "Language tutor. Cards are TSV (i = row id). For each card: short hint "
+        "in native_language + example sentence in source_language. "
+        "JSON 'hints' array: i, hint, example_sentence, example_translation."
+    )
+    with shared_by([card["client"] for card in cards]):
+        response = _create_completion(
+            client,
+            "hint",
+            language=languages.pop() if len(languages) == 1 else None,
+            model=settings.openai_model,
+            temperature=0.7,
+            max_tokens=_reply_budget(len(cards), HINT_TOKENS_PER_ITEM),
+            messages=[
+                {
+                    "role": "user",
+                    "content": f"{prompt}\n{encode_cards(cards, HINT_FIELDS)}",
+                }
+            ],
+            response_format={"type": "json_object"},
+        )
+    parsed = _safe_parse_json(response.choices[0].message.content)
+    results = results_by_index(parsed.get("hints")) if isinstance(parsed, dict) else {}
+    return [
+        {
+            key: results[index][key]
+            for key in HINT_KEYS
+            if index in results and results[index].get(key)
+        }
+        for index in range(len(cards))
+    ]
+
+
+_hint_batcher: MicroBatcher[Dict[str, Any], Dict[str, Any]] = MicroBatcher(
+    _generate_hints
+)
 
 
 def enrich_flashcards(
     words: List[Dict[str, Any]], native_language: str
 ) -> List[Dict[str, Any]]:
-    client = _get_client()
+    client = get_client()
     if not client:
         return words
 
-    # Limit batch size to 50 cards
-    MAX_BATCH = 50
-    if len(words) > MAX_BATCH:
-        logger.info(f"Processing {len(words)} cards in batches of {MAX_BATCH}")
-        batch1 = enrich_flashcards(words[:MAX_BATCH], native_language)
-        batch2 = enrich_flashcards(words[MAX_BATCH:], native_language)
-        return batch1 + batch2
-
     settings = get_settings()
-    prompt = (
-        "Enrich flashcards: add example_sentence, example_translation, difficulty_level (A1/A2/B1). "
-        "JSON array same order with new fields."
+    batches = list(
+        batch_cards(
+            words,
+            ENRICH_FIELDS,
+            settings.openai_batch_token_budget,
+            max(settings.openai_max_output_tokens // ENRICH_TOKENS_PER_ITEM, 1),
+        )
     )
+    if len(batches) > 1:
+        logger.info(f"Processing {len(words)} cards in {len(batches)} batches")
+    enriched: List[Dict[str, Any]] = []
+    for batch, table in batches:
+        # Stop once nobody waits for the result anymore
+        deadlines.check()
+        enriched.extend(_enrich_batch(client, batch, table, native_language))
+    return enriched
+
+
+def _enrich_batch(
+    client: OpenAI,
+    batch: List[Dict[str, Any]],
+    table: str,
+    native_language: str,
+) -> List[Dict[str, Any]]:
+    parsed: Any = {}
     try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
-            temperature=0.5,
-            max_tokens=1500,
-            messages=[
-                {"role": "system", "content": prompt},
-                {
-                    "role": "user",
-                    "content": f"Native: {native_language}. Items: {words}",
-                },
-            ],
-            response_format={"type": "json_object"},
+        response = _create_completion(
+            client,
+            "enrich",
+            language=native_language,
+            **enrich_request_body(len(batch), table, native_language),
         )
         message = response.choices[0].message.content
         parsed = _safe_parse_json(message)
-        return parsed.get("items", words) if isinstance(parsed, dict) else words
+    except DeadlineExceeded:
+        raise
     except Exception as exc:  # pragma: no cover
         logger.exception("Failed to enrich flashcards: %s", exc)
-        return words
+    return _merge_enrichment(batch, parsed)
+
+
+def enrich_request_body(
+    batch_size: int, table: str, native_language: str
+) -> Dict[str, Any]:
+    """Chat completion parameters for enriching one encoded batch."""
+    settings = get_settings()
+    prompt = (
+        "Enrich flashcards given as TSV (i = row id): example sentence in the source "
+        "language, its translation, difficulty level (A1/A2/B1). "
+        "JSON 'items' array: i, s (sentence), t (translation), d (level)."
+    )
+    return {
+        "model": settings.openai_model,
+        "temperature": 0.5,
+        "max_tokens": _reply_budget(batch_size, ENRICH_TOKENS_PER_ITEM),
+        "messages": [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": f"Native: {native_language}\n{table}"},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+
+
+def parse_enrichment(batch: List[Dict[str, Any]], reply: str) -> List[Dict[str, Any]]:
+    """Merge the raw message of an enrichment reply into the cards of its batch."""
+    return _merge_enrichment(batch, _safe_parse_json(reply))
+
+
+def _merge_enrichment(batch: List[Dict[str, Any]], parsed: Any) -> List[Dict[str, Any]]:
+    """Merge a parsed enrichment reply into the cards of its batch."""
+    results = results_by_index(parsed.get("items")) if isinstance(parsed, dict) else {}
+    override = get_settings().llm_difficulty_override
+    enriched = []
+    for index, card in enumerate(batch):
+        result = results.get(index, {})
+        fields = [("s", "example_sentence"), ("t", "example_translation")]
+        # The model levels cards without a local estimate, and replaces
+        # estimates only when ``llm_difficulty_override`` is set
+        if override or not card.get("difficulty_level"):
+            fields.append(("d", "difficulty_level"))
+        enriched.append(
+            {
+                **card,
+                **{field: result[key] for key, field in fields if result.get(key)},
+            }
+        )
+    return enriched
 
 
 def generate_quiz_questions(
@@ -131,17 +355,20 @@ def generate_quiz_questions(
     if num_questions <= 5:
         return _fallback_quiz(cards, num_questions)
 
-    client = _get_client()
+    client = get_client()
     if not client or not cards:
         return _fallback_quiz(cards, num_questions)
 
     settings = get_settings()
     prompt = (
-        "Create diverse quiz (translation, multiple_choice, fill_in). "
+        "Create diverse quiz (translation, multiple_choice, fill_in) from flashcards "
+        "given as TSV. "
         "JSON with 'questions' array: question, type, answer, optional options."
     )
     try:
-        response = client.chat.completions.create(
+        response = _create_completion(
+            client,
+            "quiz",
             model=settings.openai_model,
             temperature=0.5,
             max_tokens=1500,
@@ -149,7 +376,7 @@ def generate_quiz_questions(
                 {"role": "system", "content": prompt},
                 {
                     "role": "user",
-                    "content": f"Flashcards: {cards[:num_questions]}",
+                    "content": encode_cards(cards[:num_questions], QUIZ_FIELDS),
                 },
             ],
             response_format={"type": "json_object"},
@@ -163,32 +390,67 @@ def generate_quiz_questions(
     return _fallback_quiz(cards, num_questions)
 
 
+class Interpretation(NamedTuple):
+    items: List[Dict[str, Any]]
+    # False when the model was not asked or failed (no client, open breaker,
+    # errors): ``items`` then hold only local matches.  An expired deadline
+    # raises ``DeadlineExceeded`` instead.
+    complete: bool
+
+
 def interpret_text_with_ai(text: str, native_language: str) -> List[Dict[str, Any]]:
+    return interpret_text(text, native_language).items
+
+
+def interpret_text(text: str, native_language: str) -> Interpretation:
+    text = normalize_text(text)
     # Check cache first
     cache_key = _cache_key("interpret", text, native_language)
     cached = _get_cached_response(cache_key)
+    _note_cache_lookup("interpret_text", bool(cached), native_language)
     if cached:
-        return cached
+        return Interpretation(cached, True)
+
+    # Send unique terms with one context each instead of the whole text, and
+    # resolve common vocabulary from local lexicons so only the terms they
+    # don't know reach the model.
+    terms = extract_terms(text)
+    local_items: List[Dict[str, Any]] = []
+    if get_lexicons(native_language):
+        local_items, terms = resolve_known_words(terms, native_language)
+        if not terms:
+            _set_cached_response(cache_key, local_items)
+            return Interpretation(local_items, True)
+        content = format_terms(terms)
+    else:
+        compact = format_terms(terms)
+        content = compact if len(compact) < len(text) else text
+    if not content:
+        return Interpretation(local_items, True)
 
-    client = _get_client()
+    client = get_client()
     if not client:
-        return []
+        return Interpretation(local_items, False)
 
     settings = get_settings()
     prompt = (
         "Extract vocabulary from text. Preserve translation pairs (e.g. 'si - yes'). "
+        "Lines 'term | context' list one term each; extract only the term. "
         f"Merge duplicates. Translate to {native_language}. "
         f"IMPORTANT: source_language ≠ {native_language}. Only extract words NOT in {native_language}. "
         "JSON array 'items': source_word, source_language, translated_word, native_language."
     )
     try:
-        response = client.chat.completions.create(
+        response = _create_completion(
+            client,
+            "interpret_text",
+            language=native_language,
             model=settings.openai_model,
             temperature=0.3,
             max_tokens=2000,
             messages=[
                 {"role": "system", "content": prompt},
-                {"role": "user", "content": text},
+                {"role": "user", "content": content},
             ],
             response_format={"type": "json_object"},
         )
@@ -214,56 +476,129 @@ def interpret_text_with_ai(text: str, native_language: str) -> List[Dict[str, An
 
             filtered_items.append(item)
 
+        filtered_items = local_items + filtered_items
         _set_cached_response(cache_key, filtered_items)
-        return filtered_items
+        return Interpretation(filtered_items, True)
+    except DeadlineExceeded:
+        raise
     except Exception as exc:  # pragma: no cover
         logger.exception("Interpretation failed: %s", exc)
-        return []
+        return Interpretation(local_items, False)
 
 
 def interpret_file_with_ai(
-    file_content: bytes, filename: str, mime_type: str | None, native_language: str
+    file_content: bytes | IO[bytes],
+    filename: str,
+    mime_type: str | None,
+    native_language: str,
 ) -> List[Dict[str, Any]]:
-    """Interpret files with OCR + AI. Supports PDF, DOCX, TXT, images (PNG, JPG)."""
-    client = _get_client()
-    if not client:
-        return []
+    """Interpret files with OCR + AI. Supports PDF, DOCX, TXT, images (PNG, JPG).
 
-    settings = get_settings()
-    text_content = ""
+    ``file_content`` may be a seekable binary file (e.g. a spooled upload) so
+    extractors read from disk instead of a second in-memory copy.
+    """
+    return interpret_file(file_content, filename, mime_type, native_language).items
 
-    # Extract text based on file type
-    if mime_type and mime_type.startswith("text"):
-        text_content = file_content.decode("utf-8", errors="ignore")
-    elif mime_type == "application/pdf":
-        text_content = _extract_text_from_pdf(file_content)
-    elif (
-        mime_type
-        == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    ):
-        text_content = _extract_text_from_docx(file_content)
-    elif mime_type and mime_type.startswith("image/"):
+
+def interpret_file(
+    file_content: bytes | IO[bytes],
+    filename: str,
+    mime_type: str | None,
+    native_language: str,
+) -> Interpretation:
+    stream = (
+        io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
+    )
+    if mime_type and mime_type.startswith("image/"):
         # Use OpenAI Vision API for OCR
-        return _interpret_image_with_vision(file_content, mime_type, native_language)
-    else:
-        logger.warning(f"Unsupported file type: {mime_type}")
-        return []
+        return _interpret_image(stream, mime_type, native_language)
+
+    return interpret_extracted_content(
+        extract_content_from_file(stream, mime_type), native_language
+    )
+
+
+class ExtractedContent(NamedTuple):
+    # ``None`` for types without a text layer (images, unsupported formats)
+    text: str | None
+    # ``(word, translation, language)`` rows of vocabulary tables, where
+    # ``language`` is the translation column's, ``None`` if it can't be told
+    pairs: List[Tuple[str, str, str | None]]
 
-    if not text_content.strip():
-        return []
 
-    # Use standard text interpretation
-    return interpret_text_with_ai(text_content, native_language)
+def extract_content_from_file(
+    stream: IO[bytes], mime_type: str | None
+) -> ExtractedContent:
+    """Extract the text layer and vocabulary table pairs of a document."""
+    stream.seek(0)
+    if mime_type and mime_type.startswith("text"):
+        return ExtractedContent(stream.read().decode("utf-8", errors="ignore"), [])
+    if mime_type == "application/pdf":
+        return ExtractedContent(_extract_text_from_pdf(stream), [])
+    if mime_type == DOCX_MIME_TYPE:
+        return _extract_content_from_docx(stream)
+    if not (mime_type and mime_type.startswith("image/")):
+        logger.warning(f"Unsupported file type: {mime_type}")
+    return ExtractedContent(None, [])
+
+
+def interpret_extracted_content(
+    content: ExtractedContent, native_language: str
+) -> Interpretation:
+    """Turn table pairs into items directly and interpret the remaining text.
+
+    Only pairs translated into ``native_language`` are taken as they are; the
+    rows of tables in other or unknown languages are interpreted with the text.
+    """
+    native_language = native_language.lower()
+    pairs = [
+        (word, translation)
+        for word, translation, language in content.pairs
+        if language == native_language
+    ]
+    text = "\n".join(
+        [content.text or ""]
+        + [
+            f"{word} - {translation}"
+            for word, translation, language in content.pairs
+            if language != native_language
+        ]
+    )
+    items: List[Dict[str, Any]] = []
+    complete = True
+    if text.strip():
+        items, complete = interpret_text(text, native_language)
+    if not pairs:
+        return Interpretation(items, complete)
+
+    # Pairs carry no source language; borrow the one the model saw in the file
+    languages = Counter(
+        item.get("source_language") for item in items if item.get("source_language")
+    )
+    source_language = languages.most_common(1)[0][0] if languages else None
+    known = {item.get("source_word", "").strip().lower() for item in items}
+    pair_items = []
+    for word, translation in pairs:
+        if word.lower() in known:
+            continue
+        known.add(word.lower())
+        item = {
+            "source_word": word,
+            "translated_word": translation,
+            "native_language": native_language,
+        }
+        if source_language:
+            item["source_language"] = source_language
+        pair_items.append(item)
+    return Interpretation(pair_items + items, complete)
 
 
-def _extract_text_from_pdf(content: bytes) -> str:
+def _extract_text_from_pdf(content: IO[bytes]) -> str:
     """Extract text from PDF file."""
     try:
-        import io
-
         import PyPDF2
 
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+        pdf_reader = PyPDF2.PdfReader(content)
         text = ""
         for page in pdf_reader.pages:
             text += page.extract_text() + "\n"
@@ -276,41 +611,53 @@ def _extract_text_from_pdf(content: bytes) -> str:
         return ""
 
 
-def _extract_text_from_docx(content: bytes) -> str:
-    """Extract text from DOCX file."""
-    try:
-        import io
-
-        import docx
+def _extract_content_from_docx(content: IO[bytes]) -> ExtractedContent:
+    """Extract text and vocabulary table pairs from DOCX file.
 
-        doc = docx.Document(io.BytesIO(content))
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text
-    except ImportError:
-        logger.warning("python-docx not installed, cannot process DOCX")
-        return ""
+    A table's translation language comes from its header row or, failing
+    that, from the words of its translation column.
+    """
+    try:
+        docx = read_docx(content)
+        pairs: List[Tuple[str, str, str | None]] = []
+        for table in docx.tables:
+            language = table.language or guess_language(
+                translation for _, translation in table.pairs
+            )
+            pairs.extend(
+                (word, translation, language) for word, translation in table.pairs
+            )
+        return ExtractedContent(docx.text, pairs)
     except Exception as exc:
         logger.exception(f"Failed to extract text from DOCX: {exc}")
-        return ""
+        return ExtractedContent("", [])
 
 
 def _interpret_image_with_vision(
-    image_content: bytes, mime_type: str, native_language: str
+    image_content: bytes | IO[bytes], mime_type: str, native_language: str
 ) -> List[Dict[str, Any]]:
     """Use OpenAI Vision API for OCR + interpretation."""
-    # Cache by image hash
-    image_hash = hashlib.md5(image_content).hexdigest()
-    cache_key = _cache_key("vision", image_hash, native_language)
+    return _interpret_image(image_content, mime_type, native_language).items
+
+
+def _interpret_image(
+    image_content: bytes | IO[bytes], mime_type: str, native_language: str
+) -> Interpretation:
+    image = prepare_image(image_content, mime_type)
+    cache_key = _cache_key("vision", image.digest, native_language)
     cached = _get_cached_response(cache_key)
+    if not cached:
+        # Re-saved copies differ in pixels but not in their perceptual hash
+        cached = _find_similar_vision_result(image, native_language)
+    _note_cache_lookup("interpret_image", bool(cached), native_language)
     if cached:
-        return cached
+        return Interpretation(cached, True)
 
-    client = _get_client()
+    client = get_client()
     if not client:
-        return []
+        return Interpretation([], False)
 
-    settings = get_settings()
-    base64_image = encode_file_to_base64(image_content)
+    base64_image = encode_file_to_base64(image.content)
 
     prompt = (
         "Extract vocabulary from image. Preserve translation pairs (e.g. 'si - yes'). "
@@ -320,7 +667,10 @@ def _interpret_image_with_vision(
     )
 
     try:
-        response = client.chat.completions.create(
+        response = _create_completion(
+            client,
+            "interpret_image",
+            language=native_language,
             model="gpt-4o-mini",  # 80% cheaper than gpt-4o
             max_tokens=2000,
             messages=[
@@ -331,7 +681,8 @@ def _interpret_image_with_vision(
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:{mime_type};base64,{base64_image}"
+                                "url": f"data:{image.mime_type};base64,{base64_image}",
+                                "detail": image.detail,
                             },
                         },
                     ],
@@ -362,75 +713,160 @@ def _interpret_image_with_vision(
             filtered_items.append(item)
 
         _set_cached_response(cache_key, filtered_items)
-        return filtered_items
+        _remember_vision_fingerprint(image, native_language)
+        return Interpretation(filtered_items, True)
+    except DeadlineExceeded:
+        raise
     except Exception as exc:
         logger.exception(f"Vision API interpretation failed: {exc}")
-        return []
+        return Interpretation([], False)
+
+
+def _find_similar_vision_result(
+    image: PreparedImage, native_language: str
+) -> List[Dict[str, Any]] | None:
+    """Cached Vision result of a near-identical image, if any."""
+    if image.fingerprint is None or image.aspect_ratio is None:
+        return None
+    for fingerprint, aspect_ratio, digest in _vision_fingerprints.get(
+        native_language, []
+    ):
+        if (
+            abs(aspect_ratio - image.aspect_ratio)
+            <= VISION_ASPECT_TOLERANCE * image.aspect_ratio
+            and hash_distance(fingerprint, image.fingerprint)
+            <= VISION_HASH_MAX_DISTANCE
+        ):
+            cached = _get_cached_response(_cache_key("vision", digest, native_language))
+            if cached:
+                return cached
+    return None
+
+
+def _remember_vision_fingerprint(image: PreparedImage, native_language: str) -> None:
+    if image.fingerprint is None or image.aspect_ratio is None:
+        return
+    entry = (image.fingerprint, image.aspect_ratio, image.digest)
+    fingerprints = _vision_fingerprints.setdefault(native_language, [])
+    if entry in fingerprints:
+        return
+    if len(fingerprints) > 1000:  # Same limit as the response cache
+        fingerprints.pop(0)
+    fingerprints.append(entry)
 
 
 def translate_flashcards(
     cards: List[Dict[str, Any]], target_language: str
 ) -> List[Dict[str, Any]]:
-    """Translate provided flashcards to the target language while keeping structure intact."""
+    """Translate provided flashcards to the target language while keeping structure intact.
+
+    Each item carries ``translated``: False when the model gave no translation
+    for it and the item still holds the card's old-language content.
+    """
 
-    client = _get_client()
+    client = get_client()
     if not client or not cards:
         # Fallback: keep the structure and simply mark the new language without altering content.
         return [
             {
                 **card,
                 "native_language": target_language,
+                "translated": False,
             }
             for card in cards
         ]
 
-    # Limit batch size to 50 cards
-    MAX_BATCH = 50
-    if len(cards) > MAX_BATCH:
-        logger.info(f"Translating {len(cards)} cards in batches of {MAX_BATCH}")
-        batch1 = translate_flashcards(cards[:MAX_BATCH], target_language)
-        batch2 = translate_flashcards(cards[MAX_BATCH:], target_language)
-        return batch1 + batch2
-
+    settings = get_settings()
+    batches = list(
+        batch_cards(
+            cards,
+            TRANSLATE_FIELDS,
+            settings.openai_batch_token_budget,
+            max(settings.openai_max_output_tokens // TRANSLATE_TOKENS_PER_ITEM, 1),
+        )
+    )
+    if len(batches) > 1:
+        logger.info(f"Translating {len(cards)} cards in {len(batches)} batches")
+    translated: List[Dict[str, Any]] = []
+    for batch, table in batches:
+        deadlines.check()
+        translated.extend(_translate_batch(client, batch, table, target_language))
+    return translated
+
+
+def _translate_batch(
+    client: OpenAI,
+    batch: List[Dict[str, Any]],
+    table: str,
+    target_language: str,
+) -> List[Dict[str, Any]]:
     settings = get_settings()
     system_prompt = (
-        "Multilingual flashcard translator. Preserve id/structure. "
-        "Translate learner-facing fields (translated_word, example_sentence, notes, hints) to target language. "
-        "Keep source_word, source_language unchanged. JSON 'flashcards' array same order."
+        "Multilingual flashcard translator. Cards are TSV (i = row id). "
+        "Translate source_word and example_sentence to the target language. "
+        "JSON 'flashcards' array: i, w (translated word), e (translated example)."
     )
-
+    results: Dict[int, Dict[str, Any]] = {}
     try:
-        response = client.chat.completions.create(
+        response = _create_completion(
+            client,
+            "translate",
+            language=target_language,
             model=settings.openai_model,
             temperature=0.3,
-            max_tokens=2000,
+            max_tokens=_reply_budget(len(batch), TRANSLATE_TOKENS_PER_ITEM),
             messages=[
                 {"role": "system", "content": system_prompt},
                 {
                     "role": "user",
-                    "content": f"Target: {target_language}. Cards: {cards}",
+                    "content": f"Target: {target_language}\n{table}",
                 },
             ],
             response_format={"type": "json_object"},
         )
         message = response.choices[0].message.content
         parsed = _safe_parse_json(message)
-        if isinstance(parsed, dict) and isinstance(parsed.get("flashcards"), list):
-            return parsed["flashcards"]
+        if isinstance(parsed, dict):
+            results = results_by_index(parsed.get("flashcards"))
+    except DeadlineExceeded:
+        raise
     except Exception as exc:  # pragma: no cover - external dependency
         logger.exception("Translation failed: %s", exc)
 
-    return [
-        {
-            **card,
-            "native_language": target_language,
-        }
-        for card in cards
-    ]
+    translated = []
+    for index, card in enumerate(batch):
+        result = results.get(index, {})
+        translated.append(
+            {
+                **card,
+                "native_language": target_language,
+                "translated_word": result.get("w") or card.get("translated_word"),
+                # Never carry over the example translation of the old language
+                "example_sentence_translated": result.get("e") or None,
+                "translated": bool(result.get("w")),
+            }
+        )
+    return translated
+
+
+def _reply_budget(items: int, tokens_per_item: int) -> int:
+    """``max_tokens`` for a reply covering ``items`` cards."""
+    return min(
+        items * tokens_per_item + REPLY_OVERHEAD_TOKENS,
+        get_settings().openai_max_output_tokens,
+    )
+
 
+def encode_file_to_base64(source: bytes | IO[bytes]) -> str:
+    """Base64-encode bytes or a whole binary file.
 
-def encode_file_to_base64(file_bytes: bytes) -> str:
-    return base64.b64encode(file_bytes).decode("utf-8")
+    The file is read into memory; the encoding and the data URL built from it
+    are further full copies, so only pass images already downscaled.
+    """
+    if not isinstance(source, bytes):
+        source.seek(0)
+        source = source.read()
+    return base64.b64encode(source).decode("ascii")
 
 
 def _safe_parse_json(text: str) -> Dict[str, Any]:
@@ -0,0 +1,79 @@
+"""Dense encoding of flashcards for prompts and token-budgeted batching.
+
+Cards are sent as a TSV table holding only the columns an operation needs,
+with the row number as a short id (``i``) instead of the database id.  The
+model answers with the same ``i`` so results are matched back to cards
+without relying on the order of the reply.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: about four UTF-8 bytes per token.
+
+    Counting bytes rather than characters keeps accented and non-Latin text,
+    which tokenizes into more pieces, from being underestimated.
+    """
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    return " ".join(str(value).split())
+
+
+def encode_row(index: int, card: Dict[str, Any], fields: Sequence[str]) -> str:
+    return "\t".join([str(index), *(_cell(card.get(field)) for field in fields)])
+
+
+def encode_cards(cards: Sequence[Dict[str, Any]], fields: Sequence[str]) -> str:
+    """Encode ``cards`` as a TSV table with an ``i`` column and ``fields``."""
+    lines = ["\t".join(["i", *fields])]
+    lines.extend(encode_row(index, card, fields) for index, card in enumerate(cards))
+    return "\n".join(lines)
+
+
+def batch_cards(
+    cards: Sequence[Dict[str, Any]],
+    fields: Sequence[str],
+    token_budget: int,
+    max_items: int,
+) -> Iterator[Tuple[List[Dict[str, Any]], str]]:
+    """Split ``cards`` into batches whose encoded table fits ``token_budget``.
+
+    Each batch holds at most ``max_items`` cards (usually derived from the
+    reply size) and at least one card, even if that card alone is over budget.
+    Yields ``(batch, encoded_table)`` pairs.
+    """
+    header_tokens = estimate_tokens("\t".join(["i", *fields]))
+    batch: List[Dict[str, Any]] = []
+    used = header_tokens
+    for card in cards:
+        row_tokens = estimate_tokens(encode_row(len(batch), card, fields)) + 1
+        if batch and (used + row_tokens > token_budget or len(batch) >= max_items):
+            yield batch, encode_cards(batch, fields)
+            batch, used = [], header_tokens
+            row_tokens = estimate_tokens(encode_row(0, card, fields)) + 1
+        batch.append(card)
+        used += row_tokens
+    if batch:
+        yield batch, encode_cards(batch, fields)
+
+
+def results_by_index(items: Any) -> Dict[int, Dict[str, Any]]:
+    """Map a model reply list of ``{"i": ..., ...}`` objects by ``i``."""
+    results: Dict[int, Dict[str, Any]] = {}
+    if not isinstance(items, list):
+        return results
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            results[int(item["i"])] = item
+        except (KeyError, TypeError, ValueError):
+            continue
+    return results
@@ -0,0 +1,153 @@
+"""Local clean-up of learner texts before they are sent to the model.
+
+Extracted documents repeat words, page headers and page numbers many times.
+This module normalizes the text, drops that boilerplate and reduces it to a
+list of unique terms, each with one short context snippet, which is usually
+a fraction of the original prompt size.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Set
+
+WORD_RE = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+_SPACE_RE = re.compile(r"[^\S\n]+")
+_DIGITS_RE = re.compile(r"\d+")
+_PAGE_NUMBER_RE = re.compile(
+    r"^[\W_]*(?:page|p\.|strona|seite|página|pagina)?\s*\d+"
+    r"(?:\s*(?:/|of|z|von|de)\s*\d+)?[\W_]*$",
+    re.IGNORECASE,
+)
+
+# Lines seen at least this often (ignoring digits) are treated as headers or
+# footers repeated on every page.
+BOILERPLATE_MIN_REPEATS = 3
+BOILERPLATE_MAX_WORDS = 12
+CONTEXT_WINDOW = 4
+
+# Function words of the supported languages, keyed by language; they carry
+# little vocabulary value and dominate long texts.  A word that is a function
+# word in one language is often a real word in another (German "die" and
+# "den", Dutch "van", English "to" in a Polish text), so only the set of the
+# text's own language is applied.
+STOP_WORDS: Dict[str, FrozenSet[str]] = {
+    language: frozenset(words.split())
+    for language, words in {
+        "en": """a an and are as at be but by for from if in into is it of on or
+            that the this to was were with""",
+        "es": """de del el en es la las lo los que un una unos unas y o al por
+            con para se""",
+        "de": "der die das den dem des ein eine einen einem und oder ist im zu mit von",
+        "fr": "le les un une des et ou du au aux est en dans pour sur",
+        "nl": "het een en of is van op te dat",
+        "pl": "i w z na do że się to jest nie o a",
+    }.items()
+}
+
+
+class Term(NamedTuple):
+    """A unique word together with one snippet showing how it is used."""
+
+    word: str
+    key: str
+    context: str
+
+
+def normalize_word(word: str) -> str:
+    """Normalized lookup key for a word (NFC, case-folded)."""
+    return unicodedata.normalize("NFC", word).strip().casefold()
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize ``text``, collapse whitespace and drop page boilerplate."""
+    text = unicodedata.normalize("NFC", text)
+    text = "".join(
+        char for char in text if char in "\n\t" or unicodedata.category(char)[0] != "C"
+    )
+    lines = [_SPACE_RE.sub(" ", line).strip() for line in text.splitlines()]
+    return "\n".join(collapse_boilerplate(line for line in lines if line))
+
+
+def collapse_boilerplate(lines: Iterable[str]) -> List[str]:
+    """Remove page numbers and repeats of short lines seen on many pages.
+
+    The first occurrence of a repeated line is kept: a header still names the
+    unit once and a word list line repeated across pages is not lost.
+    """
+    lines = [line for line in lines if not _PAGE_NUMBER_RE.match(line)]
+    shapes = [_DIGITS_RE.sub("#", line.casefold()) for line in lines]
+    counts = Counter(shapes)
+    seen: Set[str] = set()
+    kept = []
+    for line, shape in zip(lines, shapes):
+        if (
+            shape in seen
+            and counts[shape] >= BOILERPLATE_MIN_REPEATS
+            and len(line.split()) <= BOILERPLATE_MAX_WORDS
+        ):
+            continue
+        seen.add(shape)
+        kept.append(line)
+    return kept
+
+
+def stop_word_language(keys: Iterable[str]) -> str | None:
+    """Language whose function words occur most often among ``keys``.
+
+    Returns ``None`` when no language's stop words occur or two languages tie.
+    """
+    keys = list(keys)
+    counts = Counter(
+        {
+            language: sum(key in words for key in keys)
+            for language, words in STOP_WORDS.items()
+        }
+    ).most_common(2)
+    if not counts[0][1] or counts[0][1] == counts[1][1]:
+        return None
+    return counts[0][0]
+
+
+def extract_terms(
+    text: str, drop_stop_words: bool = True, source_language: str | None = None
+) -> List[Term]:
+    """Unique terms of normalized ``text`` in order of first appearance.
+
+    Stop words are dropped only for ``source_language``, or for the language
+    detected from them when it is not given; if the language can't be told,
+    every word is kept.
+    """
+    lines = [list(WORD_RE.finditer(line)) for line in text.splitlines()]
+    stop_words: FrozenSet[str] = frozenset()
+    if drop_stop_words:
+        if source_language is None:
+            source_language = stop_word_language(
+                normalize_word(match.group(0)) for matches in lines for match in matches
+            )
+        if source_language is not None:
+            stop_words = STOP_WORDS.get(source_language.lower(), frozenset())
+    terms: dict[str, Term] = {}
+    for line, matches in zip(text.splitlines(), lines):
+        for index, match in enumerate(matches):
+            key = normalize_word(match.group(0))
+            if key in terms or key in stop_words:
+                continue
+            if len(matches) <= 2 * CONTEXT_WINDOW + 1:
+                context = line
+            else:
+                first = matches[max(index - CONTEXT_WINDOW, 0)]
+                last = matches[min(index + CONTEXT_WINDOW, len(matches) - 1)]
+                context = line[first.start() : last.end()]
+            terms[key] = Term(match.group(0), key, context)
+    return list(terms.values())
+
+
+def format_terms(terms: Iterable[Term]) -> str:
+    """Render terms as ``term | context`` lines for the prompt."""
+    return "\n".join(
+        term.word if term.context == term.word else f"{term.word} | {term.context}"
+        for term in terms
+    )
@@ -0,0 +1,225 @@
+"""OpenAI token usage ledger.
+
+Every chat completion (and every response-cache hit) is recorded with its
+operation, caller, language, model, token counts and latency.  Entries are
+buffered in process and written in one multi-row ``INSERT`` once
+``usage_ledger_batch_size`` entries are waiting or the oldest is
+``usage_ledger_flush_seconds`` old, whether or not more traffic comes.
+Flushes run on a background thread, so requests never wait on a ledger
+write; what is left is flushed when the process exits.
+
+A completion serving several clients at once (micro-batched hints) is
+recorded inside ``shared_by``: each client gets an entry with its share of
+the tokens.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy import Integer, case, cast, func
+from sqlalchemy.orm import Session
+
+from app.clients import client_key
+from app.db import session as db_session
+from app.models import OpenAIUsage
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+GROUP_COLUMNS = {
+    "operation": OpenAIUsage.operation,
+    "client": OpenAIUsage.client,
+    "language": OpenAIUsage.language,
+    "model": OpenAIUsage.model,
+    "day": func.date(OpenAIUsage.created_at),
+}
+
+# Clients of the items a shared completion serves, one per item
+_shared_by: ContextVar[Sequence[str] | None] = ContextVar("shared_by", default=None)
+
+TOTAL_COLUMNS = (
+    "cache_hits",
+    "errors",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+)
+
+
+class UsageLedger:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buffer: List[Dict[str, Any]] = []
+        # Flushes the buffer once its oldest entry is due
+        self._timer: threading.Timer | None = None
+        # Entries taken off the buffer by a flush still writing them
+        self._writing = 0
+
+    def record(
+        self,
+        operation: str,
+        *,
+        model: str | None = None,
+        language: str | None = None,
+        usage: Any = None,
+        latency: float = 0.0,
+        cache_hit: bool = False,
+        error: BaseException | None = None,
+    ) -> None:
+        """Buffer one entry; ``usage`` is a completion's ``usage`` object.
+
+        Inside ``shared_by`` the tokens are split between its clients, one
+        entry each.
+        """
+        details = getattr(usage, "prompt_tokens_details", None)
+        shares = Counter(_shared_by.get() or [client_key()])
+        tokens = {
+            "prompt_tokens": _split(getattr(usage, "prompt_tokens", None), shares),
+            "completion_tokens": _split(
+                getattr(usage, "completion_tokens", None), shares
+            ),
+            "cached_tokens": _split(getattr(details, "cached_tokens", None), shares),
+        }
+        created_at = datetime.now(timezone.utc)
+        entries = [
+            {
+                "operation": operation,
+                "client": client,
+                "language": (language or "")[:10].lower() or None,
+                "model": model,
+                **{key: values[index] for key, values in tokens.items()},
+                "latency_ms": int(latency * 1000),
+                "cache_hit": cache_hit,
+                "error": type(error).__name__ if error is not None else None,
+                "created_at": created_at,
+            }
+            for index, client in enumerate(shares)
+        ]
+        settings = get_settings()
+        with self._lock:
+            self._buffer.extend(entries)
+            due = len(self._buffer) >= settings.usage_ledger_batch_size
+            if not due and self._timer is None:
+                self._timer = threading.Timer(
+                    settings.usage_ledger_flush_seconds, self.flush
+                )
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            threading.Thread(target=self.flush, daemon=True).start()
+
+    def flush(self) -> int:
+        """Write buffered entries; returns how many were written."""
+        with self._lock:
+            entries, self._buffer = self._buffer, []
+            timer, self._timer = self._timer, None
+            self._writing += len(entries)
+        if timer is not None:
+            timer.cancel()
+        if not entries:
+            return 0
+        try:
+            # Own connection: never commits the caller's session
+            with db_session.engine.begin() as connection:
+                connection.execute(OpenAIUsage.__table__.insert(), entries)
+        except Exception as exc:
+            logger.exception("Dropped %d usage ledger entries: %s", len(entries), exc)
+            return 0
+        finally:
+            with self._lock:
+                self._writing -= len(entries)
+        return len(entries)
+
+    def pending(self) -> int:
+        """Entries buffered or still being written."""
+        with self._lock:
+            return len(self._buffer) + self._writing
+
+
+def _split(total: int | None, shares: Counter[str]) -> List[int]:
+    """``total`` split in proportion to ``shares``; rounding goes to the first."""
+    total = total or 0
+    weight = sum(shares.values())
+    parts = [total * count // weight for count in shares.values()]
+    parts[0] += total - sum(parts)
+    return parts
+
+
+@contextmanager
+def shared_by(clients: Sequence[str]) -> Iterator[None]:
+    """Charge entries recorded in the block to ``clients``, one per item."""
+    token = _shared_by.set(clients)
+    try:
+        yield
+    finally:
+        _shared_by.reset(token)
+
+
+LEDGER = UsageLedger()
+atexit.register(LEDGER.flush)
+
+
+def estimated_cost(prompt: int, completion: int, cached: int) -> float:
+    """USD cost of the given token counts at the configured prices."""
+    settings = get_settings()
+    return (
+        (prompt - cached) * settings.openai_prompt_price_per_million
+        + cached * settings.openai_cached_prompt_price_per_million
+        + completion * settings.openai_completion_price_per_million
+    ) / 1_000_000
+
+
+def usage_report(
+    session: Session,
+    group_by: Sequence[str],
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> List[Dict[str, Any]]:
+    """Ledger totals per ``group_by`` combination, most expensive first."""
+    keys = [GROUP_COLUMNS[name].label(name) for name in group_by]
+    query = session.query(
+        *keys,
+        func.count(OpenAIUsage.id).label("calls"),
+        func.sum(cast(OpenAIUsage.cache_hit, Integer)).label("cache_hits"),
+        func.sum(case((OpenAIUsage.error.isnot(None), 1), else_=0)).label("errors"),
+        func.sum(OpenAIUsage.prompt_tokens).label("prompt_tokens"),
+        func.sum(OpenAIUsage.completion_tokens).label("completion_tokens"),
+        func.sum(OpenAIUsage.cached_tokens).label("cached_tokens"),
+        func.avg(OpenAIUsage.latency_ms).label("avg_latency_ms"),
+    )
+    if since is not None:
+        query = query.filter(OpenAIUsage.created_at >= since)
+    if until is not None:
+        query = query.filter(OpenAIUsage.created_at < until)
+    if keys:
+        query = query.group_by(*keys)
+
+    rows = []
+    for row in query:
+        values = row._asdict()
+        if not values["calls"]:
+            continue
+        for name in TOTAL_COLUMNS:
+            values[name] = int(values[name] or 0)
+        values["avg_latency_ms"] = round(float(values["avg_latency_ms"] or 0), 1)
+        values["estimated_cost_usd"] = round(
+            estimated_cost(
+                values["prompt_tokens"],
+                values["completion_tokens"],
+                values["cached_tokens"],
+            ),
+            6,
+        )
+        if "day" in values and values["day"] is not None:
+            values["day"] = str(values["day"])
+        rows.append(values)
+    rows.sort(key=lambda values: values["estimated_cost_usd"], reverse=True)
+    return rows
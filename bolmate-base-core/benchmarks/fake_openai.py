@@ -0,0 +1,164 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers ``POST /v1/chat/completions`` after a configurable latency with a
+JSON reply every ``openai_service`` operation can parse: TSV card tables in
+the prompt are echoed back as per-row results (``i``), and hint, quiz and
+interpretation keys are always present.  Run it on its own with
+
+    python -m benchmarks.fake_openai [--port 8765] [--latency-ms 300]
+
+and point the app at it with ``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+def _table_rows(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Rows of the TSV card table in the last user message, if any."""
+    content = messages[-1].get("content") if messages else ""
+    if not isinstance(content, str):
+        return []
+    lines = content.splitlines()
+    for start, line in enumerate(lines):
+        if line.startswith("i\t"):
+            header = line.split("\t")
+            return [
+                dict(zip(header, row.split("\t")))
+                for row in lines[start + 1 :]
+                if row.split("\t", 1)[0].isdigit()
+            ]
+    return []
+
+
+def reply_content(body: Dict[str, Any]) -> Dict[str, Any]:
+    rows = _table_rows(body.get("messages") or [])
+    results = [
+        {
+            "i": int(row["i"]),
+            "w": f"{row.get('source_word', '')}~",
+            "e": f"{row.get('example_sentence', '')}~",
+            "s": f"Frase con {row.get('source_word', '')}.",
+            "t": "Zdanie.",
+            "d": random.choice(("A1", "A2", "B1")),
+        }
+        for row in rows
+    ]
+    return {
+        "items": results
+        or [
+            {
+                "source_word": "gato",
+                "source_language": "es",
+                "translated_word": "kot",
+                "native_language": "pl",
+            }
+        ],
+        "flashcards": results,
+        "hints": [
+            {
+                "i": result["i"],
+                "hint": "Think of a cat.",
+                "example_sentence": result["s"],
+                "example_translation": result["t"],
+            }
+            for result in results
+        ],
+        "questions": [
+            {"question": f"Q{index}", "type": "translation", "answer": "a"}
+            for index in range(len(rows) or 1)
+        ],
+        "hint": "Think of a cat.",
+        "example_sentence": "El gato duerme.",
+        "example_translation": "Kot śpi.",
+    }
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency_ms: float = 300.0, jitter: float = 0.2):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeOpenAIServer
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server API
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.server._lock:
+            self.server.calls += 1
+        latency = self.server.latency_ms / 1000
+        time.sleep(
+            max(
+                latency
+                * random.uniform(1 - self.server.jitter, 1 + self.server.jitter),
+                0,
+            )
+        )
+
+        content = json.dumps(reply_content(body))
+        prompt_tokens = len(json.dumps(body.get("messages"))) // 4
+        completion_tokens = len(content) // 4
+        payload = json.dumps(
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    args = parser.parse_args()
+    server = FakeOpenAIServer(args.port, args.latency_ms)
+    print(f"Fake OpenAI API on {server.base_url} ({args.latency_ms:g} ms)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Micro-benchmark of flashcard list encoding.
+
+Compares encode throughput of a flashcard list response with the standard
+library provider (the previous default) and the orjson provider, for both
+ORM-style dicts with pre-formatted dates and row tuples mapped with
+``rows_to_dicts``.
+
+    python -m benchmarks.json_encoding [--cards 100000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import IsoJSONProvider, OrjsonProvider, orjson, rows_to_dicts
+from app.routes.flashcards import FLASHCARD_KEYS
+
+
+def make_rows(count: int) -> list[tuple]:
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        (
+            index,
+            f"palabra{index}",
+            "es",
+            f"słowo{index}",
+            "pl",
+            f"Esta es la palabra{index} en una frase.",
+            f"To jest słowo{index} w zdaniu.",
+            "A2",
+            index % 3 == 0,
+            index % 7,
+            index % 5,
+            started + timedelta(seconds=index),
+        )
+        for index in range(count)
+    ]
+
+
+def measure(label: str, encode, payload, repeat: int) -> None:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(encode(payload))
+        best = min(best, time.perf_counter() - started)
+    print(
+        f"{label:<34} {best * 1000:9.1f} ms {len(payload) / best:12,.0f} cards/s"
+        f" {size / best / 1e6:8.1f} MB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    rows = make_rows(args.cards)
+    dicts = rows_to_dicts(FLASHCARD_KEYS, rows)
+    preformatted = [
+        {**card, "created_at": card["created_at"].isoformat()} for card in dicts
+    ]
+
+    print(f"{args.cards:,} cards, best of {args.repeat}")
+    with app.app_context():
+        stdlib = DefaultJSONProvider(app)
+        measure("stdlib, isoformat() strings", stdlib.dumps, preformatted, args.repeat)
+        iso = IsoJSONProvider(app)
+        measure("stdlib, datetimes", iso.dumps, dicts, args.repeat)
+        if orjson is None:
+            print("orjson not installed, skipping orjson runs")
+            return
+        fast = OrjsonProvider(app)
+        measure("orjson, datetimes", fast.dumps, dicts, args.repeat)
+        measure(
+            "orjson, row tuples incl. mapping",
+            lambda batch: fast.dumps(rows_to_dicts(FLASHCARD_KEYS, batch)),
+            rows,
+            args.repeat,
+        )
+        measure(
+            "orjson response body",
+            lambda batch: fast.response(batch).get_data(),
+            dicts,
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
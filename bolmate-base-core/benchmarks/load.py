@@ -0,0 +1,329 @@
+"""End-to-end load benchmark of the hot endpoints.
+
+Seeds decks of the given sizes into PostgreSQL, starts the app and a fake
+OpenAI server (``benchmarks.fake_openai``) in process and drives every
+scenario from ``--concurrency`` threads for ``--duration`` seconds.
+Throughput and p50/p95/p99 latency per scenario are printed, saved as JSON
+under ``benchmarks/results/`` and compared with the previous run of the same
+configuration, so regressions show up between versions.
+
+The database from the app settings is emptied before seeding, so point
+``DATABASE_*`` at a dedicated benchmark database and pass
+``--reset-database``:
+
+    python -m benchmarks.load --reset-database --cards 1000,100000,1000000 \\
+        [--concurrency 16] [--duration 20] [--openai-latency-ms 300] \\
+        [--scenarios quiz_get,quiz_answer] [--fail-on-regression]
+
+With ``--base-url`` an already running server (e.g. gunicorn) is measured
+instead; start it with ``OPENAI_BASE_URL`` set to the printed fake server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.fake_openai import FakeOpenAIServer
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SEED_CHUNK_SIZE = 100_000
+TARGET_LANGUAGES = ("en", "de", "fr", "it")
+WORDS = ("gato", "perro", "casa", "sol", "mar", "luna", "libro", "agua", "pan")
+
+Request = Tuple[str, str, Dict[str, Any] | None]
+
+
+def _random_ids(rng: random.Random, cards: int, count: int) -> List[int]:
+    return [rng.randint(1, cards) for _ in range(count)]
+
+
+def scenarios(cards: int) -> Dict[str, Callable[[random.Random], Request]]:
+    """Request factories per scenario; ids assume a freshly seeded table."""
+    return {
+        "list_flashcards": lambda rng: ("GET", "/api/flashcards", None),
+        "quiz_get": lambda rng: ("GET", "/api/quiz", None),
+        "quiz_answer": lambda rng: (
+            "POST",
+            "/api/quiz",
+            {"flashcard_id": rng.randint(1, cards), "answer": "respuesta"},
+        ),
+        "bulk_create": lambda rng: (
+            "POST",
+            "/api/flashcards/bulk",
+            {
+                "flashcards": [
+                    {"source_word": f"bench-{uuid.uuid4().hex}", "translated_word": "x"}
+                    for _ in range(20)
+                ]
+            },
+        ),
+        "switch_language": lambda rng: (
+            "POST",
+            "/api/languages/switch",
+            {
+                "target_language": rng.choice(TARGET_LANGUAGES),
+                "flashcard_ids": _random_ids(rng, cards, 20),
+                "force_retranslate": True,
+            },
+        ),
+        "interpret": lambda rng: (
+            "POST",
+            "/api/interpret",
+            {
+                "text": " ".join(rng.choices(WORDS, k=12)) + f" {uuid.uuid4().hex}",
+                "native_language": "pl",
+            },
+        ),
+    }
+
+
+def seed(cards: int) -> None:
+    """Replace the deck with ``cards`` generated flashcards using ``COPY``."""
+    from app.db.session import engine
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            "TRUNCATE flashcards, flashcard_translations, flashcard_tombstones, "
+            "quiz_items, quizzes, openai_usage RESTART IDENTITY CASCADE"
+        )
+        levels = ("A1", "A2", "B1")
+        for start in range(0, cards, SEED_CHUNK_SIZE):
+            buffer = io.StringIO()
+            for index in range(start, min(start + SEED_CHUNK_SIZE, cards)):
+                buffer.write(
+                    f"palabra{index}\tes\tsłowo{index}\tpl\t"
+                    f"Esta es la palabra{index}.\tTo jest słowo{index}.\t"
+                    f"{levels[index % 3]}\tf\t{index % 7}\t{index % 5}\t1\n"
+                )
+            buffer.seek(0)
+            cursor.copy_expert(
+                "COPY flashcards (source_word, source_language, translated_word, "
+                "native_language, example_sentence, example_sentence_translated, "
+                "difficulty_level, is_manual, correct_count, incorrect_count, "
+                "change_seq) FROM STDIN",
+                buffer,
+            )
+        cursor.execute(
+            "INSERT INTO collection_versions (name, version) VALUES ('flashcards', 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = collection_versions.version + 1"
+        )
+        connection.commit()
+        cursor.execute("ANALYZE flashcards")
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_scenario(
+    base_url: str,
+    factory: Callable[[random.Random], Request],
+    concurrency: int,
+    duration: float,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        with httpx.Client(base_url=base_url, timeout=120) as client:
+            while time.perf_counter() < deadline:
+                method, path, body = factory(rng)
+                started = time.perf_counter()
+                try:
+                    status = str(client.request(method, path, json=body).status_code)
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(
+        count for status, count in statuses.items() if not status.startswith("2")
+    )
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / wall, 2),
+        **{
+            f"p{int(fraction * 100)}_ms": round(
+                percentile(latencies, fraction) * 1000, 2
+            )
+            for fraction in (0.5, 0.95, 0.99)
+        },
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _previous_run(config: Dict[str, Any]) -> Dict[str, Any] | None:
+    if not RESULTS_DIR.exists():
+        return None
+    for path in sorted(RESULTS_DIR.glob("*.json"), reverse=True):
+        run = json.loads(path.read_text())
+        if run.get("config") == config:
+            return run
+    return None
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], threshold: float) -> int:
+    """Print p95 / throughput changes; returns the number of regressions."""
+    regressions = 0
+    print(f"\nCompared with {previous['version']} ({previous['created_at']}):")
+    for cards, results in current["results"].items():
+        for name, result in results.items():
+            before = previous["results"].get(cards, {}).get(name)
+            if not before or not before["p95_ms"]:
+                continue
+            change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+            flag = ""
+            if change > threshold:
+                regressions += 1
+                flag = "  REGRESSION"
+            print(
+                f"  {cards:>9} {name:<16} p95 {before['p95_ms']:9.1f} -> "
+                f"{result['p95_ms']:9.1f} ms ({change:+.0%}), throughput "
+                f"{before['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} rps"
+                f"{flag}"
+            )
+    return regressions
+
+
+def _start_app(fake: FakeOpenAIServer, concurrency: int) -> str:
+    # Settings are read once, so configure them before the app is imported
+    os.environ["OPENAI_BASE_URL"] = fake.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    # Measure the endpoints, not the admission limits
+    os.environ.setdefault("AI_RATE_PER_MINUTE", "1000000000")
+    os.environ.setdefault("AI_RATE_BURST", "1000000000")
+    os.environ.setdefault("AI_MAX_CONCURRENCY", str(concurrency))
+
+    from werkzeug.serving import make_server
+
+    from app import create_app
+
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", default="1000,100000,1000000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--openai-latency-ms", type=float, default=300.0)
+    parser.add_argument("--scenarios", help="Comma-separated subset to run")
+    parser.add_argument("--base-url", help="Measure a running server instead")
+    parser.add_argument("--reset-database", action="store_true")
+    parser.add_argument("--regression-threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    if not args.reset_database:
+        parser.error("--reset-database is required: the deck is replaced by seeding")
+    sizes = [int(size) for size in args.cards.split(",")]
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios(1))
+    unknown = set(selected) - set(scenarios(1))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    fake = FakeOpenAIServer(latency_ms=args.openai_latency_ms).start()
+    print(f"Fake OpenAI API on {fake.base_url} ({args.openai_latency_ms:g} ms)")
+    base_url = args.base_url or _start_app(fake, args.concurrency)
+
+    config = {
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "openai_latency_ms": args.openai_latency_ms,
+        "scenarios": selected,
+        "cards": sizes,
+    }
+    run: Dict[str, Any] = {
+        "version": _git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": config,
+        "results": {},
+    }
+    for cards in sizes:
+        started = time.perf_counter()
+        seed(cards)
+        print(f"\n{cards:,} cards (seeded in {time.perf_counter() - started:.1f} s)")
+        print(
+            f"  {'scenario':<16} {'requests':>8} {'errors':>6} {'rps':>8} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        results = run["results"][str(cards)] = {}
+        for name in selected:
+            result = run_scenario(
+                base_url, scenarios(cards)[name], args.concurrency, args.duration
+            )
+            results[name] = result
+            print(
+                f"  {name:<16} {result['requests']:>8} {result['errors']:>6} "
+                f"{result['throughput_rps']:>8.1f} {result['p50_ms']:>9.1f} "
+                f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+            )
+    print(f"\nFake OpenAI calls: {fake.calls}")
+
+    previous = _previous_run(config)
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / (
+        f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{run['version']}.json"
+    )
+    path.write_text(json.dumps(run, indent=2))
+    print(f"Saved {path}")
+
+    if previous is not None:
+        regressions = compare(run, previous, args.regression_threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,50 @@ class Settings(BaseSettings):
     sqlalchemy_echo: bool = False
     allow_origin: str = "*"
     openai_api_key: str | None = None
+    openai_base_url: str | None = None
     openai_model: str = "gpt-4o-mini"
     openai_temperature: float = 0.2
+    openai_batch_token_budget: int = 2000
+    openai_max_output_tokens: int = 4000
+    # Hint requests arriving within the window share one completion
+    hint_batch_size: int = 8
+    hint_batch_window_ms: float = 50.0
     default_native_language: str = "pl"
+    lexicon_dir: str = "data/lexicons"
+    # Word rank tables of difficulty estimates (default: app/data's)
+    word_frequency_file: str | None = None
+    # Let enrichment replace estimated difficulty levels with the model's
+    llm_difficulty_override: bool = False
+    batch_work_dir: str = "data/batches"
+    max_upload_file_size: int = 20 * 1024 * 1024
+    max_upload_request_size: int = 50 * 1024 * 1024
+    upload_spool_size: int = 1024 * 1024
+    extraction_store_max_bytes: int = 512 * 1024 * 1024
+    import_batch_size: int = 500
+    max_import_request_size: int = 2 * 1024 * 1024 * 1024
+    # Admission control of AI-backed endpoints ("local" or "postgres" state)
+    admission_backend: str = "local"
+    ai_max_concurrency: int = 8
+    ai_rate_per_minute: float = 20.0
+    ai_rate_burst: int = 10
+    ai_slot_lease_seconds: int = 120
+    # Circuit breakers of OpenAI operations
+    breaker_window_seconds: float = 60.0
+    breaker_min_calls: int = 5
+    breaker_failure_rate: float = 0.5
+    breaker_slow_call_seconds: float = 15.0
+    breaker_open_seconds: float = 30.0
+    # Time budget of requests without one in ``app.deadlines.ROUTE_DEADLINES``
+    request_deadline_seconds: float = 30.0
+    max_request_deadline_seconds: float = 300.0
+    # How long responses of requests with an Idempotency-Key are kept
+    idempotency_ttl_seconds: int = 24 * 60 * 60
+    usage_ledger_batch_size: int = 100
+    usage_ledger_flush_seconds: float = 5.0
+    # USD per million tokens, for usage report cost estimates (gpt-4o-mini)
+    openai_prompt_price_per_million: float = 0.15
+    openai_cached_prompt_price_per_million: float = 0.075
+    openai_completion_price_per_million: float = 0.60
 
     model_config = SettingsConfigDict(
         env_file=(".env", ".env.local"),
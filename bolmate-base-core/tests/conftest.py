@@ -1,9 +1,12 @@
+import json
 import sys
+from types import SimpleNamespace
 from pathlib import Path
 
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT_DIR))
@@ -15,7 +18,13 @@ from app.models import Base
 
 @pytest.fixture()
 def app_client():
-    engine = create_engine("sqlite:///:memory:", future=False)
+    # One shared connection, so background threads see the same database
+    engine = create_engine(
+        "sqlite:///:memory:",
+        future=False,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     TestingSessionLocal = scoped_session(
         sessionmaker(bind=engine, autoflush=False, autocommit=False)
     )
@@ -25,11 +34,17 @@ def app_client():
     # Ensure blueprints reuse the testing session
     import app.routes.users as users_route
     import app.routes.flashcards as flashcards_route
+    import app.routes.interpret as interpret_route
     import app.routes.languages as languages_route
+    import app.routes.quiz as quiz_route
+    import app.routes.usage as usage_route
 
     users_route.SessionLocal = TestingSessionLocal
     flashcards_route.SessionLocal = TestingSessionLocal
+    interpret_route.SessionLocal = TestingSessionLocal
     languages_route.SessionLocal = TestingSessionLocal
+    quiz_route.SessionLocal = TestingSessionLocal
+    usage_route.SessionLocal = TestingSessionLocal
 
     Base.metadata.create_all(engine)
 
@@ -41,3 +56,59 @@ def app_client():
 
     TestingSessionLocal.remove()
     Base.metadata.drop_all(bind=engine)
+
+
+class FakeOpenAI:
+    """Stand-in for the OpenAI client that records chat completion calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.replies = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def with_options(self, **options):
+        self.options = options
+        return self
+
+    def reply(self, payload, usage=None):
+        """Queue a reply; ``usage`` is ``(prompt, completion, cached)`` tokens."""
+        self.replies.append((json.dumps(payload), usage))
+
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        content, usage = self.replies.pop(0) if self.replies else ("{}", None)
+        if usage is not None:
+            prompt, completion, cached = usage
+            usage = SimpleNamespace(
+                prompt_tokens=prompt,
+                completion_tokens=completion,
+                total_tokens=prompt + completion,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+            )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=usage,
+        )
+
+
+@pytest.fixture()
+def fake_openai(monkeypatch):
+    import app.routes.usage as usage_route
+    import app.services.circuit_breaker as circuit_breaker
+    import app.services.openai_service as openai_service
+    import app.services.usage_ledger as usage_ledger
+    from app.services.usage_ledger import UsageLedger
+
+    client = FakeOpenAI()
+    monkeypatch.setattr(openai_service, "get_client", lambda: client)
+    monkeypatch.setattr(openai_service, "_response_cache", {})
+    monkeypatch.setattr(openai_service, "_vision_fingerprints", {})
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    # A fresh ledger per test, shared by the service and the report route
+    ledger = UsageLedger()
+    monkeypatch.setattr(openai_service, "LEDGER", ledger)
+    monkeypatch.setattr(usage_ledger, "LEDGER", ledger)
+    monkeypatch.setattr(usage_route, "LEDGER", ledger)
+    yield client
+    # Write what's left now rather than from a timer during a later test
+    ledger.flush()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import pytest
+
+from app import admission
+from config import get_settings
+
+INTERPRET = {"text": "El gato duerme.", "native_language": "pl"}
+
+
+@pytest.fixture()
+def limits(monkeypatch, app_client):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ai_rate_burst", 2)
+    monkeypatch.setattr(settings, "ai_rate_per_minute", 6.0)
+    monkeypatch.setattr(settings, "ai_max_concurrency", 1)
+    local = app_client.application.extensions["admission"]
+    assert isinstance(local, admission.LocalAdmission)
+    return local
+
+
+def test_token_bucket_limits_each_client(limits, app_client, fake_openai):
+    alice = {"X-User-Id": "alice"}
+    for _ in range(2):
+        assert (
+            app_client.post("/api/interpret", json=INTERPRET, headers=alice).status_code
+            == 200
+        )
+
+    response = app_client.post("/api/interpret", json=INTERPRET, headers=alice)
+    assert response.status_code == 429
+    # One token every 10 s at 6 per minute
+    assert response.headers["Retry-After"] == "10"
+    # Buckets belong to the address; a new user header doesn't escape them
+    other_header = {"X-User-Id": "mallory"}
+    assert (
+        app_client.post(
+            "/api/interpret", json=INTERPRET, headers=other_header
+        ).status_code
+        == 429
+    )
+
+    # Other clients and cheap endpoints are unaffected
+    bob = {"REMOTE_ADDR": "10.0.0.2"}
+    assert (
+        app_client.post("/api/interpret", json=INTERPRET, environ_base=bob).status_code
+        == 200
+    )
+    assert app_client.get("/api/flashcards", headers=alice).status_code == 200
+    # Slots are released after every admitted request
+    assert limits.acquire(1) == "local"
+
+
+def test_concurrency_limit_rejects_while_slots_are_busy(
+    limits, app_client, fake_openai
+):
+    slot = limits.acquire(1)
+    for _ in range(3):
+        response = app_client.post("/api/interpret", json=INTERPRET)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert "in progress" in response.get_json()["error"]
+
+    # Turned away requests got their tokens back
+    limits.release(slot)
+    for _ in range(2):
+        assert app_client.post("/api/interpret", json=INTERPRET).status_code == 200
+
+
+def test_quiz_answers_are_admitted_like_other_ai_requests(
+    limits, app_client, fake_openai
+):
+    card = app_client.post(
+        "/api/flashcards", json={"source_word": "gato", "translated_word": "kot"}
+    ).get_json()
+    answer = {"flashcard_id": card["id"], "answer": "kot"}
+    statuses = [app_client.post("/api/quiz", json=answer).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_zero_rate_blocks_with_a_finite_retry_after(
+    limits, monkeypatch, app_client, fake_openai
+):
+    monkeypatch.setattr(get_settings(), "ai_rate_per_minute", 0.0)
+    for _ in range(2):
+        assert app_client.post("/api/interpret", json=INTERPRET).status_code == 200
+
+    response = app_client.post("/api/interpret", json=INTERPRET)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(admission.MAX_RETRY_AFTER)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+
+from app.db import session as db_session
+from app.models import Flashcard
+from app.services.batch_enrichment import (
+    LocalBatchBackend,
+    collect_backfill,
+    offline_responder,
+    submit_backfill,
+)
+from app.services.difficulty import estimate_difficulty
+from config import get_settings
+
+
+def _respond(body):
+    """Answer every TSV row with an example derived from its source word."""
+    rows = body["messages"][-1]["content"].splitlines()[2:]
+    items = []
+    for row in rows:
+        index, source_word = row.split("\t")[:2]
+        items.append(
+            {"i": int(index), "s": f"{source_word}!", "t": "przykład", "d": "A2"}
+        )
+    return json.dumps({"items": items})
+
+
+def test_backfill_applies_batch_results(monkeypatch, tmp_path, app_client):
+    monkeypatch.setattr(get_settings(), "batch_work_dir", str(tmp_path))
+    session = db_session.SessionLocal()
+    session.add_all(
+        [
+            Flashcard(
+                source_word="hola", translated_word="cześć", native_language="pl"
+            ),
+            Flashcard(
+                source_word="gato",
+                translated_word="kot",
+                native_language="pl",
+                example_sentence="El gato duerme.",
+            ),
+            Flashcard(
+                source_word="casa", translated_word="house", native_language="en"
+            ),
+        ]
+    )
+    session.commit()
+
+    backend = LocalBatchBackend(_respond)
+    batch_id = submit_backfill(session, backend)
+    assert batch_id is not None
+    requests = tmp_path.glob("enrich-*.jsonl")
+    lines = next(requests).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2  # one request per native language
+
+    assert collect_backfill(session, backend, batch_id, poll_interval=0) == 3
+
+    cards = {card.source_word: card for card in session.query(Flashcard)}
+    assert cards["hola"].example_sentence == "hola!"
+    assert cards["hola"].difficulty_level == "A2"
+    assert cards["gato"].example_sentence == "El gato duerme."
+    assert cards["gato"].example_sentence_translated == "przykład"
+    assert cards["casa"].example_sentence_translated == "przykład"
+    session.close()
+
+    assert submit_backfill(db_session.SessionLocal(), backend) is None
+
+
+def test_offline_backfill_fills_local_levels(monkeypatch, tmp_path, app_client):
+    monkeypatch.setattr(get_settings(), "batch_work_dir", str(tmp_path))
+    session = db_session.SessionLocal()
+    session.add(
+        Flashcard(
+            source_word="casa",
+            source_language="es",
+            translated_word="dom",
+            native_language="pl",
+        )
+    )
+    session.commit()
+
+    backend = LocalBatchBackend(offline_responder)
+    batch_id = submit_backfill(session, backend)
+    assert collect_backfill(session, backend, batch_id, poll_interval=0) == 1
+
+    card = session.query(Flashcard).one()
+    assert card.difficulty_level == estimate_difficulty("casa", "es")
+    assert card.example_sentence is None
+    session.close()
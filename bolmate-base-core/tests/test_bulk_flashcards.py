@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from app.db import session as db_session
+from app.models import Quiz, QuizItem
+
+
+def _create(client, word, translation, **extra):
+    response = client.post(
+        "/api/flashcards",
+        json={
+            "source_word": word,
+            "translated_word": translation,
+            "native_language": "pl",
+            "source_language": "es",
+            **extra,
+        },
+    )
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+
+def test_bulk_patch_updates_set_and_reports_conflicts(app_client):
+    hola = _create(app_client, "hola", "cześć")
+    gato = _create(app_client, "gato", "kot")
+    # Same word already exists for English learners
+    _create(app_client, "gato", "cat", native_language="en")
+
+    response = app_client.patch(
+        "/api/flashcards/bulk",
+        json={"ids": [hola, gato, 999], "changes": {"difficulty_level": "A1"}},
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["updated"] == [hola, gato]
+    assert data["conflicts"] == [{"id": 999, "error": "Flashcard not found"}]
+
+    moved = app_client.patch(
+        "/api/flashcards/bulk",
+        json={
+            "filter": {"native_language": "PL", "difficulty_level": "A1"},
+            "changes": {"native_language": "en"},
+        },
+    ).get_json()
+    assert moved["updated"] == [hola]
+    assert moved["conflicts"][0]["id"] == gato
+    assert "already exists" in moved["conflicts"][0]["error"]
+
+    cards = {card["id"]: card for card in app_client.get("/api/flashcards").get_json()}
+    assert cards[hola]["native_language"] == "en"
+    assert cards[gato]["native_language"] == "pl"
+    assert cards[gato]["difficulty_level"] == "A1"
+
+
+def test_bulk_patch_validates_selection_and_changes(app_client):
+    for body in (
+        {"changes": {"difficulty_level": "A1"}},
+        {"ids": [1], "filter": {"is_manual": True}, "changes": {"is_manual": False}},
+        {"filter": {}, "changes": {"is_manual": False}},
+        {"ids": [1], "changes": {}},
+    ):
+        assert app_client.patch("/api/flashcards/bulk", json=body).status_code == 400
+    empty = app_client.patch(
+        "/api/flashcards/bulk", json={"ids": [1], "changes": {"source_word": " "}}
+    )
+    assert empty.status_code == 400
+
+
+def test_bulk_delete_skips_cards_used_by_quizzes(app_client):
+    ids = [_create(app_client, word, word[::-1]) for word in ("uno", "dos", "tres")]
+    session = db_session.SessionLocal()
+    quiz = Quiz(name="Lesson 1")
+    session.add(quiz)
+    session.flush()
+    session.add(QuizItem(quiz_id=quiz.id, flashcard_id=ids[2]))
+    session.commit()
+    session.close()
+
+    response = app_client.delete("/api/flashcards/bulk", json={"ids": ids})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["deleted"] == ids[:2]
+    assert data["conflicts"] == [
+        {"id": ids[2], "error": "Flashcard is used by a saved quiz"}
+    ]
+
+    changes = app_client.get("/api/flashcards/changes").get_json()
+    assert changes["deleted"] == ids[:2]
+    remaining = app_client.get("/api/flashcards").get_json()
+    assert [card["id"] for card in remaining] == [ids[2]]
+
+
+def test_bulk_filter_without_values_is_rejected(app_client):
+    ids = [_create(app_client, word, word[::-1]) for word in ("uno", "dos")]
+
+    for selection in (
+        {"source_language": None},
+        {"source_language": "  ", "native_language": ""},
+        {"created_before": None, "is_manual": None},
+    ):
+        deleted = app_client.delete("/api/flashcards/bulk", json={"filter": selection})
+        assert deleted.status_code == 400
+        patched = app_client.patch(
+            "/api/flashcards/bulk",
+            json={"filter": selection, "changes": {"difficulty_level": "C2"}},
+        )
+        assert patched.status_code == 400
+
+    cards = app_client.get("/api/flashcards").get_json()
+    assert sorted(card["id"] for card in cards) == ids
+    assert {card["difficulty_level"] for card in cards} != {"C2"}
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import circuit_breaker
+from config import get_settings
+
+CARDS = [
+    {"source_word": word, "translated_word": word, "native_language": "pl"}
+    for word in ("gato", "perro", "casa", "sol", "mar", "luna")
+]
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    """Controllable ``time.monotonic`` of the breaker module."""
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    settings = get_settings()
+    monkeypatch.setattr(settings, "breaker_min_calls", 2)
+    monkeypatch.setattr(settings, "breaker_open_seconds", 30.0)
+    return now
+
+
+def test_breaker_opens_on_failures_and_probes_recovery(clock, app_client, fake_openai):
+    from app.services.openai_service import generate_quiz_questions
+
+    calls = []
+
+    def unavailable(**kwargs):
+        calls.append(kwargs)
+        raise ConnectionError("OpenAI is down")
+
+    fake_openai.chat.completions.create = unavailable
+    for _ in range(2):
+        # Local fallback questions while OpenAI fails
+        assert len(generate_quiz_questions(CARDS, 6)) == 6
+    assert len(calls) == 2
+
+    # Open: fallbacks are served without calling OpenAI
+    assert len(generate_quiz_questions(CARDS, 6)) == 6
+    assert len(calls) == 2
+    health = app_client.get("/api/health").get_json()
+    assert health["status"] == "degraded"
+    assert health["circuits"]["quiz"]["state"] == "open"
+    assert health["circuits"]["quiz"]["retry_in_seconds"] == 30
+
+    # Half-open after the cool-down: one failed probe opens it again
+    clock[0] += 31
+    generate_quiz_questions(CARDS, 6)
+    assert len(calls) == 3
+    assert circuit_breaker.get_breaker("quiz").state == "open"
+
+    # A successful probe closes it
+    clock[0] += 31
+    fake_openai.chat.completions.create = fake_openai._create
+    fake_openai.reply(
+        {"questions": [{"question": "q", "type": "translation", "answer": "a"}]}
+    )
+    assert generate_quiz_questions(CARDS, 6) == [
+        {"question": "q", "type": "translation", "answer": "a"}
+    ]
+    assert app_client.get("/api/health").get_json()["status"] == "ok"
+
+
+def test_slow_calls_trip_the_breaker(clock, monkeypatch):
+    monkeypatch.setattr(get_settings(), "breaker_slow_call_seconds", 5.0)
+    breaker = circuit_breaker.CircuitBreaker("translate")
+    breaker.record(True, 0.2)
+    assert breaker.state == "closed"
+    breaker.record(True, 12.0)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock[0] += 31
+    assert breaker.allow()
+    # Only one probe at a time while half-open
+    assert not breaker.allow()
+    breaker.record(True, 0.3)
+    assert breaker.state == "closed"
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from app.db import session as db_session
+from app.models import Flashcard, get_collection_version
+
+
+def _create(client, word="hola", translation="cześć"):
+    response = client.post(
+        "/api/flashcards",
+        json={
+            "source_word": word,
+            "translated_word": translation,
+            "native_language": "pl",
+        },
+    )
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_flashcard_list_revalidates_until_a_write(app_client):
+    card = _create(app_client)
+
+    first = app_client.get("/api/flashcards")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = app_client.get("/api/flashcards", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+    # A differently filtered list is a different representation
+    filtered = app_client.get(
+        "/api/flashcards",
+        query_string={"difficulty_level": "A1"},
+        headers={"If-None-Match": etag},
+    )
+    assert filtered.status_code == 200
+
+    single = app_client.get(f"/api/flashcards/{card['id']}")
+    single_etag = single.headers["ETag"]
+    assert (
+        app_client.get(
+            f"/api/flashcards/{card['id']}", headers={"If-None-Match": single_etag}
+        ).status_code
+        == 304
+    )
+
+    app_client.put(f"/api/flashcards/{card['id']}", json={"translated_word": "hej"})
+    changed = app_client.get("/api/flashcards", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()[0]["translated_word"] == "hej"
+    assert (
+        app_client.get(
+            f"/api/flashcards/{card['id']}", headers={"If-None-Match": single_etag}
+        ).status_code
+        == 200
+    )
+
+    # Deletes go through a bulk query delete and still change the version
+    app_client.delete(f"/api/flashcards/{card['id']}")
+    latest = changed.headers["ETag"]
+    assert (
+        app_client.get("/api/flashcards", headers={"If-None-Match": latest}).status_code
+        == 200
+    )
+
+
+def test_quiz_answers_change_the_version(app_client, fake_openai):
+    card = _create(app_client)
+    etag = app_client.get("/api/flashcards").headers["ETag"]
+
+    answer = app_client.post(
+        "/api/quiz", json={"flashcard_id": card["id"], "answer": "cześć"}
+    )
+    assert answer.get_json()["stats"]["correct_count"] == 1
+    # The counters are part of the body, so the old ETag must not match
+    fresh = app_client.get("/api/flashcards", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert fresh.get_json()[0]["correct_count"] == 1
+
+    session = db_session.SessionLocal()
+    version = get_collection_version(session, "flashcards")[0]
+    session.query(Flashcard).update(
+        {"incorrect_count": Flashcard.incorrect_count + 1}, synchronize_session=False
+    )
+    session.commit()
+    assert get_collection_version(session, "flashcards")[0] == version + 1
+    session.close()
+
+
+def test_languages_support_conditional_get(app_client):
+    first = app_client.get("/api/languages")
+    second = app_client.get(
+        "/api/languages", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert second.status_code == 304
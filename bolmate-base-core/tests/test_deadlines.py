@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app import deadlines
+from app.db import session as db_session
+from app.models import Flashcard
+from app.services import circuit_breaker
+from config import get_settings
+
+
+def test_switch_language_stops_remaining_batches_at_deadline(
+    monkeypatch, app_client, fake_openai
+):
+    # One card per translation batch
+    monkeypatch.setattr(get_settings(), "openai_max_output_tokens", 40)
+    cards = [
+        {"source_word": word, "translated_word": word, "native_language": "pl"}
+        for word in ("gato", "perro", "casa", "sol")
+    ]
+    assert (
+        app_client.post("/api/flashcards/bulk", json={"flashcards": cards}).status_code
+        == 201
+    )
+
+    def slow_create(**kwargs):
+        # Answers after 0.1 s unless the client times out first
+        timeout = fake_openai.options["timeout"]
+        time.sleep(min(timeout, 0.1))
+        if timeout < 0.1:
+            raise TimeoutError("Request timed out")
+        return fake_openai._create(**kwargs)
+
+    fake_openai.chat.completions.create = slow_create
+    response = app_client.post(
+        "/api/languages/switch",
+        json={"target_language": "en"},
+        headers={"X-Request-Timeout": "0.15"},
+    )
+
+    assert response.status_code == 504
+    assert "deadline" in response.get_json()["error"]
+    # The second call timed out at the deadline, the other two never started
+    assert len(fake_openai.calls) == 1
+    assert fake_openai.options["max_retries"] == 0
+    assert fake_openai.options["timeout"] < 0.15
+    # Running out of time is not held against the API
+    breaker = circuit_breaker.get_breaker("translate").snapshot()
+    assert breaker["recent_calls"] == 1
+    assert breaker["recent_failures"] == 0
+
+
+def test_expired_deadline_fails_sql_statements(app_client):
+    session = db_session.SessionLocal()
+    try:
+        with deadlines.deadline_scope(0):
+            with pytest.raises(deadlines.DeadlineExceeded):
+                session.query(Flashcard).count()
+        session.rollback()
+        assert session.query(Flashcard).count() == 0
+    finally:
+        session.close()
+
+
+def test_timeout_header_overrides_route_deadline(app_client):
+    assert (
+        app_client.get(
+            "/api/flashcards", headers={"X-Request-Timeout": "0.000001"}
+        ).status_code
+        == 504
+    )
+    assert (
+        app_client.get(
+            "/api/flashcards", headers={"X-Request-Timeout": "5"}
+        ).status_code
+        == 200
+    )
+    response = app_client.get("/api/flashcards", headers={"X-Request-Timeout": "soon"})
+    assert response.status_code == 400
+    assert deadlines.remaining() is None
+
+
+def test_interpret_answers_504_when_the_model_call_hits_the_deadline(
+    app_client, fake_openai
+):
+    def slow_create(**kwargs):
+        time.sleep(fake_openai.options["timeout"])
+        raise TimeoutError("Request timed out")
+
+    fake_openai.chat.completions.create = slow_create
+    response = app_client.post(
+        "/api/interpret",
+        json={"text": "El perro duerme.", "native_language": "pl"},
+        headers={"X-Request-Timeout": "0.05"},
+    )
+
+    assert response.status_code == 504
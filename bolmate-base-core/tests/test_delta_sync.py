@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from app.db import session as db_session
+from app.models import Flashcard
+
+
+def _changes(client, since, **params):
+    response = client.get(
+        "/api/flashcards/changes", query_string={"since": since, **params}
+    )
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_change_feed_returns_only_churn(app_client):
+    ids = []
+    for word in ("hola", "gato", "casa"):
+        response = app_client.post(
+            "/api/flashcards",
+            json={"source_word": word, "translated_word": word[::-1]},
+        )
+        ids.append(response.get_json()["id"])
+
+    full = _changes(app_client, 0)
+    assert [card["id"] for card in full["changed"]] == ids
+    assert full["deleted"] == [] and full["has_more"] is False
+    assert _changes(app_client, full["cursor"])["changed"] == []
+
+    app_client.put(f"/api/flashcards/{ids[0]}", json={"translated_word": "cześć"})
+    app_client.delete(f"/api/flashcards/{ids[1]}")
+    delta = _changes(app_client, full["cursor"])
+    assert [card["translated_word"] for card in delta["changed"]] == ["cześć"]
+    assert delta["deleted"] == [ids[1]]
+
+    # Set-based updates outside the unit of work are picked up as well
+    session = db_session.SessionLocal()
+    session.query(Flashcard).filter(Flashcard.id == ids[2]).update(
+        {"difficulty_level": "A2"}, synchronize_session=False
+    )
+    session.commit()
+    session.close()
+    bulk = _changes(app_client, delta["cursor"])
+    assert [card["id"] for card in bulk["changed"]] == [ids[2]]
+
+
+def test_change_feed_delivers_quiz_counters(app_client, fake_openai):
+    card = app_client.post(
+        "/api/flashcards", json={"source_word": "hola", "translated_word": "cześć"}
+    ).get_json()
+    cursor = _changes(app_client, 0)["cursor"]
+
+    app_client.post("/api/quiz", json={"flashcard_id": card["id"], "answer": "nie"})
+    delta = _changes(app_client, cursor)
+    assert [row["incorrect_count"] for row in delta["changed"]] == [1]
+
+
+def test_change_feed_pages_and_rejects_unknown_cursors(app_client):
+    for word in ("uno", "dos", "tres"):
+        app_client.post(
+            "/api/flashcards", json={"source_word": word, "translated_word": word}
+        )
+
+    seen, cursor, pages = [], 0, 0
+    while True:
+        page = _changes(app_client, cursor, limit=2)
+        seen.extend(card["source_word"] for card in page["changed"])
+        cursor, pages = page["cursor"], pages + 1
+        if not page["has_more"]:
+            break
+    assert seen == ["uno", "dos", "tres"] and pages == 2
+
+    ahead = app_client.get("/api/flashcards/changes", query_string={"since": 999})
+    assert ahead.status_code == 410
+    bad = app_client.get("/api/flashcards/changes", query_string={"since": "x"})
+    assert bad.status_code == 400
+
+
+def test_full_sync_includes_cards_without_a_version(app_client):
+    # Rows written before the change feed existed keep change_seq 0
+    with db_session.engine.begin() as connection:
+        connection.execute(
+            Flashcard.__table__.insert(),
+            [
+                {"source_word": word, "translated_word": word, "change_seq": 0}
+                for word in ("viejo", "antiguo")
+            ],
+        )
+    app_client.post(
+        "/api/flashcards", json={"source_word": "nuevo", "translated_word": "x"}
+    )
+
+    full = _changes(app_client, 0)
+    assert [card["source_word"] for card in full["changed"]] == [
+        "viejo",
+        "antiguo",
+        "nuevo",
+    ]
+    # Paging past the unstamped rows still moves the cursor forward
+    page = _changes(app_client, 0, limit=1)
+    assert len(page["changed"]) == 3
+    assert page["cursor"] == full["cursor"] and page["has_more"] is False
+    assert _changes(app_client, full["cursor"])["changed"] == []
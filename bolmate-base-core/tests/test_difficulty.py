@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+from itertools import product
+
+import pytest
+
+from app import cli, create_app
+from app.db import session as db_session
+from app.models import Flashcard
+from app.services import difficulty
+from config import get_settings
+
+FILLER = ["".join(letters) for letters in product("bcdfgjklmn", repeat=4)]
+
+
+@pytest.fixture()
+def frequency_file(monkeypatch, tmp_path):
+    path = tmp_path / "word_frequency.gz"
+    monkeypatch.setattr(get_settings(), "word_frequency_file", str(path))
+    yield path
+    difficulty.clear_frequency_cache()
+
+
+def test_build_and_estimate(frequency_file, tmp_path):
+    # A full table: every band is covered
+    words = [
+        "el",
+        "gato",
+        *FILLER[:1000],
+        "murciélago",
+        *FILLER[1000:1996],
+        "ciudad",
+        *FILLER[1996:9996],
+    ]
+    word_list = tmp_path / "es.txt"
+    word_list.write_text(
+        "# word count\n"
+        + "".join(f"{word} {10000 - rank}\n" for rank, word in enumerate(words))
+        + "Gato 1\n",
+        encoding="utf-8",
+    )
+    runner = create_app().test_cli_runner()
+    result = runner.invoke(args=["difficulty", "build", "es", str(word_list)])
+    assert result.exit_code == 0, result.output
+    assert "Wrote 10000 es words" in result.output
+    difficulty.write_frequency_table("en", ["the", "cat"], frequency_file)
+
+    estimate = difficulty.estimate_difficulty
+    assert estimate("Gato", "es") == "A1"
+    assert estimate("ciudades", "es") == "B1"
+    assert estimate("murciélago", "ES") == "A2"
+    # A phrase is as hard as its rarest word; words missing from a full
+    # table are rarer than all of it
+    assert estimate("el murciélago", "es") == "A2"
+    assert estimate("el ornitorrinco", "es") == "C2"
+    # A short table can't rate the words it lacks
+    assert estimate("cat", "en") == "A1"
+    assert estimate("platypus", "en") is None
+    assert estimate("the platypus", "en") is None
+    assert estimate("chat", "fr") is None
+    assert estimate("123", "es") is None
+
+
+def test_only_plural_endings_of_the_language_are_stripped(frequency_file):
+    difficulty.write_frequency_table(
+        "en", ["heart", "got", "brand", "cat", "box"], frequency_file
+    )
+    difficulty.write_frequency_table("de", ["hund"], frequency_file)
+
+    estimate = difficulty.estimate_difficulty
+    assert estimate("cats", "en") == "A1"
+    assert estimate("boxes", "en") == "A1"
+    # Not plurals: a short table can't rate them
+    assert estimate("hearth", "en") is None
+    assert estimate("Goth", "en") is None
+    assert estimate("brandy", "en") is None
+    # German plurals don't end in a bare -s
+    assert estimate("hunds", "de") is None
+
+
+def test_cards_get_levels_on_insert(app_client):
+    difficulty.clear_frequency_cache()
+    created = app_client.post(
+        "/api/flashcards", json={"source_word": "hola", "translated_word": "cześć"}
+    )
+    assert created.get_json()["difficulty_level"] == "A1"
+
+    bulk = app_client.post(
+        "/api/flashcards/bulk",
+        json={
+            "flashcards": [
+                {"source_word": "perro", "translated_word": "pies"},
+                {
+                    "source_word": "casa",
+                    "translated_word": "dom",
+                    "difficulty_level": "B2",
+                },
+                {
+                    "source_word": "gato",
+                    "translated_word": "cat",
+                    "source_language": "xx",
+                },
+            ]
+        },
+    )
+    levels = [card["difficulty_level"] for card in bulk.get_json()["created"]]
+    assert levels == ["A2", "B2", None]
+
+    body = "\n".join(
+        json.dumps(record)
+        for record in (
+            {"source_word": "la mesa", "translated_word": "stół"},
+            {"source_word": "ornitorrinco", "translated_word": "dziobak"},
+        )
+    )
+    app_client.post(
+        "/api/flashcards/import", data=body, content_type="application/x-ndjson"
+    )
+    cards = {
+        card["source_word"]: card["difficulty_level"]
+        for card in app_client.get("/api/flashcards").get_json()
+    }
+    assert cards["la mesa"] == "A2"
+    # The shipped tables cover every band, so rare words are rated too
+    assert cards["ornitorrinco"] == "C2"
+
+
+def test_shipped_tables_cover_every_band_of_each_language():
+    difficulty.clear_frequency_cache()
+    for language in ("pl", "en", "de", "fr", "nl", "es"):
+        ranks = difficulty.get_frequency_ranks(language)
+        assert len(ranks) >= difficulty.FULL_TABLE_SIZE
+        levels = {difficulty.level_for_rank(rank) for rank in ranks.values()}
+        assert levels == set(difficulty.LEVELS[:-1])
+
+
+def test_backfill_estimates_cards_without_level(
+    monkeypatch, frequency_file, app_client
+):
+    monkeypatch.setattr(cli, "SessionLocal", db_session.SessionLocal)
+    difficulty.write_frequency_table("es", ["gato"], frequency_file)
+    session = db_session.SessionLocal()
+    session.add(Flashcard(source_word="gato", translated_word="kot"))
+    session.commit()
+    session.query(Flashcard).update({"difficulty_level": None})
+    session.commit()
+
+    result = app_client.application.test_cli_runner().invoke(
+        args=["difficulty", "backfill", "--batch-size", "1"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Updated 1 flashcards" in result.output
+    session.expire_all()
+    assert session.query(Flashcard).one().difficulty_level == "A1"
+    session.close()
+
+
+def test_model_levels_cards_without_an_estimate(monkeypatch, app_client, fake_openai):
+    difficulty.clear_frequency_cache()
+    # No table covers the second card's language
+    ids = [
+        app_client.post(
+            "/api/flashcards",
+            json={
+                "source_word": word,
+                "translated_word": "x",
+                "source_language": language,
+            },
+        ).get_json()["id"]
+        for word, language in (("hola", "es"), ("ornitorrinco", "xx"))
+    ]
+    reply = {"items": [{"i": 0, "s": ".", "d": "B1"}, {"i": 1, "s": ".", "d": "B2"}]}
+
+    def enrich():
+        fake_openai.reply(reply)
+        response = app_client.post("/api/flashcards/enrich", json={"ids": ids})
+        return {card["id"]: card["difficulty_level"] for card in response.get_json()}
+
+    # Local estimates are kept, the rest get the model's level
+    assert enrich() == {ids[0]: "A1", ids[1]: "B2"}
+
+    monkeypatch.setattr(get_settings(), "llm_difficulty_override", True)
+    assert enrich() == {ids[0]: "B1", ids[1]: "B2"}
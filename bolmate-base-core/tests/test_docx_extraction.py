@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import io
+import zipfile
+
+from app.services.docx_extraction import VocabularyTable, read_docx
+from app.services.openai_service import DOCX_MIME_TYPE, interpret_file_with_ai
+
+NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _paragraph(text):
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def _row(*cells, header=False):
+    props = "<w:trPr><w:tblHeader/></w:trPr>" if header else ""
+    body = "".join(
+        f"<w:tc>{_paragraph(cell) if cell else '<w:p/>'}</w:tc>" for cell in cells
+    )
+    return f"<w:tr>{props}{body}</w:tr>"
+
+
+def _docx(body, header=None):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "word/document.xml",
+            f"<w:document {NS}><w:body>{body}</w:body></w:document>",
+        )
+        if header:
+            archive.writestr(
+                "word/header1.xml", f"<w:hdr {NS}>{_paragraph(header)}</w:hdr>"
+            )
+    buffer.seek(0)
+    return buffer
+
+
+def test_read_docx_splits_vocabulary_tables_from_text():
+    stream = _docx(
+        _paragraph("Lección 3: la casa")
+        + "<w:tbl>"
+        + _row("Palabra", "Tłumaczenie")
+        + _row("la casa", "dom")
+        + _row("el gato", "kot")
+        + _row("la ventana", "")
+        + "</w:tbl>"
+        + "<w:tbl>"
+        + _row("Word", "Meaning", header=True)
+        + _row("Mi casa es grande", "Mój dom jest duży", "B1")
+        + "</w:tbl>",
+        header="Szkoła Językowa Bolmate",
+    )
+
+    content = read_docx(stream)
+
+    assert content.tables == [
+        VocabularyTable(None, [("la casa", "dom"), ("el gato", "kot")])
+    ]
+    assert content.text.splitlines() == [
+        "Szkoła Językowa Bolmate",
+        "Lección 3: la casa",
+        "la ventana",
+        "Mi casa es grande - Mój dom jest duży - B1",
+    ]
+
+
+def test_vocabulary_table_skips_the_model(fake_openai):
+    stream = _docx(
+        "<w:tbl>" + _row("hola", "cześć") + _row("gracias", "dziękuję") + "</w:tbl>"
+    )
+
+    items = interpret_file_with_ai(stream, "lesson.docx", DOCX_MIME_TYPE, "pl")
+
+    assert [(item["source_word"], item["translated_word"]) for item in items] == [
+        ("hola", "cześć"),
+        ("gracias", "dziękuję"),
+    ]
+    assert fake_openai.calls == []
+
+
+def test_table_in_another_language_goes_to_the_model(fake_openai):
+    fake_openai.reply(
+        {
+            "items": [
+                {
+                    "source_word": "hola",
+                    "source_language": "es",
+                    "translated_word": "cześć",
+                    "native_language": "pl",
+                }
+            ]
+        }
+    )
+    headed = _docx(
+        "<w:tbl>"
+        + _row("Español", "English", header=True)
+        + _row("hola", "hello")
+        + "</w:tbl>"
+    )
+    assert read_docx(headed).tables[0].language == "en"
+
+    items = interpret_file_with_ai(headed, "lesson.docx", DOCX_MIME_TYPE, "pl")
+
+    assert [(item["source_word"], item["translated_word"]) for item in items] == [
+        ("hola", "cześć")
+    ]
+    assert fake_openai.calls[0]["messages"][-1]["content"] == "hola - hello"
+
+
+def test_unheaded_table_language_is_detected(fake_openai):
+    stream = _docx(
+        "<w:tbl>"
+        + _row("la casa", "the house")
+        + _row("el gato", "the cat")
+        + "</w:tbl>"
+    )
+
+    interpret_file_with_ai(stream, "lesson.docx", DOCX_MIME_TYPE, "pl")
+
+    assert len(fake_openai.calls) == 1
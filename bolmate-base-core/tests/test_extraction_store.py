@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import io
+
+from app.db import session as db_session
+from app.models import DocumentInterpretation, ExtractedDocument
+from app.services import lexicon
+from app.services.extraction_store import evict
+from config import get_settings
+
+
+def _upload(client, content, filename="lesson.txt", native_language="pl"):
+    return client.post(
+        "/api/interpret/file",
+        data={
+            "files": (io.BytesIO(content), filename),
+            "native_language": native_language,
+        },
+        content_type="multipart/form-data",
+    )
+
+
+def test_repeat_upload_is_served_from_store(app_client, fake_openai):
+    fake_openai.reply({"items": [{"source_word": "gato", "translated_word": "kot"}]})
+    first = _upload(app_client, "El gato duerme en la casa.".encode())
+    assert first.status_code == 200
+    assert first.get_json()["items"][0]["translated_word"] == "kot"
+
+    # Same bytes under another name: no extraction or OpenAI call
+    second = _upload(app_client, "El gato duerme en la casa.".encode(), "copy.txt")
+    assert second.get_json()["items"] == first.get_json()["items"]
+    assert len(fake_openai.calls) == 1
+
+    # A new native language reuses the stored text but interprets again
+    fake_openai.reply({"items": [{"source_word": "gato", "translated_word": "cat"}]})
+    english = _upload(app_client, "El gato duerme en la casa.".encode(), "en.txt", "en")
+    assert english.get_json()["items"][0]["translated_word"] == "cat"
+    assert len(fake_openai.calls) == 2
+
+    session = db_session.SessionLocal()
+    assert session.query(ExtractedDocument).count() == 1
+    assert session.query(DocumentInterpretation).count() == 2
+    session.close()
+
+
+def test_degraded_interpretations_are_not_stored(
+    monkeypatch, tmp_path, app_client, fake_openai
+):
+    monkeypatch.setattr(get_settings(), "lexicon_dir", str(tmp_path))
+    lexicon.build_lexicon([("gato", "kot")], tmp_path / "es-pl.lex")
+
+    def unavailable(**kwargs):
+        raise ConnectionError("OpenAI is down")
+
+    fake_openai.chat.completions.create = unavailable
+    outage = _upload(app_client, "El gato y el perro.".encode())
+    # Lexicon matches are still answered, but not pinned as the final result
+    assert [item["source_word"] for item in outage.get_json()["items"]] == ["gato"]
+
+    fake_openai.chat.completions.create = fake_openai._create
+    fake_openai.reply({"items": [{"source_word": "perro", "translated_word": "pies"}]})
+    recovered = _upload(app_client, "El gato y el perro.".encode())
+    assert [item["source_word"] for item in recovered.get_json()["items"]] == [
+        "gato",
+        "perro",
+    ]
+    session = db_session.SessionLocal()
+    assert session.query(DocumentInterpretation).count() == 1
+    session.close()
+    lexicon.clear_lexicon_cache()
+
+
+def test_evict_drops_least_recently_used_documents(app_client):
+    session = db_session.SessionLocal()
+    for index, size in enumerate((300, 200, 100)):
+        session.add(
+            ExtractedDocument(
+                sha256=f"{index:064x}",
+                text="x" * size,
+                size_bytes=size,
+            )
+        )
+        session.commit()
+    oldest, newest = f"{0:064x}", f"{2:064x}"
+    session.add(
+        DocumentInterpretation(document_sha256=oldest, native_language="pl", items=[])
+    )
+    session.commit()
+
+    assert evict(session, max_bytes=1000) == 0
+    assert evict(session, max_bytes=350) == 1
+    remaining = {document.sha256 for document in session.query(ExtractedDocument)}
+    assert oldest not in remaining and newest in remaining
+    assert session.query(DocumentInterpretation).count() == 0
+    session.close()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+import zipfile
+
+from app.db import session as db_session
+from app.models import Flashcard, FlashcardTranslation
+
+CARDS = [
+    {"source_word": "gato", "translated_word": "kot", "example_sentence": "Mi gato."},
+    {"source_word": "perro", "translated_word": "pies", "difficulty_level": "A1"},
+    {
+        "source_word": "chat",
+        "translated_word": "cat",
+        "source_language": "fr",
+        "native_language": "en",
+    },
+]
+
+
+def _seed(app_client):
+    for card in CARDS:
+        assert app_client.post("/api/flashcards", json=card).status_code == 201
+
+
+def test_csv_export_streams_importable_rows(app_client):
+    _seed(app_client)
+    response = app_client.get("/api/flashcards/export?format=csv")
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    assert "flashcards.csv" in response.headers["Content-Disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    # Grouped by language pair
+    assert [(row["source_language"], row["source_word"]) for row in rows] == [
+        ("es", "gato"),
+        ("es", "perro"),
+        ("fr", "chat"),
+    ]
+    assert rows[0]["example_sentence"] == "Mi gato."
+
+    exported = response.get_data()
+    for card in app_client.get("/api/flashcards").get_json():
+        app_client.delete(f"/api/flashcards/{card['id']}")
+    imported = app_client.post(
+        "/api/flashcards/import",
+        data={"file": (io.BytesIO(exported), "flashcards.csv")},
+        content_type="multipart/form-data",
+    ).get_json()
+    assert imported["created"] == 3
+
+
+def test_ndjson_export_names_decks_and_filters_pairs(app_client):
+    _seed(app_client)
+    response = app_client.get("/api/flashcards/export?format=ndjson")
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["deck"] for line in lines] == ["es-pl", "es-pl", "fr-en"]
+    assert lines[0]["created_at"]
+
+    # Matched case-insensitively, like the card list filters
+    session = db_session.SessionLocal()
+    session.add(
+        Flashcard(
+            source_word="chien",
+            translated_word="dog",
+            source_language="FR",
+            native_language="EN",
+        )
+    )
+    session.commit()
+    session.close()
+    response = app_client.get("/api/flashcards/export?format=ndjson&source_language=fr")
+    lines = response.get_data(as_text=True).splitlines()
+    assert sorted(json.loads(line)["source_word"] for line in lines) == [
+        "chat",
+        "chien",
+    ]
+
+    assert app_client.get("/api/flashcards/export?format=xlsx").status_code == 400
+
+
+def test_apkg_export_has_one_deck_per_language_pair(app_client):
+    _seed(app_client)
+    response = app_client.get("/api/flashcards/export?format=apkg")
+    assert response.status_code == 200
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        assert sorted(archive.namelist()) == ["collection.anki2", "media"]
+        with tempfile.NamedTemporaryFile(suffix=".anki2") as database:
+            database.write(archive.read("collection.anki2"))
+            database.flush()
+            connection = sqlite3.connect(database.name)
+            decks = json.loads(
+                connection.execute("SELECT decks FROM col").fetchone()[0]
+            )
+            per_deck = dict(
+                connection.execute(
+                    "SELECT did, COUNT(*) FROM cards GROUP BY did"
+                ).fetchall()
+            )
+            connection.close()
+    names = {int(deck_id): deck["name"] for deck_id, deck in decks.items()}
+    assert {names[deck_id]: count for deck_id, count in per_deck.items()} == {
+        "Bolmate::es → pl": 2,
+        "Bolmate::fr → en": 1,
+    }
+
+    # The package reads back through the deck importer
+    imported = app_client.post(
+        "/api/flashcards/import",
+        data={
+            "file": (io.BytesIO(response.get_data()), "flashcards.apkg"),
+            "source_language": "it",
+        },
+        content_type="multipart/form-data",
+    ).get_json()
+    assert imported["created"] == 3
+
+
+def test_export_includes_translations_and_folds_language_case(app_client):
+    _seed(app_client)
+    session = db_session.SessionLocal()
+    gato = session.query(Flashcard).filter_by(source_word="gato").one()
+    session.add(
+        FlashcardTranslation(
+            flashcard_id=gato.id,
+            language="en",
+            translated_word="cat",
+            example_sentence_translated="My cat.",
+        )
+    )
+    session.add(
+        Flashcard(
+            source_word="casa",
+            translated_word="dom",
+            source_language="ES",
+            native_language="PL",
+        )
+    )
+    session.commit()
+    session.close()
+
+    response = app_client.get("/api/flashcards/export?format=ndjson")
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(line["deck"], line["source_word"]) for line in lines] == [
+        ("es-en", "gato"),
+        ("es-pl", "gato"),
+        ("es-pl", "perro"),
+        ("es-pl", "casa"),
+        ("fr-en", "chat"),
+    ]
+    assert lines[0]["translated_word"] == "cat"
+    assert lines[0]["example_sentence"] == "Mi gato."
+    assert lines[0]["example_sentence_translated"] == "My cat."
+    assert [line["is_translation"] for line in lines] == [
+        True,
+        False,
+        False,
+        False,
+        False,
+    ]
+
+    english = app_client.get("/api/flashcards/export?format=csv&native_language=EN")
+    rows = list(csv.DictReader(io.StringIO(english.get_data(as_text=True))))
+    assert [(row["source_word"], row["translated_word"]) for row in rows] == [
+        ("gato", "cat"),
+        ("chat", "cat"),
+    ]
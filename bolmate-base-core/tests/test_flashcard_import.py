@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import zipfile
+
+from config import get_settings
+
+
+def _lines(*records):
+    return "\n".join(
+        record if isinstance(record, str) else json.dumps(record) for record in records
+    )
+
+
+def test_ndjson_import_streams_batch_progress(monkeypatch, app_client):
+    monkeypatch.setattr(get_settings(), "import_batch_size", 2)
+    # Whole-request limits do not apply to streamed imports
+    app_client.application.config["MAX_CONTENT_LENGTH"] = 64
+    app_client.post(
+        "/api/flashcards", json={"source_word": "hola", "translated_word": "cześć"}
+    )
+
+    body = _lines(
+        {"source_word": "hola", "translated_word": "cześć"},
+        {"source_word": "gato", "translated_word": "kot", "difficulty_level": "A1"},
+        {"source_word": "", "translated_word": "nic"},
+        "",
+        {"source_word": "casa", "translated_word": "dom"},
+        "not json",
+        {"source_word": "casa", "translated_word": "dom"},
+    )
+    response = app_client.post(
+        "/api/flashcards/import", data=body, content_type="application/x-ndjson"
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    reports = [
+        json.loads(line) for line in response.get_data(as_text=True).splitlines()
+    ]
+
+    assert [report.get("created") for report in reports[:-1]] == [1, 1]
+    assert reports[0]["errors"] == []
+    assert [error["line"] for error in reports[1]["errors"]] == [3, 6]
+    assert reports[-1] == {
+        "done": True,
+        "received": 6,
+        "created": 2,
+        "skipped": 2,
+        "invalid": 2,
+    }
+    words = sorted(
+        card["source_word"] for card in app_client.get("/api/flashcards").get_json()
+    )
+    assert words == ["casa", "gato", "hola"]
+
+    changes = app_client.get("/api/flashcards/changes").get_json()
+    assert len(changes["changed"]) == 3
+
+
+def test_ndjson_import_requires_ndjson_body(app_client):
+    response = app_client.post("/api/flashcards/import", json={"flashcards": []})
+    assert response.status_code == 415
+
+
+def _apkg(notes):
+    """In-memory ``.apkg`` with a minimal ``notes`` table."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "collection.anki2")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, flds TEXT)")
+        connection.executemany(
+            "INSERT INTO notes (id, flds) VALUES (?, ?)",
+            [(index, "\x1f".join(fields)) for index, fields in enumerate(notes, 1)],
+        )
+        connection.commit()
+        connection.close()
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as package:
+            package.write(path, "collection.anki2")
+    archive.seek(0)
+    return archive
+
+
+def _upload(app_client, content, filename, **form):
+    return app_client.post(
+        "/api/flashcards/import",
+        data={"file": (content, filename), **form},
+        content_type="multipart/form-data",
+    )
+
+
+def test_csv_deck_import_merges_through_staging(app_client):
+    app_client.post(
+        "/api/flashcards", json={"source_word": "hola", "translated_word": "cześć"}
+    )
+    deck = (
+        "Front,Back,Example,Level\n"
+        "hola,cześć,,\n"
+        "gato,kot,El gato duerme.,A1\n"
+        ",pusty,,\n"
+        "gato,kot,,\n"
+        "perro,pies,,A2\n"
+    ).encode("utf-8")
+    response = _upload(app_client, io.BytesIO(deck), "deck.csv")
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "format": "csv",
+        "received": 5,
+        "created": 2,
+        "skipped": 2,
+        "invalid": 1,
+    }
+
+    cards = {
+        card["source_word"]: card
+        for card in app_client.get("/api/flashcards").get_json()
+    }
+    assert sorted(cards) == ["gato", "hola", "perro"]
+    assert cards["gato"]["example_sentence"] == "El gato duerme."
+    assert cards["gato"]["difficulty_level"] == "A1"
+    assert cards["perro"]["is_manual"] is False
+    changes = app_client.get("/api/flashcards/changes").get_json()
+    assert len(changes["changed"]) == 3
+
+
+def test_tsv_and_apkg_deck_imports(app_client):
+    tsv = "chat\tkot\nchien\tpies\n".encode("utf-8")
+    response = _upload(app_client, io.BytesIO(tsv), "french.txt", source_language="fr")
+    assert response.get_json()["created"] == 2
+
+    package = _apkg([["der <b>Hund</b>", "pies[sound:hund.mp3]"], ["die Katze", "kot"]])
+    response = _upload(
+        app_client, package, "german.apkg", source_language="de", native_language="pl"
+    )
+    assert response.status_code == 200
+    assert response.get_json()["created"] == 2
+
+    cards = app_client.get("/api/flashcards").get_json()
+    assert {(card["source_word"], card["source_language"]) for card in cards} == {
+        ("chat", "fr"),
+        ("chien", "fr"),
+        ("der Hund", "de"),
+        ("die Katze", "de"),
+    }
+    assert {card["translated_word"] for card in cards} >= {"pies", "kot"}
+
+
+def test_deck_import_rejects_unknown_or_broken_files(app_client):
+    response = _upload(app_client, io.BytesIO(b"x"), "deck.xlsx")
+    assert response.status_code == 400
+
+    response = _upload(app_client, io.BytesIO(b"not a zip"), "deck.apkg")
+    assert response.status_code == 400
+    assert "apkg" in response.get_json()["error"]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import deadlines
+from app.services.micro_batching import MicroBatcher
+from app.services.openai_service import generate_hint_for_flashcard
+from config import get_settings
+
+WORDS = [("gato", "kot"), ("perro", "pies"), ("casa", "dom")]
+
+
+def test_hints_asked_during_a_call_share_one_completion(monkeypatch, fake_openai):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "hint_batch_size", 2)
+    monkeypatch.setattr(settings, "hint_batch_window_ms", 5000.0)
+    started, release = threading.Event(), threading.Event()
+
+    def create(**kwargs):
+        content = kwargs["messages"][0]["content"]
+        if "'gato' (kot)" in content:
+            # The lone first hint is in flight until the batch is done
+            started.set()
+            release.wait(5)
+            fake_openai.reply({"hint": "gato!"})
+        else:
+            # Hint every row of the card table but the "perro" one
+            rows = [row.split("\t") for row in content.split("\n")[2:]]
+            fake_openai.reply(
+                {
+                    "hints": [
+                        {"i": int(i), "hint": f"{word}!", "example_sentence": "."}
+                        for i, word, *_ in rows
+                        if word != "perro"
+                    ]
+                }
+            )
+        return fake_openai._create(**kwargs)
+
+    fake_openai.chat.completions.create = create
+    with ThreadPoolExecutor(3) as pool:
+        first = pool.submit(generate_hint_for_flashcard, "gato", "kot", "pl")
+        assert started.wait(5)
+        # A full batch goes out without waiting for the window
+        hints = list(
+            pool.map(lambda pair: generate_hint_for_flashcard(*pair, "pl"), WORDS[1:])
+        )
+        release.set()
+        assert first.result() == {"hint": "gato!"}
+
+    assert len(fake_openai.calls) == 2
+    prompt = fake_openai.calls[0]["messages"][0]["content"]
+    assert "i\tsource_word\ttranslated_word\tsource_language\tnative_language" in prompt
+    assert hints == [{}, {"hint": "casa!", "example_sentence": "."}]
+    # Split results are cached per card
+    assert generate_hint_for_flashcard("casa", "dom", "pl") == hints[1]
+    assert len(fake_openai.calls) == 2
+
+
+def test_lone_hint_goes_out_at_once(monkeypatch, fake_openai):
+    monkeypatch.setattr(get_settings(), "hint_batch_window_ms", 5000.0)
+    fake_openai.reply({"hint": "Meow", "example_sentence": "El gato duerme."})
+
+    started = time.monotonic()
+    hint = generate_hint_for_flashcard("gato", "kot", "pl")
+
+    assert time.monotonic() - started < 1
+    assert hint == {"hint": "Meow", "example_sentence": "El gato duerme."}
+    assert "'gato' (kot)" in fake_openai.calls[0]["messages"][0]["content"]
+    assert fake_openai.calls[0]["max_tokens"] == 500
+
+
+def test_batches_run_under_the_latest_deadline():
+    release = threading.Event()
+    seen = []
+
+    def handler(items):
+        if items == ["busy"]:
+            release.wait(5)
+        else:
+            seen.append(deadlines.remaining())
+        return items
+
+    batcher = MicroBatcher(handler)
+
+    def submit(item, seconds):
+        with deadlines.deadline_scope(seconds):
+            return batcher.submit(item, max_size=2, max_wait=5.0)
+
+    with ThreadPoolExecutor(3) as pool:
+        busy = pool.submit(submit, "busy", None)
+        while not batcher._running:
+            time.sleep(0.001)
+        leader = pool.submit(submit, "slow", 60)
+        while not batcher._pending:
+            time.sleep(0.001)
+        # The short deadline fills the batch and runs it
+        assert submit("quick", 1) == "quick"
+        assert leader.result() == "slow"
+        release.set()
+        assert busy.result() == "busy"
+    assert seen[0] > 30
+
+
+def test_batch_failure_reaches_every_caller():
+    release = threading.Event()
+
+    def handler(items):
+        if items == ["busy"]:
+            release.wait(5)
+            return items
+        raise ConnectionError(json.dumps(items))
+
+    batcher = MicroBatcher(handler)
+    with ThreadPoolExecutor(3) as pool:
+        busy = pool.submit(batcher.submit, "busy", max_size=2, max_wait=5.0)
+        while not batcher._running:
+            time.sleep(0.001)
+        futures = [
+            pool.submit(batcher.submit, item, max_size=2, max_wait=5.0)
+            for item in ("a", "b")
+        ]
+        errors = [str(future.exception()) for future in futures]
+        release.set()
+        assert busy.result() == "busy"
+    assert errors == ['["a", "b"]', '["a", "b"]']
+
+
+def test_batch_aborted_by_base_exception_releases_waiters():
+    class Abort(BaseException):
+        pass
+
+    release = threading.Event()
+
+    def handler(items):
+        if items == ["busy"]:
+            release.wait(5)
+            return items
+        raise Abort()
+
+    batcher = MicroBatcher(handler)
+    with ThreadPoolExecutor(3) as pool:
+        busy = pool.submit(batcher.submit, "busy", max_size=2, max_wait=5.0)
+        while not batcher._running:
+            time.sleep(0.001)
+        futures = [
+            pool.submit(batcher.submit, item, max_size=2, max_wait=5.0, timeout=5)
+            for item in ("a", "b")
+        ]
+        errors = [future.exception(timeout=5) for future in futures]
+        release.set()
+        assert busy.result() == "busy"
+    assert [type(error) for error in errors] == [Abort, Abort]
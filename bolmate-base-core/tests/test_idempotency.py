@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app import idempotency
+from app.db import session as db_session
+from app.deadlines import DeadlineExceeded
+from app.models import IdempotencyKey
+
+CARDS = {
+    "flashcards": [
+        {"source_word": "gato", "translated_word": "kot", "native_language": "pl"},
+        {"source_word": "perro", "translated_word": "pies", "native_language": "pl"},
+    ]
+}
+
+
+def test_retry_replays_the_stored_response(app_client):
+    headers = {"Idempotency-Key": "bulk-1"}
+    first = app_client.post("/api/flashcards/bulk", json=CARDS, headers=headers)
+    assert first.status_code == 201
+    assert first.get_json()["created_count"] == 2
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = app_client.post("/api/flashcards/bulk", json=CARDS, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_data() == first.get_data()
+
+    # Keys are per client
+    other = app_client.post(
+        "/api/flashcards/bulk", json=CARDS, headers={**headers, "X-User-Id": "7"}
+    )
+    assert other.get_json()["skipped_count"] == 2
+
+    reused = app_client.post(
+        "/api/flashcards/bulk",
+        json={"flashcards": CARDS["flashcards"][:1]},
+        headers=headers,
+    )
+    assert reused.status_code == 422
+
+
+def test_failed_requests_release_the_key(monkeypatch, app_client):
+    import app.routes.flashcards as flashcards_route
+
+    app_client.post("/api/flashcards/bulk", json=CARDS)
+    calls = []
+
+    def enrich(cards, native_language):
+        calls.append(cards)
+        if len(calls) == 1:
+            raise DeadlineExceeded("Request deadline exceeded")
+        return cards
+
+    monkeypatch.setattr(flashcards_route, "enrich_flashcards", enrich)
+    headers = {"Idempotency-Key": "enrich-1"}
+    body = {"ids": [1, 2]}
+    assert (
+        app_client.post(
+            "/api/flashcards/enrich", json=body, headers=headers
+        ).status_code
+        == 504
+    )
+    for _ in range(2):
+        response = app_client.post("/api/flashcards/enrich", json=body, headers=headers)
+        assert response.status_code == 200
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert len(calls) == 2
+
+
+def test_retry_waits_for_in_flight_request_then_takes_over(app_client):
+    app = app_client.application
+    with app.test_request_context("/api/flashcards/bulk", method="POST", json=CARDS):
+        fingerprint = idempotency._fingerprint()
+    now = datetime.now(timezone.utc)
+    with db_session.engine.begin() as connection:
+        connection.execute(
+            IdempotencyKey.__table__.insert().values(
+                client="ip:127.0.0.1",
+                key="bulk-2",
+                fingerprint=fingerprint,
+                locked_until=now + timedelta(minutes=1),
+                expires_at=now + timedelta(minutes=1),
+            )
+        )
+
+    headers = {"Idempotency-Key": "bulk-2", "X-Request-Timeout": "0.2"}
+    busy = app_client.post("/api/flashcards/bulk", json=CARDS, headers=headers)
+    assert busy.status_code == 409
+    assert busy.headers["Retry-After"] == "1"
+
+    # The owner's lease ran out: its worker is gone
+    with db_session.engine.begin() as connection:
+        connection.execute(
+            IdempotencyKey.__table__.update().values(
+                locked_until=now - timedelta(seconds=1)
+            )
+        )
+    response = app_client.post("/api/flashcards/bulk", json=CARDS, headers=headers)
+    assert response.status_code == 201
+    assert response.get_json()["created_count"] == 2
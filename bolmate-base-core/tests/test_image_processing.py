@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from app.services import openai_service
+from app.services.image_processing import hash_distance, prepare_image
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+
+def _worksheet(size=(2400, 1800), quality=95, fmt="JPEG", last_line=None):
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for row in range(12):
+        top = 100 + row * 130
+        width = 110 * (row % 5 + 3) if row < 11 or last_line is None else last_line
+        draw.rectangle((120, top, 120 + width, top + 60), fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=quality)
+    return buffer.getvalue()
+
+
+def test_prepare_image_downscales_and_picks_detail():
+    prepared = prepare_image(_worksheet(), "image/jpeg")
+    with Image.open(io.BytesIO(prepared.content)) as image:
+        assert min(image.size) == 768
+        assert max(image.size) <= 2048
+    assert prepared.mime_type == "image/jpeg"
+    assert prepared.detail == "high"
+    assert prepare_image(_worksheet((400, 300)), "image/jpeg").detail == "low"
+
+
+def test_resaved_image_reuses_vision_result(fake_openai):
+    original = prepare_image(_worksheet(), "image/jpeg")
+    resaved = prepare_image(_worksheet(quality=60, fmt="PNG"), "image/png")
+    assert original.digest != resaved.digest
+    assert (
+        hash_distance(original.fingerprint, resaved.fingerprint)
+        <= openai_service.VISION_HASH_MAX_DISTANCE
+    )
+
+    fake_openai.reply(
+        {
+            "items": [
+                {
+                    "source_word": "libro",
+                    "source_language": "es",
+                    "translated_word": "książka",
+                    "native_language": "pl",
+                }
+            ]
+        }
+    )
+    first = openai_service._interpret_image_with_vision(
+        _worksheet(), "image/jpeg", "pl"
+    )
+    second = openai_service._interpret_image_with_vision(
+        _worksheet(quality=60), "image/jpeg", "pl"
+    )
+    assert first == second
+    assert len(fake_openai.calls) == 1
+    image_part = fake_openai.calls[0]["messages"][0]["content"][1]["image_url"]
+    assert image_part["detail"] == "high"
+
+
+def _reply(fake_openai, word):
+    fake_openai.reply(
+        {
+            "items": [
+                {
+                    "source_word": word,
+                    "source_language": "es",
+                    "translated_word": f"{word} (pl)",
+                    "native_language": "pl",
+                }
+            ]
+        }
+    )
+
+
+def test_similar_worksheets_do_not_share_vision_result(fake_openai):
+    first = prepare_image(_worksheet(), "image/jpeg")
+    assert prepare_image(_worksheet(), "image/jpeg").digest == first.digest
+
+    _reply(fake_openai, "libro")
+    _reply(fake_openai, "mesa")
+    _reply(fake_openai, "silla")
+    page = openai_service._interpret_image_with_vision(_worksheet(), "image/jpeg", "pl")
+    # Same template, one line changed
+    other = openai_service._interpret_image_with_vision(
+        _worksheet(last_line=900), "image/jpeg", "pl"
+    )
+    # Same drawing on a page of another shape
+    wider = openai_service._interpret_image_with_vision(
+        _worksheet(size=(3000, 1800)), "image/jpeg", "pl"
+    )
+    assert [item["source_word"] for item in page + other + wider] == [
+        "libro",
+        "mesa",
+        "silla",
+    ]
+    assert len(fake_openai.calls) == 3
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.json_provider import rows_to_dicts
+
+
+def test_provider_encodes_datetimes_as_iso(app_client):
+    app = app_client.application
+    created = datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc)
+    with app.app_context():
+        body = app.json.response({"created_at": created, "score": Decimal("1.5")})
+    assert body.get_json() == {
+        "created_at": "2026-10-19T12:30:00+00:00",
+        "score": "1.5",
+    }
+    assert app.json.loads(app.json.dumps({1: "a"})) == {"1": "a"}
+
+
+def test_flashcard_list_is_served_from_row_tuples(app_client):
+    app_client.post(
+        "/api/flashcards",
+        json={
+            "source_word": "hola",
+            "translated_word": "cześć",
+            "native_language": "pl",
+        },
+    )
+    cards = app_client.get("/api/flashcards").get_json()
+    card = app_client.get(f"/api/flashcards/{cards[0]['id']}").get_json()
+    assert cards == [card]
+    datetime.fromisoformat(card["created_at"])
+
+    assert rows_to_dicts(("a", "b"), [(1, 2)]) == [{"a": 1, "b": 2}]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pytest
+
+from app import create_app
+from app.services import lexicon, openai_service
+from app.services.text_preprocessing import extract_terms
+from config import get_settings
+
+
+@pytest.fixture()
+def lexicon_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "lexicon_dir", str(tmp_path))
+    yield tmp_path
+    lexicon.clear_lexicon_cache()
+
+
+def test_build_and_lookup(lexicon_dir):
+    words = lexicon_dir / "es-pl.tsv"
+    words.write_text(
+        "# spanish -> polish\nhola\tcześć\nÁrbol\tdrzewo\nhola\tdzień dobry\n",
+        encoding="utf-8",
+    )
+    result = (
+        create_app()
+        .test_cli_runner()
+        .invoke(args=["lexicon", "build", "es", "pl", str(words)])
+    )
+    assert result.exit_code == 0, result.output
+
+    (lex,) = lexicon.get_lexicons("pl")
+    assert len(lex) == 2
+    assert lex.lookup("HOLA") == "cześć"
+    assert lex.lookup("árbol") == "drzewo"
+    assert "gato" not in lex
+
+
+def test_interpret_sends_only_unknown_words(fake_openai, lexicon_dir):
+    lexicon.build_lexicon(
+        [("hola", "cześć"), ("gato", "kot")], lexicon_dir / "es-pl.lex"
+    )
+
+    known_only = openai_service.interpret_text_with_ai("Hola, gato! hola", "pl")
+    assert [item["translated_word"] for item in known_only] == ["cześć", "kot"]
+    assert fake_openai.calls == []
+
+    fake_openai.reply(
+        {
+            "items": [
+                {
+                    "source_word": "perro",
+                    "source_language": "es",
+                    "translated_word": "pies",
+                    "native_language": "pl",
+                }
+            ]
+        }
+    )
+    mixed = openai_service.interpret_text_with_ai("hola perro y gato", "pl")
+    assert fake_openai.calls[0]["messages"][-1]["content"] == (
+        "perro | hola perro y gato"
+    )
+    assert {item["source_word"] for item in mixed} == {"hola", "gato", "perro"}
+
+
+def test_lookups_follow_the_source_language(lexicon_dir):
+    lexicon.build_lexicon(
+        [("red", "czerwony"), ("pie", "ciasto"), ("house", "dom")],
+        lexicon_dir / "en-pl.lex",
+    )
+    lexicon.build_lexicon(
+        [("red", "sieć"), ("pie", "stopa"), ("perro", "pies")],
+        lexicon_dir / "es-pl.lex",
+    )
+
+    terms = extract_terms("El perro y la red, pie")
+    known, unknown = lexicon.resolve_known_words(terms, "pl")
+    assert {item["source_word"]: item["translated_word"] for item in known} == {
+        "perro": "pies",
+        "red": "sieć",
+        "pie": "stopa",
+    }
+    assert {item["source_language"] for item in known} == {"es"}
+    assert unknown == []
+
+    # Without a telling word the shared ones are left to the model
+    known, unknown = lexicon.resolve_known_words(extract_terms("red pie"), "pl")
+    assert known == []
+    assert [term.key for term in unknown] == ["red", "pie"]
+
+    known, unknown = lexicon.resolve_known_words(
+        extract_terms("red house"), "pl", source_language="ES"
+    )
+    assert [item["translated_word"] for item in known] == ["sieć"]
+    assert [term.key for term in unknown] == ["house"]
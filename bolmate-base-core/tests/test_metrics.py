@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+
+from app import metrics
+
+
+def _sample(text, name, **labels):
+    """Value of the ``name`` sample whose labels include ``labels``."""
+    for line in text.splitlines():
+        match = re.match(rf"{name}\{{(.*)\}} (\S+)$", line)
+        if match and all(
+            f'{key}="{value}"' in match[1] for key, value in labels.items()
+        ):
+            return float(match[2])
+    return None
+
+
+def test_metrics_report_requests_queries_and_pool(app_client):
+    app_client.post(
+        "/api/flashcards", json={"source_word": "hola", "translated_word": "cześć"}
+    )
+    app_client.get("/api/flashcards")
+    app_client.get("/api/flashcards")
+
+    response = app_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    count = _sample(
+        text,
+        "http_request_duration_seconds_count",
+        blueprint="flashcards",
+        endpoint="/api/flashcards",
+        method="GET",
+        status="200",
+    )
+    assert count >= 2
+    assert (
+        _sample(
+            text,
+            "http_request_duration_seconds_bucket",
+            endpoint="/api/flashcards",
+            method="GET",
+            le="+Inf",
+        )
+        == count
+    )
+    assert _sample(
+        text,
+        "db_query_duration_seconds_count",
+        endpoint="/api/flashcards",
+        statement="SELECT",
+    )
+    # SQLite's in-memory pool has no size/checkout stats, only the family
+    assert "# TYPE db_pool_connections gauge" in text
+    # The scrape itself is not timed
+    assert 'endpoint="/metrics"' not in text
+
+
+def test_metrics_count_openai_tokens_errors_and_cache_hits(app_client, fake_openai):
+    before = metrics.CACHE_LOOKUPS.value(cache="interpret_text", result="hit")
+    fake_openai.reply(
+        {
+            "items": [
+                {
+                    "source_word": "gato",
+                    "source_language": "es",
+                    "translated_word": "kot",
+                    "native_language": "pl",
+                }
+            ]
+        },
+        usage=(120, 30, 64),
+    )
+    payload = {"text": "El gato duerme.", "native_language": "pl"}
+    app_client.post("/api/interpret", json=payload)
+    app_client.post("/api/interpret", json=payload)
+
+    assert (
+        metrics.CACHE_LOOKUPS.value(cache="interpret_text", result="hit") == before + 1
+    )
+    text = app_client.get("/metrics").get_data(as_text=True)
+    assert _sample(text, "openai_tokens_sum", operation="interpret_text", kind="cached")
+    assert _sample(
+        text, "openai_request_duration_seconds_count", operation="interpret_text"
+    )
+
+    def fail(**kwargs):
+        raise TimeoutError("upstream timed out")
+
+    fake_openai.chat.completions.create = fail
+    errors = metrics.OPENAI_ERRORS.value(
+        operation="interpret_text", error="TimeoutError"
+    )
+    app_client.post(
+        "/api/interpret", json={"text": "Otro texto.", "native_language": "pl"}
+    )
+    assert (
+        metrics.OPENAI_ERRORS.value(operation="interpret_text", error="TimeoutError")
+        == errors + 1
+    )
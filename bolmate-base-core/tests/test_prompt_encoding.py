@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from app.services import openai_service
+from app.services.prompt_encoding import batch_cards, encode_cards, estimate_tokens
+
+
+def _card(word, **extra):
+    return {
+        "id": 1000 + len(word),
+        "source_word": word,
+        "source_language": "es",
+        "translated_word": word.upper(),
+        "native_language": "pl",
+        "example_sentence": None,
+        "is_manual": False,
+        "correct_count": 0,
+        "created_at": "2025-01-01T00:00:00+00:00",
+        **extra,
+    }
+
+
+def test_encode_cards_projects_fields():
+    table = encode_cards(
+        [_card("hola"), _card("casa", example_sentence="Mi\tcasa\nes")],
+        ("source_word", "example_sentence"),
+    )
+    assert table == "i\tsource_word\texample_sentence\n0\thola\t\n1\tcasa\tMi casa es"
+
+
+def test_batch_cards_respects_token_budget_and_item_cap():
+    cards = [_card(f"palabra{n}") for n in range(30)]
+    fields = ("source_word", "translated_word")
+    budget = 60
+    batches = list(batch_cards(cards, fields, budget, max_items=100))
+    assert sum(len(batch) for batch, _ in batches) == 30
+    assert len(batches) > 1
+    assert all(estimate_tokens(table) <= budget for _, table in batches)
+
+    capped = list(batch_cards(cards, fields, 10_000, max_items=7))
+    assert [len(batch) for batch, _ in capped] == [7, 7, 7, 7, 2]
+
+
+def test_enrich_matches_replies_by_row_id(fake_openai):
+    cards = [_card("hola"), _card("casa")]
+    fake_openai.reply(
+        {
+            "items": [
+                {"i": 1, "s": "Mi casa", "t": "Mój dom", "d": "A1"},
+                {"i": 0, "s": "Hola Ana", "t": "Cześć Ano", "d": "A1"},
+            ]
+        }
+    )
+    enriched = openai_service.enrich_flashcards(cards, "pl")
+
+    prompt = fake_openai.calls[0]["messages"][-1]["content"]
+    assert "created_at" not in prompt and "None" not in prompt
+    assert [card["example_sentence"] for card in enriched] == ["Hola Ana", "Mi casa"]
+    assert enriched[1]["example_translation"] == "Mój dom"
+    assert enriched[0]["id"] == cards[0]["id"]
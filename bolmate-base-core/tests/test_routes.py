@@ -5,7 +5,9 @@ from __future__ import annotations
 def test_healthcheck(app_client):
     response = app_client.get("/api/health")
     assert response.status_code == 200
-    assert response.get_json() == {"status": "ok"}
+    body = response.get_json()
+    assert body["status"] == "ok"
+    assert all(circuit["state"] == "closed" for circuit in body["circuits"].values())
 
 
 def test_create_and_list_users(app_client):
@@ -32,8 +34,8 @@ def test_flashcard_creation_and_filters(app_client):
         "difficulty_level": "A1",
     }
     second = {
-        "source_word": "gracias",
-        "translated_word": "dziękuję",
+        "source_word": "murciélago",
+        "translated_word": "nietoperz",
         "native_language": "pl",
         "source_language": "es",
     }
@@ -61,7 +63,9 @@ def test_flashcard_duplicate_guard(app_client):
     assert duplicate.get_json()["error"] == "Flashcard already exists for this language pair."
 
 
-def test_language_switch_empty_and_duplicate_guard(monkeypatch, app_client):
+def test_language_switch_stores_translations_without_rewriting(
+    monkeypatch, app_client
+):
     # When there are no flashcards
     empty_resp = app_client.post("/api/languages/switch", json={"target_language": "en"})
     empty_data = empty_resp.get_json()
@@ -69,7 +73,7 @@ def test_language_switch_empty_and_duplicate_guard(monkeypatch, app_client):
     assert empty_data["flashcards"] == []
     assert empty_data["meta"]["translated_count"] == 0
 
-    # Seed flashcards to trigger duplicate detection
+    # A card that already exists for "en" used to block the switch with 409
     first_card = {
         "source_word": "hola",
         "translated_word": "cześć",
@@ -77,29 +81,108 @@ def test_language_switch_empty_and_duplicate_guard(monkeypatch, app_client):
         "source_language": "es",
     }
     second_card = {
+        "source_word": "gracias",
+        "translated_word": "dziękuję",
+        "native_language": "pl",
+        "source_language": "es",
+    }
+    third_card = {
         "source_word": "hola",
         "translated_word": "hello",
         "native_language": "en",
         "source_language": "es",
     }
-    first_resp = app_client.post("/api/flashcards", json=first_card)
-    second_resp = app_client.post("/api/flashcards", json=second_card)
-    assert first_resp.status_code == 201
-    assert second_resp.status_code == 201
+    for card in (first_card, second_card, third_card):
+        assert app_client.post("/api/flashcards", json=card).status_code == 201
+
+    calls = []
+    english = {"hola": "hello", "gracias": "thank you"}
 
     def fake_translate(cards, target_language):
+        calls.append([card["source_word"] for card in cards])
         return [
-            {**card, "native_language": target_language} for card in cards
+            {
+                **card,
+                "translated_word": english[card["source_word"]],
+                "native_language": target_language,
+                "translated": True,
+            }
+            for card in cards
         ]
 
     monkeypatch.setattr("app.routes.languages.translate_flashcards", fake_translate)
 
-    conflict = app_client.post(
-        "/api/languages/switch",
-        json={"target_language": "pl", "flashcard_ids": [second_resp.get_json()["id"]]},
+    switched = app_client.post("/api/languages/switch", json={"target_language": "en"})
+    assert switched.status_code == 200
+    data = switched.get_json()
+    assert data["meta"]["translated_count"] == 2
+    assert data["meta"]["skipped_count"] == 1
+    assert {card["translated_word"] for card in data["flashcards"]} == {
+        "hello",
+        "thank you",
+    }
+    assert all(card["native_language"] == "en" for card in data["flashcards"])
+
+    # Switching back and forth again is answered from stored translations
+    again = app_client.post("/api/languages/switch", json={"target_language": "en"})
+    assert again.get_json()["meta"]["translated_count"] == 0
+    assert len(calls) == 1
+
+    # Card rows keep the language they were created with
+    stored = app_client.get("/api/flashcards").get_json()
+    assert sorted(card["native_language"] for card in stored) == ["en", "pl", "pl"]
+
+    english_view = app_client.get(
+        "/api/flashcards", query_string={"native_language": "en"}
+    ).get_json()
+    assert all(card["native_language"] == "en" for card in english_view)
+
+    gracias = next(card for card in stored if card["source_word"] == "gracias")
+    answer = app_client.post(
+        "/api/quiz",
+        json={
+            "flashcard_id": gracias["id"],
+            "answer": "thank you",
+            "native_language": "en",
+        },
     )
-    assert conflict.status_code == 409
-    assert "duplicate" in conflict.get_json()["error"].lower()
+    assert answer.get_json()["correct"] is True
+
+
+def test_language_switch_stores_same_spelling_and_skips_fallbacks(
+    monkeypatch, app_client
+):
+    for word in ("taxi", "hola"):
+        card = {
+            "source_word": word,
+            "translated_word": word if word == "taxi" else "cześć",
+            "native_language": "pl",
+            "source_language": "es",
+        }
+        assert app_client.post("/api/flashcards", json=card).status_code == 201
+
+    calls = []
+
+    def fake_translate(cards, target_language):
+        calls.append([card["source_word"] for card in cards])
+        # "taxi" is spelled the same in English; "hola" fell back untranslated
+        return [
+            {
+                **card,
+                "native_language": target_language,
+                "translated": card["source_word"] == "taxi",
+            }
+            for card in cards
+        ]
+
+    monkeypatch.setattr("app.routes.languages.translate_flashcards", fake_translate)
+
+    switched = app_client.post("/api/languages/switch", json={"target_language": "en"})
+    assert switched.get_json()["meta"]["translated_count"] == 1
+
+    again = app_client.post("/api/languages/switch", json={"target_language": "en"})
+    assert again.get_json()["meta"]["translated_count"] == 0
+    assert calls == [["taxi", "hola"], ["hola"]]
 
 
 def test_interpret_json_and_plain_text(monkeypatch, app_client):
@@ -126,3 +209,44 @@ def test_interpret_json_and_plain_text(monkeypatch, app_client):
     assert text_resp.get_json()["items"][0]["source_language"] == "es"
 
 
+def test_interpret_file_streams_uploads_and_enforces_limits(monkeypatch, app_client):
+    import io
+
+    from app.services.openai_service import Interpretation
+    from config import get_settings
+
+    received = []
+
+    def fake_interpret_file(stream, filename, mime_type, native_language):
+        received.append((type(stream).__name__, stream.read()))
+        return Interpretation([{"source_word": "hola", "translated_word": "cześć"}], True)
+
+    monkeypatch.setattr(
+        "app.services.extraction_store.interpret_file", fake_interpret_file
+    )
+    monkeypatch.setattr(get_settings(), "max_upload_file_size", 1024)
+
+    ok = app_client.post(
+        "/api/interpret/file",
+        data={"files": (io.BytesIO(b"\x89PNG small"), "lesson.png")},
+        content_type="multipart/form-data",
+    )
+    assert ok.status_code == 200
+    assert received == [("SpooledTemporaryFile", b"\x89PNG small")]
+
+    too_big = app_client.post(
+        "/api/interpret/file",
+        data={"files": (io.BytesIO(b"x" * 2048), "book.pdf")},
+        content_type="multipart/form-data",
+    )
+    assert too_big.status_code == 413
+    assert "book.pdf" in too_big.get_json()["details"]
+    assert len(received) == 1
+
+    app_client.application.config["MAX_CONTENT_LENGTH"] = 512
+    whole_request = app_client.post(
+        "/api/interpret/file",
+        data={"files": (io.BytesIO(b"x" * 1000), "notes.pdf")},
+        content_type="multipart/form-data",
+    )
+    assert whole_request.status_code == 413
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from app.services.text_preprocessing import (
+    extract_terms,
+    format_terms,
+    normalize_text,
+    stop_word_language,
+)
+
+
+def test_normalize_text_drops_page_boilerplate():
+    bodies = ["El   perro come.", "El gato duerme.", "Hola.", "Adiós."]
+    pages = [
+        f"Unidad 3 – Vocabulario\n{body}\nLa casa {n}\nPágina {n} / 4"
+        for n, body in enumerate(bodies, start=1)
+    ]
+    text = normalize_text("\n\n".join(pages))
+    assert "Página" not in text
+    assert text.splitlines() == [
+        "Unidad 3 – Vocabulario",
+        "El perro come.",
+        "La casa 1",
+        "El gato duerme.",
+        "Hola.",
+        "Adiós.",
+    ]
+
+
+def test_normalize_text_composes_unicode():
+    decomposed = "árbol"
+    assert normalize_text(decomposed) == "árbol"
+
+
+def test_extract_terms_dedupes_and_keeps_one_context():
+    text = normalize_text("si - yes\nEl perro y el gato.\nEl PERRO duerme.")
+    terms = extract_terms(text)
+    assert [term.key for term in terms] == [
+        "si",
+        "yes",
+        "perro",
+        "gato",
+        "duerme",
+    ]
+    assert terms[0].context == "si - yes"
+    assert format_terms(terms[2:3]) == "perro | El perro y el gato."
+
+
+def test_stop_words_follow_the_text_language():
+    english = extract_terms("Go to the window and look at the die.")
+    assert [term.key for term in english] == ["go", "window", "look", "die"]
+
+    german = extract_terms("Die Katze und der Hund schlafen.")
+    assert [term.key for term in german] == ["katze", "hund", "schlafen"]
+
+    dutch = extract_terms("het huis van de bakker", source_language="NL")
+    assert [term.key for term in dutch] == ["huis", "de", "bakker"]
+
+    # A function word shared by several languages gives none away and is kept
+    assert [term.key for term in extract_terms("en")] == ["en"]
+    assert stop_word_language(["perro", "con", "el"]) == "es"
+    assert stop_word_language(["en"]) is None
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.db import session as db_session
+from app.models import OpenAIUsage
+from config import get_settings
+
+ITEMS = {
+    "items": [
+        {
+            "source_word": "gato",
+            "source_language": "es",
+            "translated_word": "kot",
+            "native_language": "pl",
+        }
+    ]
+}
+
+
+def test_usage_ledger_records_tokens_per_operation_and_client(app_client, fake_openai):
+    fake_openai.reply(ITEMS, usage=(1000, 200, 400))
+    fake_openai.reply(ITEMS, usage=(500, 100, 0))
+    headers = {"X-User-Id": "42"}
+    text = {"text": "El gato duerme.", "native_language": "pl"}
+    app_client.post("/api/interpret", json=text, headers=headers)
+    # Served from the response cache: recorded as a hit without tokens
+    app_client.post("/api/interpret", json=text, headers=headers)
+    app_client.post(
+        "/api/interpret", json={"text": "Otro gato.", "native_language": "PL"}
+    )
+
+    response = app_client.get("/api/usage?group_by=operation,client,language")
+    assert response.status_code == 200
+    groups = {
+        (group["operation"], group["client"]): group
+        for group in response.get_json()["groups"]
+    }
+    mine = groups[("interpret_text", "user:42")]
+    assert mine["language"] == "pl"
+    assert (mine["calls"], mine["cache_hits"], mine["errors"]) == (2, 1, 0)
+    assert (mine["prompt_tokens"], mine["completion_tokens"]) == (1000, 200)
+    assert mine["cached_tokens"] == 400
+    settings = get_settings()
+    assert mine["estimated_cost_usd"] == pytest.approx(
+        (
+            600 * settings.openai_prompt_price_per_million
+            + 400 * settings.openai_cached_prompt_price_per_million
+            + 200 * settings.openai_completion_price_per_million
+        )
+        / 1_000_000
+    )
+    anonymous = groups[("interpret_text", "ip:127.0.0.1")]
+    assert anonymous["prompt_tokens"] == 500
+    # Most expensive first
+    assert [group["client"] for group in response.get_json()["groups"]] == [
+        "user:42",
+        "ip:127.0.0.1",
+    ]
+
+
+def test_usage_ledger_buffers_until_batch_is_full(monkeypatch, app_client, fake_openai):
+    import app.services.usage_ledger as usage_ledger
+
+    monkeypatch.setattr(get_settings(), "usage_ledger_batch_size", 10)
+    for index in range(3):
+        fake_openai.reply(ITEMS, usage=(10, 5, 0))
+        app_client.post(
+            "/api/interpret", json={"text": f"Texto {index}.", "native_language": "pl"}
+        )
+    assert usage_ledger.LEDGER.pending() == 3
+
+    report = app_client.get("/api/usage").get_json()
+    assert usage_ledger.LEDGER.pending() == 0
+    assert report["groups"][0]["calls"] == 3
+
+
+def test_usage_ledger_flushes_old_entries_without_more_traffic(
+    monkeypatch, app_client, fake_openai
+):
+    import app.services.usage_ledger as usage_ledger
+
+    monkeypatch.setattr(get_settings(), "usage_ledger_flush_seconds", 0.05)
+    fake_openai.reply(ITEMS, usage=(10, 5, 0))
+    app_client.post("/api/interpret", json={"text": "Texto.", "native_language": "pl"})
+    deadline = time.monotonic() + 2
+    while usage_ledger.LEDGER.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert usage_ledger.LEDGER.pending() == 0
+
+    session = db_session.SessionLocal()
+    assert session.query(OpenAIUsage).count() == 1
+    session.close()
+
+
+def test_shared_completions_are_split_between_clients(app_client, fake_openai):
+    import app.services.usage_ledger as usage_ledger
+
+    usage = SimpleNamespace(prompt_tokens=100, completion_tokens=31)
+    with usage_ledger.shared_by(["user:a", "user:b", "user:a"]):
+        usage_ledger.LEDGER.record("hint", usage=usage)
+
+    report = app_client.get("/api/usage?group_by=client").get_json()["groups"]
+    tokens = {
+        group["client"]: (group["prompt_tokens"], group["completion_tokens"])
+        for group in report
+    }
+    assert tokens == {"user:a": (67, 21), "user:b": (33, 10)}
+
+
+def test_usage_report_rejects_unknown_groups(app_client):
+    response = app_client.get("/api/usage?group_by=operation,country")
+    assert response.status_code == 400
@@ -49,6 +49,7 @@ export type GenerateQuizPayload = {
 export type SubmitQuizAnswerPayload = {
   flashcard_id: number;
   answer: string;
+  native_language?: string;
 };
 
 export type InterpretTextPayload = {
@@ -76,6 +76,7 @@ export default function QuizPanel() {
         {
           flashcard_id: question.flashcard_id,
           answer,
+          native_language: question.is_reversed ? undefined : question.native_language,
         },
         reverseMode,
       );